@@ -22,15 +22,17 @@ if (_conn.alive):
     ))
     logging.info(f"Found [{len(_clt_elements):6,}] Object elements fitting the criteria.") 
 
-    # 4 types of properties
-    if (True):
-        _clt_element_userid = list(_conn.find_properties_userid_by_group((None, "IdAndCategories"), False))
-        _clt_reno_userid = list(_conn.find_properties_userid_by_group((None, "Category"), False))
-        _clt_props_userid = list(_conn.find_properties_userid_by_group("CLT Fabrication", False))
-        _clt_ratings_userid = list(_conn.find_properties_userid_by_group("General Ratings", False))
-        _clt_workflow_userid = list(_conn.find_properties_userid_by_group("WORKFLOW", False))
-
-    _clt_props_userid = _clt_element_userid + _clt_reno_userid + _clt_props_userid + _clt_ratings_userid + _clt_workflow_userid
+    # Properties of 5 groups, resolved from a single fetch of the property catalogue
+    _clt_props_userid = _conn.find_properties_userid_by_groups(
+        [
+            (None, "IdAndCategories"),
+            (None, "Category"),
+            "CLT Fabrication",
+            "General Ratings",
+            "WORKFLOW",
+        ],
+        False,
+    )
 
     logging.info(f"Assembled [{len(_clt_props_userid):6,}] property ids to request from ArchiCAD.") 
 
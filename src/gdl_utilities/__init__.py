@@ -1,7 +1,14 @@
 import gdl_utilities.ac_commands as ac_commands
 import gdl_utilities.gsm_commands as gsm_commands
+import gdl_utilities.threads as threads
 import gdl_utilities.script as script
 import gdl_utilities.parse_params as parse_params
 import gdl_utilities.xml as xml
+import gdl_utilities.pipeline as pipeline
+import gdl_utilities.index as index
+import gdl_utilities.library as library
+import gdl_utilities.diff as diff
+import gdl_utilities.watch as watch
+import gdl_utilities.distributed as distributed
 import gdl_utilities.ac_connection as ac_connection
 from gdl_utilities.ac_connection import connector as ac_connector
@@ -1,11 +1,17 @@
 # Recovered
 from datetime import date, datetime
+import functools
+import http.client
+import operator
+import threading
 import time as timer
-from typing import Any, Dict, Generator, Iterable, List, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Generator, Iterable, List, Tuple, Union
 from types import ModuleType
 
 import numpy as np
 import pandas as pd
+from tqdm import tqdm
 
 from fakemodule import ModuleUnavailable
 
@@ -17,6 +23,19 @@ CLASSIFICATION_DATE_FORMAT = "%Y-%m-%d"
 
 GUID_COLUMN_NAME = "element_guid"
 
+# dtype of the columns of typed ElementsPropertyValues, by the name of the PropertyValue type of the column;
+# see connection.get_element_property_dataframe(typed=True).
+PROPERTY_DTYPES = {
+	"NormalAnglePropertyValue":"float64",
+	"NormalAreaPropertyValue":"float64",
+	"NormalLengthPropertyValue":"float64",
+	"NormalNumberPropertyValue":"float64",
+	"NormalVolumePropertyValue":"float64",
+	"NormalIntegerPropertyValue":"Int64",
+	"NormalBooleanPropertyValue":"boolean",
+	"NormalSingleEnumPropertyValue":"category",	# with every option of the property as categories
+}
+
 try:
 	import archicad
 	from archicad import ACConnection
@@ -38,6 +57,11 @@ class ACConnectionFailed(RuntimeError):
 	
 	alive = False
 
+class ACPropertyNotResolved(LookupError):
+	def __bool__(self):
+		return False
+	__nonzero__ = __bool__
+
 
 
 class PropertyValue(dict):
@@ -98,16 +122,16 @@ class PropertyValue(dict):
 			self["value"] = value
 	
 	def reconstruct(self, value:Any=None):
-		_value_arg_mapper = {
-			archicad.Types.DisplayValueEnumId: "displayValue",
-			archicad.Types.EnumValueIdWrapper: "enumValueId",
-			archicad.Types.NonLocalizedValueEnumId: "nonLocalizedValue",
-			archicad.Types.NotAvailablePropertyValue: None,
-			archicad.Types.NotEvaluatedPropertyValue: None,
-			archicad.Types.UserUndefinedPropertyValue: None,
-			None:"value",
-		}
-	
+		"""
+		Build the archicad object of this structure for value, e.g. NormalLengthPropertyValue(value=value);
+		the same as compile()(value). Use compile() or reconstructor() to build many.
+		"""
+		return self.compile()(value)
+
+	def compile(self)->Callable[[Any], Any]:
+		"""
+		Function building the archicad object of this structure for a value, with the structure walked only once.
+		"""
 		"""
 		TODO REMOVE THIS STR LITERAL WHEN DONE
 		
@@ -152,88 +176,87 @@ class PropertyValue(dict):
 		}
 		"""
 		
-		_value_arg = _value_arg_mapper.get(
-			self.constructor,
-				_value_arg_mapper.get(None, None)
-			)
-		
-		_value = self.get("value", None) # Do not use self.value - as this will iterate through the branch!!
+		"""
+		NormalMultiEnumPropertyValue is a very special case.
+		value is a list, and
+			when constructing NormalMultiEnumPropertyValue,
+			value is expected to be a list of EnumValueIdWrapper.
+		"""
+		_constructor = self.constructor
+		_value_arg = {
+			archicad.Types.DisplayValueEnumId: "displayValue",
+			archicad.Types.EnumValueIdWrapper: "enumValueId",
+			archicad.Types.NonLocalizedValueEnumId: "nonLocalizedValue",
+			archicad.Types.NotAvailablePropertyValue: None,
+			archicad.Types.NotEvaluatedPropertyValue: None,
+			archicad.Types.UserUndefinedPropertyValue: None,
+		}.get(_constructor, "value")
+		_args = dict(self.get("args", {}))
 
-		# If this is not the end of branch, pass the value reconstruction to the branch
-		if (not isinstance(_value, PropertyValue) and \
-			isinstance(value, list) and \
-			self.constructor is not archicad.Types.NormalMultiEnumPropertyValue
-		):
-			value = [
-				self.reconstruct(value=_item) for _item in value
-			]
-		
-			# This finishes the constructor - we only need [ construct, construct, ... ] not construct( value= [ construct, construct, ... ])
-			return value
-		
-		# If this is the end of the branch, the proposed value is a list, iterated it
-		else:
-			# TODO use logging?
-			# print (f"{type(_value)=}\t{type(value)=}")
-			
-			"""
-			NormalMultiEnumPropertyValue is a very special case.
-			_value and value will both be lists, and
-				when constructing NormalMultiEnumPropertyValue,
-				value is expected to be a list of EnumValueIdWrapper.
-			"""
-			if (self.constructor is archicad.Types.NormalMultiEnumPropertyValue):
-				if (not isinstance(value, list)):
-					value = [value, ]
-				
-				# If there are no values, we will have to make our own structure...
-				_builder = type(self)(
-					{
-						"constructor":archicad.Types.EnumValueIdWrapper,
-						"value":type(self)({
-							"constructor":archicad.Types.DisplayValueEnumId,
-							"value":None,
-							"args":{
-								"type":"displayValue",
-							}
-						}),
+		_value = self.get("value", None)
+		_is_leaf = not isinstance(_value, PropertyValue)
+
+		if (_constructor is archicad.Types.NormalMultiEnumPropertyValue):
+			_builder = type(self)(
+				{
+					"constructor":archicad.Types.EnumValueIdWrapper,
+					"value":type(self)({
+						"constructor":archicad.Types.DisplayValueEnumId,
+						"value":None,
 						"args":{
-
+							"type":"displayValue",
 						}
+					}),
+					"args":{
+
 					}
-				)
+				}
+			).compile()
+			_branch = lambda value: [ _builder(_item) for _item in (value if (isinstance(value, list)) else [value, ]) ]
+		elif (_is_leaf):
+			_branch = None
+		elif (issubclass(_value.constructor, archicad.Types.EnumValueIdWrapper)):
+			_wrapper = _value.compile()
+			_branch = lambda value: [ _wrapper(_item) for _item in (value if (isinstance(value, (list, tuple))) else [value, ]) ]
+		else:
+			_branch = _value.compile()
+
+		def _reconstruct(value:Any=None):
+			if (_is_leaf and isinstance(value, list) and _constructor is not archicad.Types.NormalMultiEnumPropertyValue):
+				return [ _reconstruct(_item) for _item in value ]
+
+			if (_branch is not None):
+				value = _branch(value)
 
-				value = [
-					_builder.reconstruct(value=_item) for _item in value
-				]
-				
-			# Normal cases after discarding EnumValueIdWrapper
-			elif (isinstance(_value, PropertyValue)):
-				# Special cases where the next branch MUST be a list
-				if (issubclass(_value.constructor, (
-					archicad.Types.EnumValueIdWrapper,
-				))):
-					if (not isinstance(value, (list, tuple))):
-						value = [value, ]
-						
-					value = [
-						_value.reconstruct(value=_item) for _item in value
-					]
-				else:
-					value = _value.reconstruct(value=value)
-			
-			_kwargs = self.get("args", {})
-			
 			if (_value_arg):
-				_kwargs[_value_arg] = value
-			
-			# TODO use logging?
-			# print (
-			# 	f"Constructor\t\t{self.constructor=}, {_value_arg} = {_kwargs.get(_value_arg, 'NoneKey')}"
-			# )
-			return self.constructor(
-				**_kwargs
-			)
+				return _constructor(**{**_args, _value_arg:value})
+			else:
+				return _constructor(**_args)
+
+		return _reconstruct
+
+	def reconstructor(self)->Callable[[Any], Any]:
+		"""
+		compile(), memoised by value, for building a whole column of values:
+		a column of the same few enum values only constructs each of them once.
+		"""
+		_compiled = self.compile()
+		_memo = {}
+
+		def _reconstruct(value:Any=None):
+			_key = (type(value), tuple(value) if (isinstance(value, list)) else value)
+
+			try:
+				return _memo[_key]
+			except KeyError:
+				_memo[_key] = _compiled(value)
+			except TypeError:
+				# Unhashable - do not memoise
+				return _compiled(value)
+
+			return _memo[_key]
+
+		return _reconstruct
 		
 
 class ElementsPropertyValues(pd.DataFrame):
@@ -245,6 +268,7 @@ class ElementsPropertyValues(pd.DataFrame):
 	
 	_metadata = [
 		"property_structure",
+		"snapshot",
 	]
 	
 	@property
@@ -264,6 +288,118 @@ class ElementsPropertyValues(pd.DataFrame):
 
 	# wrap around instance functions to maintain the metadata
 	apply = retain_metadata(pd.DataFrame.apply)
+
+	@staticmethod
+	def freeze_value(
+		value:Any,
+	)->Any:
+		"""
+		value with every list in it as a tuple, e.g. the enum ids of a multi enum,
+		so that changing the list in place does not change a snapshot holding it.
+		"""
+		if (isinstance(value, (list, tuple))):
+			return tuple(ElementsPropertyValues.freeze_value(_value) for _value in value)
+
+		return value
+
+	@staticmethod
+	def freeze_column(
+		column:pd.Series,
+	)->pd.Series:
+		"""
+		column through freeze_value(), if it is of object dtype - other dtypes cannot hold lists.
+		"""
+		if (column.dtype != object):
+			return column
+
+		return pd.Series(
+			[ ElementsPropertyValues.freeze_value(_value) for _value in column.tolist() ],
+			index=column.index,
+			name=column.name,
+			dtype=object,
+		)
+
+	def take_snapshot(self):
+		"""
+		Remember the current values as what ArchiCAD holds, for changed_cells().
+
+		Lists are copied as tuples, see freeze_value(); a copy of the frame alone would share them.
+		"""
+		_snapshot = pd.DataFrame(self, copy=True)
+
+		for _column in _snapshot.columns:
+			_snapshot[_column] = self.freeze_column(_snapshot[_column])
+
+		self.snapshot = _snapshot
+
+	def changed_cells(
+		self,
+	)->pd.DataFrame:
+		"""
+		Boolean DataFrame of the cells that differ from the snapshot, compared column by column.
+
+		Cells of rows or columns not in the snapshot count as changed; so does everything if there is no snapshot.
+		"""
+		_snapshot = getattr(self, "snapshot", None)
+
+		if (_snapshot is None):
+			return pd.DataFrame(True, index=self.index, columns=self.columns)
+
+		_in_snapshot = self.index.isin(_snapshot.index)
+		_changed = {}
+
+		for _column in self.columns:
+			if (_column not in _snapshot.columns):
+				_changed[_column] = np.ones(len(self.index), dtype=np.bool_)
+				continue
+
+			_current = self.freeze_column(self[_column])
+			_before = _snapshot[_column].reindex(self.index)
+
+			# Categoricals can only be compared with the same categories
+			if (isinstance(_current.dtype, pd.CategoricalDtype)):
+				_current = _current.astype(object)
+			if (isinstance(_before.dtype, pd.CategoricalDtype)):
+				_before = _before.astype(object)
+
+			_equal = (_current == _before).fillna(False).to_numpy(dtype=np.bool_)
+			_missing = (_current.isna() & _before.isna()).to_numpy(dtype=np.bool_)
+
+			_changed[_column] = ~(_equal | _missing) | ~_in_snapshot
+
+		return pd.DataFrame(_changed, index=self.index, columns=self.columns)
+
+	def update_snapshot(
+		self,
+		cells:Iterable[Tuple[Any, str]],
+	):
+		"""
+		Take the current values of cells, as (index, column), into the snapshot - e.g. the cells pushed successfully.
+
+		Cells of rows or columns not in the snapshot are left as changed.
+		"""
+		_snapshot = getattr(self, "snapshot", None)
+
+		if (_snapshot is None):
+			return
+
+		_indices_by_column = {}
+		for _index, _column in cells:
+			_indices_by_column.setdefault(_column, []).append(_index)
+
+		for _column, _indices in _indices_by_column.items():
+			if (_column not in _snapshot.columns):
+				continue
+
+			_indices = pd.Index(_indices).intersection(_snapshot.index)
+			_values = self.freeze_column(self.loc[_indices, _column])
+
+			# Values may not fit the dtype of the snapshot, e.g. a new category
+			if (_snapshot[_column].dtype != _values.dtype or isinstance(_values.dtype, pd.CategoricalDtype)):
+				_snapshot[_column] = _snapshot[_column].astype(object)
+				_values = _values.astype(object)
+
+			_snapshot.loc[_indices, _column] = _values
 	
 @pd.api.extensions.register_dataframe_accessor("export")
 class _PandasExt():
@@ -307,67 +443,427 @@ class _PandasExt():
 		"""
 		Get a list of PropertyId, ready to be used with element_property_values.
 		"""
-		return [
-			_property_id_array_item.propertyId \
-				for _property_id_array_item in \
-					connector.commands.GetPropertyIds(
-						list(self.property_userids())
-			)
-		]
+		return connector.resolve_property_ids(self.property_userids())
 	
 	def element_property_values(
 		self,
+		changed_only:bool=False,
 	):
 		"""
 		Get a list of ElementPropertyValue, ready to be used with SetPropertyValuesOfElements.
+
+		If changed_only, only the cells in ElementsPropertyValues.changed_cells() are included.
+		"""
+		return self.cells_and_element_property_values(changed_only=changed_only)[1]
+
+	def cells_and_element_property_values(
+		self,
+		changed_only:bool=False,
+	)->Tuple[List[Tuple[Any, str]], List[Any]]:
+		"""
+		Same as element_property_values(), with the (index, column) of each ElementPropertyValue as the first list.
 		"""
-		_element_ids = self.element_ids()
+		_element_ids = list(self.element_ids())
 		_property_ids = self.property_ids()
+
+		if (changed_only):
+			_rows, _cols = np.nonzero(self._obj.changed_cells().to_numpy())
+		else:
+			_rows, _cols = np.divmod(np.arange(self._obj.shape[0]*self._obj.shape[1]), self._obj.shape[1])
 		
+		# One reconstructor per column, selected by column name; so if the DataFrame is trimmed down it will still function.
+		_reconstructors = [
+			self._obj.property_structure[_column].reconstructor() for _column in self._obj.columns
+		]
+		_columns = [
+			self._obj.iloc[:, _col_id].to_numpy(dtype=object) for _col_id in range(self._obj.shape[1])
+		]
+		_skip = (
+			connector.types.NotAvailablePropertyValue,
+			connector.types.NotEvaluatedPropertyValue,
+		)
+
+		_cells = []
 		_element_property_values = []
 		
-		for _row_id, _element_id in enumerate(_element_ids):
-			for _col_id, _property_id in enumerate(_property_ids):
-				_raw_value = self._obj.iat[_row_id, _col_id]
-				if (isinstance(_raw_value, np.generic)):
-					_raw_value = _raw_value.item()
-		
-				# This selects the property_structure by column name; so if the DataFrame is trimmed down it will still function.
-				_property_value = self._obj.property_structure[self._obj.columns[_col_id]].reconstruct(
-					_raw_value
-				)
-				
-				if (not isinstance(_property_value, (
-					connector.types.NotAvailablePropertyValue,
-					connector.types.NotEvaluatedPropertyValue,
-				))):
-					# TODO use logging?
-					# print (
-					# 	f"ElementPropertyValue\t\t{_element_id=}, {_property_id=}, {_property_value}"
-					# )
-					_element_property_values.append(
-						connector.types.ElementPropertyValue(
-							_element_id,
-							_property_id,
-							_property_value
-						)
+		for _row_id, _col_id in zip(_rows.tolist(), _cols.tolist()):
+			_raw_value = _columns[_col_id][_row_id]
+			if (isinstance(_raw_value, np.generic)):
+				_raw_value = _raw_value.item()
+
+			# NaN and <NA> of typed columns are what None was before they were typed
+			if (not isinstance(_raw_value, (list, tuple)) and pd.isna(_raw_value)):
+				_raw_value = None
+	
+			_property_value = _reconstructors[_col_id](_raw_value)
+			
+			if (not isinstance(_property_value, _skip)):
+				_cells.append((self._obj.index[_row_id], self._obj.columns[_col_id]))
+				_element_property_values.append(
+					connector.types.ElementPropertyValue(
+						_element_ids[_row_id],
+						_property_ids[_col_id],
+						_property_value
 					)
+				)
 		
-		return _element_property_values
+		return _cells, _element_property_values
 	
 	def to_archicad(
 		self,
+		changed_only:bool=True,
+		chunk_size:int=None,
+		workers:int=None,
+		retries:int=None,
+		retry_codes:Iterable[int]=None,
+		show_progress:bool=False,
+	)->Union["PropertyPushReport", ACConnectionFailed]:
+		"""
+		Push data to ArchiCAD with connection.push_property_values(); see there for the batching and retries.
+
+		By default only the cells changed since the values were fetched are pushed - see ElementsPropertyValues.changed_cells();
+		the cells set successfully are then taken into the snapshot, so pushing again only sends what failed.
+
+		Returns a PropertyPushReport, no longer the list of ExecutionResult of SetPropertyValuesOfElements:
+		that list is PropertyPushReport.results, in the order of the cells pushed,
+		and connection.summarise_transaction_results() accepts either.
+		Returns ACConnectionFailed, with the snapshot untouched, if ArchiCAD is not alive.
+		"""
+		_cells, _element_property_values = self.cells_and_element_property_values(changed_only=changed_only)
+
+		_report = connector.push_property_values(
+			_element_property_values,
+			cells=_cells,
+			chunk_size=chunk_size,
+			workers=workers,
+			retries=retries,
+			retry_codes=retry_codes,
+			show_progress=show_progress,
+		)
+
+		if (isinstance(_report, ACConnectionFailed)):
+			# Nothing was pushed: every change is still pending
+			return _report
+
+		if (_report):
+			self._obj.take_snapshot()
+		else:
+			self._obj.update_snapshot(_report.succeeded)
+
+		return _report
+	
+
+class PropertyGroupTrie():
+	"""
+	Index of properties by their group path, e.g. (BUILTIN_GROUP_NAME, "IdAndCategories") or ("Test Group", ).
+
+	find() returns every property in a group and all of its sub-groups, matching whole group names only,
+	so "Test" does not match "Test Group".
+	Each property is stored with its index in the catalogue, so that find() can return them in catalogue order.
+	"""
+
+	def __init__(self):
+		self.children = {}
+		self.children_lower = {}
+		self.properties = []		# (index, property)
+		self.count = 0
+
+	def add(
+		self,
+		group_name:Iterable[str],
+		property:Any,
+		index:int=None,
 	):
 		"""
-		Push data to ArchiCAD.
+		Add property under group_name; index is its position in the catalogue, defaulting to the order of add() calls.
 		"""
-		_element_property_values = self.element_property_values()
+		if (index is None):
+			index = self.count
+		self.count += 1
 
-		
-		return connector.commands.SetPropertyValuesOfElements(
-			_element_property_values
+		_node = self
+
+		for _name in group_name:
+			if (_name not in _node.children):
+				_child = type(self)()
+				_node.children[_name] = _child
+				_node.children_lower.setdefault(_name.lower(), []).append(_child)
+
+			_node = _node.children[_name]
+
+		_node.properties.append((index, property))
+
+	def iter_properties(self)->Generator[Tuple[int, Any], None, None]:
+		"""
+		Yield (index, property) of every property in this group and its sub-groups, depth first.
+		"""
+		yield from self.properties
+
+		for _child in self.children.values():
+			yield from _child.iter_properties()
+
+	def find_nodes(
+		self,
+		parts:List[str],
+		case_sensitive:bool=True,
+	)->List["PropertyGroupTrie"]:
+		"""
+		Nodes matching parts - group names split on "."; as group names can themselves contain ".",
+		every way of joining consecutive parts back is tried.
+		"""
+		if (not parts):
+			return [self, ]
+
+		_nodes = []
+
+		for _length in range(1, len(parts)+1):
+			_name = ".".join(parts[:_length])
+
+			if (case_sensitive):
+				_children = [ self.children[_name], ] if (_name in self.children) else []
+			else:
+				_children = self.children_lower.get(_name.lower(), [])
+
+			for _child in _children:
+				_nodes += _child.find_nodes(parts[_length:], case_sensitive=case_sensitive)
+
+		return _nodes
+
+	def find(
+		self,
+		group_name:Union[str, Iterable[Union[str, None]]],
+		case_sensitive:bool=True,
+	)->List[Any]:
+		"""
+		Properties in group_name and its sub-groups, in catalogue order.
+
+		group_name is either a str of group names joined by ".", or a tuple/list of group names;
+		None as the first group name stands for BUILTIN_GROUP_NAME.
+		"""
+		if (isinstance(group_name, (tuple, list))):
+			_parts = list(group_name)
+			if (_parts and _parts[0] is None):
+				_parts[0] = BUILTIN_GROUP_NAME
+		else:
+			_parts = group_name.split(".") if (group_name) else []
+
+		_found = {}
+
+		for _node in self.find_nodes(_parts, case_sensitive=case_sensitive):
+			for _index, _property in _node.iter_properties():
+				_found.setdefault(_index, _property)
+
+		return [ _found[_index] for _index in sorted(_found) ]
+
+class PropertyRegistry():
+	"""
+	Bidirectional map of column name, PropertyUserId and PropertyId for one session.
+
+	Column names and user ids are derived locally and memoised; PropertyIds are fetched only for user ids
+	not seen before, in one batched GetPropertyIds call per resolve().
+	"""
+
+	def __init__(
+		self,
+		connection:"connection",
+	):
+		self.connection = connection
+		self.columns_by_userid = {}		# userid_key(): column name
+		self.userids = {}				# column name: PropertyUserId
+		self.property_ids = {}			# column name: PropertyId
+		self.columns_by_property_id = {}	# PropertyId guid: column name
+		self.lock = threading.Lock()
+
+	@staticmethod
+	def userid_key(
+		property_userid:Any,
+	)->tuple:
+		_name = getattr(property_userid, "localizedName", None)
+
+		if (_name is not None):
+			return ("UserDefined", tuple(_name))
+		else:
+			return ("BuiltIn", property_userid.nonLocalizedName)
+
+	def column_name(
+		self,
+		property_userid:Any,
+	)->str:
+		_key = self.userid_key(property_userid)
+		_column = self.columns_by_userid.get(_key, None)
+
+		if (_column is None):
+			_column = self.connection.build_property_column_name(property_userid)
+			self.columns_by_userid[_key] = _column
+			self.userids.setdefault(_column, property_userid)
+
+		return _column
+
+	def userid(
+		self,
+		column_name:str,
+	)->Any:
+		_userid = self.userids.get(column_name, None)
+
+		if (_userid is None):
+			_userid = self.connection.build_property_userid(column_name)
+			self.userids[column_name] = _userid
+			self.columns_by_userid.setdefault(self.userid_key(_userid), column_name)
+
+		return _userid
+
+	def column_name_of_property_id(
+		self,
+		property_id:Any,
+	)->Union[str, None]:
+		return self.columns_by_property_id.get(property_id.guid, None)
+
+	def resolve(
+		self,
+		property_userids:Iterable[Any],
+	)->List[Any]:
+		"""
+		PropertyId of each of property_userids, calling GetPropertyIds only for those not resolved before.
+
+		A user id ArchiCAD cannot resolve gets the error item returned by GetPropertyIds instead, and is not memoised;
+		one missing from the reply of GetPropertyIds altogether gets ACPropertyNotResolved.
+		"""
+		_columns = [ self.column_name(_userid) for _userid in property_userids ]
+
+		with self.lock:
+			_unknown = list(dict.fromkeys(_column for _column in _columns if _column not in self.property_ids))
+			_errors = {}
+
+			if (_unknown):
+				for _column, _item in zip(
+					_unknown,
+					self.connection.commands.GetPropertyIds([ self.userids[_column] for _column in _unknown ]),
+				):
+					_property_id = getattr(_item, "propertyId", None)
+
+					if (_property_id is None):
+						_errors[_column] = _item
+					else:
+						self.property_ids[_column] = _property_id
+						self.columns_by_property_id[_property_id.guid] = _column
+
+		return [
+			self.property_ids.get(_column, None) or \
+				_errors.get(_column, None) or \
+				ACPropertyNotResolved(f"GetPropertyIds returned nothing for {_column}.") \
+					for _column in _columns
+		]
+
+class PropertyPushReport():
+	"""
+	Results of connection.push_property_values(), mapped back to the cell each ElementPropertyValue came from.
+
+	results holds, for each cell, the last ExecutionResult received - or the Exception raised by the batch it was in.
+	"""
+	def __bool__(self):
+		return not self.failed
+	__nonzero__ = __bool__
+
+	def __init__(
+		self,
+		cells:List[Any],
+		results:List[Any],
+		attempts:List[int],
+		duration:float,
+	):
+		self.cells = cells
+		self.results = results
+		self.attempts = attempts
+		self.duration = duration
+
+	def __repr__(
+		self,
+	):
+		return f"{type(self).__name__}(cells={len(self.cells):d}, failed={len(self.failed):d}, retried={sum(_attempts > 1 for _attempts in self.attempts):d}, duration={self.duration:.2f})"
+
+	@staticmethod
+	def is_success(
+		result:Any,
+	)->bool:
+		return getattr(result, "success", False) is True
+
+	@property
+	def succeeded(self)->List[Any]:
+		return [ _cell for _cell, _result in zip(self.cells, self.results) if self.is_success(_result) ]
+
+	@property
+	def failed(self)->Dict[Any, Any]:
+		"""
+		{cell: result} of the cells that were not set.
+		"""
+		return { _cell:_result for _cell, _result in zip(self.cells, self.results) if not self.is_success(_result) }
+
+	def summary(
+		self,
+	)->Dict[Tuple[Union[int, None], str], int]:
+		"""
+		Count of cells by (error code, message); see connection.summarise_transaction_results().
+		"""
+		return connector.summarise_transaction_results(self.results)
+
+	def to_dataframe(
+		self,
+	)->pd.DataFrame:
+		"""
+		One row per cell: index, column, success, code, message, attempts.
+		"""
+		_rows = []
+
+		for _cell, _result, _attempts in zip(self.cells, self.results, self.attempts):
+			_index, _column = _cell if (isinstance(_cell, tuple)) else (_cell, None)
+			_code, _message = connector.transaction_result_key(_result)
+			_rows.append((_index, _column, self.is_success(_result), _code, _message, _attempts))
+
+		return pd.DataFrame(
+			_rows,
+			columns=["index", "column", "success", "code", "message", "attempts"],
 		)
-	
+
+class CommandsHeartbeat():
+	"""
+	Thin wrapper around archicad Commands, for connection.commands.
+
+	Every command that returns is a heartbeat of the connection; every command that raises forgets the last heartbeat,
+	whatever the Exception - Graphisoft has changed their Exception classes before.
+	"""
+	def __bool__(self):
+		return bool(self.commands)
+	__nonzero__ = __bool__
+
+	def __init__(
+		self,
+		connection:"connection",
+		commands:Any,
+	):
+		self.connection = connection
+		self.commands = commands
+
+	def __getattr__(
+		self,
+		name:str,
+	)->Any:
+		_command = getattr(self.commands, name)
+
+		if (not callable(_command)):
+			return _command
+
+		@functools.wraps(_command)
+		def _call(*args, **kwargs):
+			try:
+				_return = _command(*args, **kwargs)
+			except Exception as e: # bad practice - but necessary for futureproofing against Graphisoft changing their Exception classes again!!
+				self.connection.forget_heartbeat()
+				raise
+
+			self.connection.heartbeat()
+			return _return
+
+		return _call
 
 class connection():
 	"""
@@ -378,7 +874,31 @@ class connection():
 	_instance = None
 
 	handle = None
-	commands = archicad.Commands
+	property_catalogue = None
+	property_trie = None
+	_property_registry = None
+	_value_handlers = None
+	_value_handlers_types = None
+
+	# Seconds a successful IsAlive or command is trusted for, before alive_only checks again
+	alive_ttl = 2.0
+	_alive_until = 0.0
+
+	# Block sizes and concurrency of fetch_property_values()
+	fetch_element_chunk_size = 2000
+	fetch_property_chunk_size = 50
+	fetch_workers = 4
+
+	# Batch size, concurrency and retries of failed cells of push_property_values();
+	# only cells failed by one of push_retry_exceptions, or with one of push_retry_codes, are retried.
+	push_chunk_size = 2000
+	push_workers = 4
+	push_retries = 2
+	push_retry_exceptions = (OSError, http.client.HTTPException)	# transport: URLError, ConnectionError, timeouts, dropped replies
+	push_retry_codes = frozenset()	# ArchiCAD error codes of transient failures; none are known to be by default
+
+	_commands = archicad.Commands
+	_commands_heartbeat = None
 	types = archicad.Types
 	utilities = archicad.Utilities
 
@@ -398,6 +918,7 @@ class connection():
 	def __init__(self):
 		if (not self.alive):
 			self.handle = ACConnection.connect()
+			self.invalidate_cache()
 
 		if (not self.handle):
 				# Testing NOT handling this
@@ -413,6 +934,20 @@ class connection():
 		if (not(self.alive)):
 			return ACConnection.connect()
 
+	@property
+	def commands(self)->"CommandsHeartbeat":
+		"""
+		Commands of the connected ArchiCAD, wrapped so that every command answered is a heartbeat - see alive_cached.
+		"""
+		if (self._commands_heartbeat is None or self._commands_heartbeat.commands is not self._commands):
+			self._commands_heartbeat = CommandsHeartbeat(self, self._commands)
+
+		return self._commands_heartbeat
+
+	@commands.setter
+	def commands(self, commands:Any):
+		self._commands = commands
+
 	@property
 	def version(self):
 		return self.commands.GetProductInfo()
@@ -432,34 +967,112 @@ class connection():
 	@property
 	def alive(self):
 		try:
-			return self.commands.IsAlive() if self.commands else False
+			_alive = self.commands.IsAlive() if self.commands else False
 		except Exception as e: # bad practice - but necessary for futureproofing against Graphisoft changing their Exception classes again!!
-			return False
+			_alive = False
+
+		self._alive_until = timer.perf_counter() + self.alive_ttl if (_alive) else 0.0
+
+		return _alive
+
+	@property
+	def alive_cached(self):
+		"""
+		Same as alive, but only calls IsAlive if nothing has been heard from ArchiCAD for alive_ttl seconds.
+		"""
+		if (timer.perf_counter() < self._alive_until):
+			return True
+
+		return self.alive
+
+	def heartbeat(self):
+		"""
+		Record that ArchiCAD just answered a command.
+		"""
+		self._alive_until = timer.perf_counter() + self.alive_ttl
+
+	def forget_heartbeat(self):
+		"""
+		Make the next alive_cached call IsAlive again.
+		"""
+		self._alive_until = 0.0
 
 	def alive_only(func):
+		"""
+		Only run func if ArchiCAD is alive, as per alive_cached.
+
+		Heartbeats are recorded by commands itself - see CommandsHeartbeat - so a call answered from the cache does not count.
+		"""
+		@functools.wraps(func)
 		def wrapper(self, *args, **kwargs):
-			if (self.alive):
+			if (self.alive_cached):
 				return func(self, *args, **kwargs)
 			else:
 				return ACConnectionFailed(f"Connecion to ArchiCAD failed: ACConnection returned [{repr(self.handle)}].")
 
 		return wrapper
 
+	def invalidate_cache(self):
+		"""
+		Forget everything cached for this session.
+
+		Call this after properties are added, renamed or deleted in ArchiCAD; reconnecting does it automatically.
+		"""
+		self.property_catalogue = None
+		self.property_trie = None
+		self._property_registry = None
+
+	@property
+	def property_registry(self)->PropertyRegistry:
+		"""
+		PropertyRegistry of this session; see invalidate_cache().
+		"""
+		if (self._property_registry is None):
+			self._property_registry = PropertyRegistry(self)
+
+		return self._property_registry
+
+	@alive_only
+	def get_property_catalogue(
+		self,
+	)->List[Tuple[tuple, tuple, archicad.Types.PropertyUserId]]:
+		"""
+		All available Properties as a list of (group_name:tuple, property_name:tuple, property:archicad.Types.PropertyUserId).
+
+		GetAllPropertyNames is only called once per session; see invalidate_cache().
+		"""
+		if (self.property_catalogue is None):
+			_catalogue = [
+				(*self.property_names(_property), _property) for _property in self.commands.GetAllPropertyNames()
+			]
+
+			_trie = PropertyGroupTrie()
+			for _index, (_group_name, _property_name, _property) in enumerate(_catalogue):
+				_trie.add(_group_name, _property, index=_index)
+
+			self.property_catalogue, self.property_trie = _catalogue, _trie
+
+		return self.property_catalogue
+
 	@alive_only
 	def iter_properties(
 		self,
-	)->Generator[
-		Tuple[tuple, str, archicad.Types.PropertyUserId],
-		None,
-		None
+	)->Union[
+		Iterable[Tuple[tuple, str, archicad.Types.PropertyUserId]],
+		ACConnectionFailed,
 	]:
 		"""
-		Generator to iterate through all available Properties.
+		Iterator through all available Properties.
 		Yields group_name:tuple, property_name:str, property:archicad.Types.PropertyUserId:
+
+		Returns the error instead if the catalogue cannot be fetched.
 		"""
+		_catalogue = self.get_property_catalogue()
 
-		for _property in self.commands.GetAllPropertyNames():
-			yield (*self.property_names(_property), _property)
+		if (isinstance(_catalogue, Exception)):
+			return _catalogue
+
+		return iter(_catalogue)
 
 	def property_names(
 		self,
@@ -479,15 +1092,21 @@ class connection():
 
 		return _group_name, _property_name
 
-	def property_column_name(
+	def build_property_column_name(
 		self,
 		property:Any,
-	):
+	)->str:
 		_group_name, _property_name = self.property_names(property)
 
 		return f"{PROPERTY_BRANCH_DELIMITER.join(_group_name)}{GROUP_PROPERTY_SEPARATOR}{PROPERTY_BRANCH_DELIMITER.join(_property_name)}"
 
-	def get_property_userid_from_column_name(
+	def property_column_name(
+		self,
+		property:Any,
+	)->str:
+		return self.property_registry.column_name(property)
+
+	def build_property_userid(
 		self,
 		property_column_name:str,
 	):
@@ -509,53 +1128,62 @@ class connection():
 				]
 			)
 
+	def get_property_userid_from_column_name(
+		self,
+		property_column_name:str,
+	):
+		return self.property_registry.userid(property_column_name)
+
 	@alive_only
 	def find_properties_userid_by_group(
 		self,
-		group_name:Union[None, str] = None,
+		group_name:Union[None, str, Iterable[Union[str, None]]] = None,
 		case_sensitive:bool = True,
 	):
 		"""
 		Find Properties user ID by Group Name
-		Yields List[archicad.Types.PropertyUserId]
+		Returns an iterator of archicad.Types.PropertyUserId, or the error if the catalogue cannot be fetched.
+
+		group_name can be a str with groups separated by ".", or a tuple such as (None, "IdAndCategories")
+		where None stands for BUILTIN_GROUP_NAME; properties in sub-groups are included.
+		Matching is done on the cached catalogue - see get_property_catalogue().
 
 		Use find_properties_id_by_group() instead for GetPropertyValuesOfElements().
 		"""
-		if (isinstance(group_name, (tuple, list))):
-			if (len(group_name) > 0):
-				group_name = list(group_name)
-				if (group_name[0]) is None:
-					group_name[0] = BUILTIN_GROUP_NAME
-					group_name = ".".join(group_name)
-				else:
-					group_name = ""
+		_properties = self.find_properties_userid_by_groups([group_name, ], case_sensitive=case_sensitive)
 
-		if (group_name is None):
-			group_name = BUILTIN_GROUP_NAME
+		if (isinstance(_properties, Exception)):
+			return _properties
 
-		str_eq = self.str_compare(case_sensitive=case_sensitive)
+		return iter(_properties)
+
+	@alive_only
+	def find_properties_userid_by_groups(
+		self,
+		group_names:Iterable[Union[None, str, Iterable[Union[str, None]]]],
+		case_sensitive:bool = True,
+	)->List[archicad.Types.PropertyUserId]:
+		"""
+		find_properties_userid_by_group() for many groups at once, without duplicates, in the order of group_names.
+		"""
+		_catalogue = self.get_property_catalogue()
 
-		for _group_name, _property_name, _property in self.iter_properties():
-			"""
-			Currently this is a pretty bad matching -
-			It is a simple string comparison using . as separators.
-			If the requested group_name is same as _joint_group_name, it is deemed to match
-			If the requested group_name is shorter than _joint_group_name, and the next character is a separator, it is deemed to match
-			Otherwise its not a match.
+		if (isinstance(_catalogue, Exception)):
+			return _catalogue
 
-			TODO this probably needs to be rewritten to an iterable match
-			"""
+		_properties = []
+		_seen = set()
 
-			_joint_group_name = ".".join(_group_name)
-			if (str_eq(_joint_group_name[:len(group_name)], group_name) or \
-				group_name == ""
+		for _group_name in group_names:
+			for _property in self.property_trie.find(
+				BUILTIN_GROUP_NAME if (_group_name is None) else _group_name,
+				case_sensitive=case_sensitive,
 			):
+				if (id(_property) not in _seen):
+					_seen.add(id(_property))
+					_properties.append(_property)
 
-				if (0 < len(group_name) < len(_joint_group_name)):
-					if (_joint_group_name[len(group_name):len(group_name)+1] != "."):
-						continue
-
-				yield _property
+		return _properties
 
 	@alive_only
 	def find_properties_id_by_group(
@@ -569,13 +1197,30 @@ class connection():
 
 		Use find_properties_id_by_group() instead for GetPropertyValuesOfElements().
 		"""
-		return self.get_property_id_by_property_user_id(self.find_properties_userid_by_group(group_name, case_sensitive=case_sensitive))
+		_properties = self.find_properties_userid_by_group(group_name, case_sensitive=case_sensitive)
+
+		if (isinstance(_properties, Exception)):
+			return _properties
+
+		return self.get_property_id_by_property_user_id(_properties)
 
 	def get_property_id_by_property_user_id(
 		self,
 		property_userid:Iterable[archicad.Types.PropertyUserId],
 	):
-		return self.commands.GetPropertyIds(list(property_userid))
+		return [
+			self.types.PropertyIdArrayItem(_property_id) if (isinstance(_property_id, self.types.PropertyId)) else _property_id \
+				for _property_id in self.resolve_property_ids(property_userid)
+		]
+
+	def resolve_property_ids(
+		self,
+		property_userids:Iterable[archicad.Types.PropertyUserId],
+	)->List[archicad.Types.PropertyId]:
+		"""
+		PropertyId of each of property_userids, through the session's PropertyRegistry.
+		"""
+		return self.property_registry.resolve(property_userids)
 
 	@alive_only
 	def iter_classifications(
@@ -742,6 +1387,109 @@ class connection():
 			for _element in _elements:
 				yield _element
 
+	@property
+	def value_handlers(self)->Dict[type, Tuple[Callable, Callable]]:
+		"""
+		Lookup table of {property value type: (decode, unpack)}, built once per set of self.types:
+		- decode(property_value) returns the human readable value;
+		- unpack(property_value) returns the "value" of its PropertyValue - see unpack_property_value().
+		"""
+		if (self._value_handlers_types is not self.types):
+			_decode = self.decode_property_value
+			_unpack = self.unpack_property_value
+
+			def _unpack_multi_enum(property_value):
+				_listvalues = [ _unpack(_listitem) for _listitem in property_value.value ]
+
+				if (len(_listvalues) > 0):
+					_value = _listvalues[0]
+					_value.value = [
+						_listvalue.value for _listvalue in _listvalues
+					]
+					return _value
+				else:
+					return []
+
+			_handlers = {}
+
+			for _type in (
+				self.types.NotAvailablePropertyValue,
+				self.types.NotEvaluatedPropertyValue,
+				self.types.UserUndefinedPropertyValue,
+			):
+				_handlers[_type] = (lambda property_value: None, lambda property_value: None)
+
+			_handlers[self.types.NormalSingleEnumPropertyValue] = (
+				lambda property_value: _decode(property_value.value),
+				lambda property_value: _unpack(property_value.value),
+			)
+			_handlers[self.types.NormalMultiEnumPropertyValue] = (
+				lambda property_value: [ _decode(_listitem) for _listitem in property_value.value ],
+				_unpack_multi_enum,
+			)
+			_handlers[self.types.EnumValueIdWrapper] = (
+				lambda property_value: _decode(property_value.enumValueId),
+				lambda property_value: _unpack(property_value.enumValueId),
+			)
+			_handlers[self.types.NonLocalizedValueEnumId] = (operator.attrgetter("nonLocalizedValue"), ) * 2
+			_handlers[self.types.DisplayValueEnumId] = (operator.attrgetter("displayValue"), ) * 2
+
+			for _type in (
+				self.types.NormalAngleListPropertyValue,
+				self.types.NormalAnglePropertyValue,
+				self.types.NormalAreaListPropertyValue,
+				self.types.NormalAreaPropertyValue,
+				self.types.NormalBooleanListPropertyValue,
+				self.types.NormalBooleanPropertyValue,
+				self.types.NormalIntegerListPropertyValue,
+				self.types.NormalIntegerPropertyValue,
+				self.types.NormalLengthListPropertyValue,
+				self.types.NormalLengthPropertyValue,
+				self.types.NormalNumberListPropertyValue,
+				self.types.NormalNumberPropertyValue,
+				self.types.NormalStringListPropertyValue,
+				self.types.NormalStringPropertyValue,
+				self.types.NormalVolumeListPropertyValue,
+				self.types.NormalVolumePropertyValue,
+			):
+				_handlers[_type] = (operator.attrgetter("value"), ) * 2
+
+			self._value_handlers, self._value_handlers_types = _handlers, self.types
+
+		return self._value_handlers
+
+	def value_handler(
+		self,
+		property_value:Any,
+	)->Tuple[Callable, Callable]:
+		_handlers = self.value_handlers
+		_handler = _handlers.get(type(property_value), None)
+
+		if (_handler is None):
+			# Subclasses of a known type share its handlers
+			for _type, _candidate in _handlers.items():
+				if (isinstance(property_value, _type)):
+					_handler = _handlers[type(property_value)] = _candidate
+					break
+			else:
+				raise RuntimeError(f"Unexpected Property Value Type {type(property_value)} encountered: author of module needs to add type to function!")
+
+		return _handler
+
+	def decode_property_value(
+		self,
+		property_value_wrapper:Union[
+			archicad.Types.PropertyValueWrapper,
+			archicad.Types.EnumValueId,
+		]
+	)->Any:
+		"""
+		Human readable value of a property value, without building the PropertyValue of unpack_property_value().
+		"""
+		_property_value = getattr(property_value_wrapper, "propertyValue", property_value_wrapper)
+
+		return self.value_handler(_property_value)[0](_property_value)
+
 	def get_property_value(
 		self,
 		property_value_wrapper:archicad.Types.PropertyValueWrapper
@@ -751,14 +1499,7 @@ class connection():
 
 		It could be hidden inside nested Wrappers in case of Enums etc; hence this function.
 		"""
-
-		_unpacked_property = self.unpack_property_value(
-			property_value_wrapper
-		)
-
-		_value = _unpacked_property.value
-
-		return _value
+		return self.decode_property_value(property_value_wrapper)
 
 	def unpack_property_value(
 		self,
@@ -785,8 +1526,6 @@ class connection():
 			# This function calls itself if an Enum value is found, so property_value_wrapper can be unwrapped.
 			_property_value = property_value_wrapper
 
-		_type = type(_property_value)
-
 		_typical_args = (
 			# "value",
 			# "nonLocalizedValue",
@@ -800,120 +1539,77 @@ class connection():
 			if (_attr := getattr(_property_value, _arg, None)):
 				_args[_arg] = _attr
 
-		if (isinstance(_property_value, (
-			self.types.NotAvailablePropertyValue,
-			self.types.NotEvaluatedPropertyValue,
-			self.types.UserUndefinedPropertyValue,
-		))):
-			_value = None
-
-		elif (isinstance(_property_value, (
-			self.types.NormalSingleEnumPropertyValue,
-		))):
-			_value = self.unpack_property_value(
-				_property_value.value
-			)
-
-		elif (isinstance(_property_value, (
-			self.types.NormalMultiEnumPropertyValue,
-		))):
-			_listvalues = [
-				self.unpack_property_value(
-					_listitem
-				) for _listitem in _property_value.value
-			]
-
-			if (len(_listvalues) > 0):
-				_value = _listvalues[0]
-				_value.value = [
-					_listvalue.value for _listvalue in _listvalues
-				]
-			else:
-				_value = []
-
-		elif (isinstance(_property_value, (
-			self.types.EnumValueIdWrapper,
-		))):
-			_value = self.unpack_property_value(
-				_property_value.enumValueId
-			)
-
-		elif (isinstance(_property_value, (
-			self.types.NonLocalizedValueEnumId,
-		))):
-			_value = _property_value.nonLocalizedValue
-
-		elif (isinstance(_property_value, (
-			self.types.DisplayValueEnumId,
-		))):
-			_value = _property_value.displayValue
-
-		elif (isinstance(_property_value, (
-			self.types.NormalAngleListPropertyValue,
-			self.types.NormalAnglePropertyValue,
-			self.types.NormalAreaListPropertyValue,
-			self.types.NormalAreaPropertyValue,
-			self.types.NormalBooleanListPropertyValue,
-			self.types.NormalBooleanPropertyValue,
-			self.types.NormalIntegerListPropertyValue,
-			self.types.NormalIntegerPropertyValue,
-			self.types.NormalLengthListPropertyValue,
-			self.types.NormalLengthPropertyValue,
-			self.types.NormalNumberListPropertyValue,
-			self.types.NormalNumberPropertyValue,
-			self.types.NormalStringListPropertyValue,
-			self.types.NormalStringPropertyValue,
-			self.types.NormalVolumeListPropertyValue,
-			self.types.NormalVolumePropertyValue,
-		))):
-			_value = _property_value.value
-		else:
-			raise RuntimeError("Unexpected Property Value Type {_type} encountered: author of module needs to add type to function!")
-
 		return PropertyValue({
-			"constructor": _type,
-			"value": _value,
+			"constructor": type(_property_value),
+			"value": self.value_handler(_property_value)[1](_property_value),
 			"args": _args,
 		})
 
-	def property_value_wrapper_to_records(
+	def decode_property_values(
 		self,
-		elements_ids:List[archicad.Types.ElementId],
-		property_userids:List[archicad.Types.PropertyId],
+		element_ids:List[archicad.Types.ElementId],
+		property_userids:List[archicad.Types.PropertyUserId],
 		wrapper:archicad.Types.PropertyValuesWrapper,
-	)->List[Dict[str,Any]]:
-
-		"""
-		Map a PropertyValuesWrapper from GetPropertyValuesOfElements to List[ElementId] and List[PropertyId] to create records.
+	)->Tuple[list, Dict[str, list], Dict[str, PropertyValue]]:
 		"""
+		Decode the property values of each element into columns, in one pass over the cells.
 
-		_records = []
+		wrapper is a PropertyValuesWrapper from GetPropertyValuesOfElements, or the lists assembled by fetch_property_values().
+		Returns (GUIDs, {column name: values}, {column name: PropertyValue}).
+
+		The PropertyValue of a column is taken from its first cell with a value; until one is found, every cell is
+		unpacked in full and its value taken from there, so no cell is decoded twice.
+		"""
+		_columns = [ self.property_column_name(_property_userid) for _property_userid in property_userids ]
+		_guids = []
+		_data = [ [] for _ in _columns ]
 		_type_map = {}
+		_settled = [ False for _ in _columns ]
 
-		for _element_id, _property_values in zip(elements_ids, wrapper):
-			# Element Level
+		_handlers = self.value_handlers
+		_unpack = self.unpack_property_value
+		_decode = self.decode_property_value
 
-			_record = {
-				GUID_COLUMN_NAME:_element_id.elementId.guid,
-			}
+		for _element_id, _property_values in zip(element_ids, wrapper):
+			_guids.append(_element_id.elementId.guid)
 
-			for _property_userid, _property_value in zip(property_userids, _property_values.propertyValues):
-				# Property Level
+			_col_id = -1
 
-				_key = self.property_column_name(_property_userid)
-				_value = self.get_property_value(_property_value)
+			for _col_id, _property_value in zip(range(len(_columns)), getattr(_property_values, "propertyValues", _property_values)):
+				if (_settled[_col_id]):
+					_property_value = getattr(_property_value, "propertyValue", _property_value)
+					_handler = _handlers.get(type(_property_value), None)
+					_data[_col_id].append(_handler[0](_property_value) if (_handler) else _decode(_property_value))
+				else:
+					_type = _unpack(_property_value)
+					_type_map[_columns[_col_id]] = _type
+					_settled[_col_id] = bool(_type["value"])
+					_data[_col_id].append(_type.value)
 
-				if (not _type_map[_key]["value"] if (_type_map.get(_key, None)) else True):
-					_type = self.unpack_property_value(_property_value)
-					# del (_type["value"])
+			# Short rows are padded, as missing keys of records would be
+			for _col_id in range(_col_id+1, len(_columns)):
+				_data[_col_id].append(None)
 
-					if (_type):
-						_type_map[_key] = _type
+		return _guids, { _column:_values for _column, _values in zip(_columns, _data) }, _type_map
 
-				_record[_key] = _value
+	def property_value_wrapper_to_records(
+		self,
+		elements_ids:List[archicad.Types.ElementId],
+		property_userids:List[archicad.Types.PropertyId],
+		wrapper:archicad.Types.PropertyValuesWrapper,
+	)->List[Dict[str,Any]]:
 
-			# Add to record at Element Level
-			_records.append(_record)
+		"""
+		Map a PropertyValuesWrapper from GetPropertyValuesOfElements to List[ElementId] and List[PropertyId] to create records.
+		"""
+		_guids, _columns, _type_map = self.decode_property_values(elements_ids, property_userids, wrapper)
+
+		_records = [
+			{
+				GUID_COLUMN_NAME:_guid,
+				**{ _column:_values[_row] for _column, _values in _columns.items() },
+			} for _row, _guid in enumerate(_guids)
+		]
 
 		return _records, _type_map
 
@@ -922,59 +1618,355 @@ class connection():
 		element_ids:List[archicad.Types.ElementId],
 		property_userids:List[archicad.Types.PropertyUserId],
 		wrapper:archicad.Types.PropertyValuesWrapper,
+		typed:bool=False,
 	)->ElementsPropertyValues:
 		"""
 		Map a PropertyValuesWrapper from GetPropertyValuesOfElementComponents to List[ElementId] and List[PropertyId] to create pandas DataFrame.
+
+		If typed, columns get the dtypes of typed_columns().
 		"""
 
-		_records, _type_map = self.property_value_wrapper_to_records(
-			elements_ids=element_ids,
+		_guids, _columns, _type_map = self.decode_property_values(
+			element_ids=element_ids,
 			property_userids=property_userids,
 			wrapper=wrapper
 		)
 
-		_df = ElementsPropertyValues.from_records(
-			data=_records,
-			# property_structure=_type_map,
-			index=GUID_COLUMN_NAME,
+		_df = ElementsPropertyValues(
+			self.typed_columns(_columns, _type_map) if (typed) else _columns,
+			index=pd.Index(_guids, name=GUID_COLUMN_NAME),
 		)
 
 		_df.property_structure = _type_map
+		_df.take_snapshot()
 
 		return _df
 
+	@staticmethod
+	def typed_column(
+		values:list,
+		structure:PropertyValue=None,
+		categories:list=None,
+	)->Union[list, np.ndarray, pd.api.extensions.ExtensionArray]:
+		"""
+		values as an array of the dtype in PROPERTY_DTYPES for the PropertyValue type in structure,
+		e.g. float64 for lengths, Int64 for integers, category for single enums;
+		the list itself if there is none, or the values do not fit it.
+
+		A single enum is only categorical if categories, the options of its property, are given;
+		values that are not among them are added.
+		Missing values become NaN / <NA>.
+		"""
+		_dtype = PROPERTY_DTYPES.get(structure["constructor"].__name__, None) if (structure) else None
+
+		try:
+			if (_dtype == "float64"):
+				return np.array(values, dtype=np.float64)
+			elif (_dtype == "category"):
+				if (categories is None):
+					return values
+				return pd.Categorical(
+					values,
+					categories=list(dict.fromkeys(list(categories) + [ _value for _value in values if _value is not None ])),
+				)
+			elif (_dtype):
+				return pd.array(values, dtype=_dtype)
+		except (TypeError, ValueError):
+			pass
+
+		return values
+
+	@alive_only
+	def get_property_enum_options(
+		self,
+		property_userids:List[archicad.Types.PropertyUserId],
+	)->List[Union[List[archicad.Types.PossibleEnumValue], None]]:
+		"""
+		Every option of each of property_userids, in one GetDetailsOfProperties call;
+		None for a property without options, or one that could not be looked up.
+		"""
+		_property_ids = self.get_property_id_by_property_user_id(property_userids)
+		_found = [ _id for _id, _property_id in enumerate(_property_ids) if isinstance(_property_id, self.types.PropertyIdArrayItem) ]
+		_options = [ None ]*len(_property_ids)
+
+		if (_found):
+			for _id, _definition in zip(
+				_found,
+				self.commands.GetDetailsOfProperties([ _property_ids[_id] for _id in _found ]),
+			):
+				_possible_values = getattr(getattr(_definition, "propertyDefinition", None), "possibleEnumValues", None)
+
+				if (_possible_values is not None):
+					_options[_id] = [ _possible_value.enumValue for _possible_value in _possible_values ]
+
+		return _options
+
+	def typed_columns(
+		self,
+		columns:Dict[str, list],
+		property_structure:Dict[str, PropertyValue],
+	)->Dict[str, Union[list, np.ndarray, pd.api.extensions.ExtensionArray]]:
+		"""
+		columns of values through typed_column(), for reading and analysis rather than editing:
+		a value of another type cannot be assigned to a typed column, e.g. 1.5 to an Int64 one.
+
+		The categories of single enum columns are all the options of their property, fetched with get_property_enum_options(),
+		so any option can be assigned; such a column stays a list if the options cannot be fetched.
+		"""
+		_enum_columns = [
+			_column for _column in columns \
+				if (property_structure.get(_column, None) and property_structure[_column]["constructor"] is self.types.NormalSingleEnumPropertyValue)
+		]
+		_categories = {}
+
+		if (_enum_columns):
+			_options = self.get_property_enum_options([ self.get_property_userid_from_column_name(_column) for _column in _enum_columns ])
+
+			if (not isinstance(_options, Exception)):
+				for _column, _column_options in zip(_enum_columns, _options):
+					if (_column_options is not None):
+						# Options in the form the values were decoded in
+						_enum_id = property_structure[_column]["value"]
+						_non_localized = isinstance(_enum_id, dict) and _enum_id.get("constructor", None) is self.types.NonLocalizedValueEnumId
+						_categories[_column] = [
+							_option.nonLocalizedValue if (_non_localized) else _option.displayValue for _option in _column_options
+						]
+
+		return {
+			_column:self.typed_column(
+				_values,
+				property_structure.get(_column, None),
+				categories=_categories.get(_column, None),
+			) for _column, _values in columns.items()
+		}
+
+	def apply_property_dtypes(
+		self,
+		df:ElementsPropertyValues,
+	)->ElementsPropertyValues:
+		"""
+		Cast the columns of df to the dtypes of typed_columns(), e.g. a frame fetched with typed=False, or after an apply().
+		"""
+		_df = ElementsPropertyValues(
+			self.typed_columns(
+				{
+					_column:[ None if (not isinstance(_value, (list, tuple)) and pd.isna(_value)) else _value for _value in df[_column].tolist() ] \
+						for _column in df.columns
+				},
+				df.property_structure,
+			),
+			index=df.index,
+		)
+
+		_df.property_structure = df.property_structure
+
+		return _df
+
+	@staticmethod
+	def chunks(
+		items:list,
+		size:int,
+	)->List[Tuple[int, list]]:
+		"""
+		Split items into (offset, block) of at most size items; one block if size is falsy.
+		"""
+		if (not size or size >= len(items)):
+			return [(0, items), ]
+
+		return [ (_offset, items[_offset:_offset+size]) for _offset in range(0, len(items), size) ]
+
+	@alive_only
+	def fetch_property_values(
+		self,
+		element_ids:List[archicad.Types.ElementId],
+		property_ids:List[archicad.Types.PropertyIdArrayItem],
+		element_chunk_size:int=None,
+		property_chunk_size:int=None,
+		workers:int=None,
+		show_progress:bool=False,
+	)->List[List[archicad.Types.PropertyValueOrErrorItem]]:
+		"""
+		GetPropertyValuesOfElements split into blocks of element_chunk_size elements by property_chunk_size properties,
+		sent over a pool of workers threads, so that no single request is large enough to stall ArchiCAD.
+
+		Defaults to fetch_element_chunk_size, fetch_property_chunk_size and fetch_workers of this connection.
+		Returns the property values of each element, in the order of element_ids and property_ids.
+		"""
+		element_ids = list(element_ids)
+		property_ids = list(property_ids)
+
+		_element_chunks = self.chunks(element_ids, element_chunk_size or self.fetch_element_chunk_size)
+		_property_chunks = self.chunks(property_ids, property_chunk_size or self.fetch_property_chunk_size)
+
+		_values = [ [None]*len(property_ids) for _ in element_ids ]
+
+		def _fetch(block):
+			(_element_offset, _elements), (_property_offset, _properties) = block
+			return _element_offset, _property_offset, self.commands.GetPropertyValuesOfElements(_elements, _properties)
+
+		_blocks = [ (_elements, _properties) for _elements in _element_chunks for _properties in _property_chunks ]
+
+		with ThreadPoolExecutor(max_workers=min(workers or self.fetch_workers, len(_blocks))) as _executor:
+			for _element_offset, _property_offset, _wrapper in tqdm(
+				_executor.map(_fetch, _blocks),
+				total=len(_blocks),
+				desc="Fetching property values",
+				disable=not show_progress,
+			):
+				for _row, _property_values in enumerate(_wrapper, start=_element_offset):
+					_values[_row][_property_offset:_property_offset+len(_property_values.propertyValues)] = _property_values.propertyValues
+
+		return _values
+
 	@alive_only
 	def get_element_property_dataframe(
 		self,
 		element_ids:List[archicad.Types.ElementId],
 		property_userids:List[archicad.Types.PropertyUserId],
+		element_chunk_size:int=None,
+		property_chunk_size:int=None,
+		workers:int=None,
+		typed:bool=False,
+		show_progress:bool=False,
 	)->ElementsPropertyValues:
-		property_ids = self.commands.GetPropertyIds(property_userids)
+		"""
+		Fetch property_userids of element_ids into ElementsPropertyValues; see fetch_property_values() for the chunking.
+
+		Columns are left as pandas makes them of the values, so they can be edited freely;
+		if typed, they get the more compact dtypes of typed_columns() instead.
+		"""
+		element_ids = list(element_ids)
+		property_userids = list(property_userids)
+		property_ids = self.get_property_id_by_property_user_id(property_userids)
 
 		return self.property_value_wrapper_to_dataframe(
 			element_ids,
 			property_userids,
-			self.commands.GetPropertyValuesOfElements(
+			self.fetch_property_values(
 				element_ids,
 				property_ids,
+				element_chunk_size=element_chunk_size,
+				property_chunk_size=property_chunk_size,
+				workers=workers,
+				show_progress=show_progress,
 			),
+			typed=typed,
 		)
 
+	@alive_only
+	def push_property_values(
+		self,
+		element_property_values:List[archicad.Types.ElementPropertyValue],
+		cells:List[Any]=None,
+		chunk_size:int=None,
+		workers:int=None,
+		retries:int=None,
+		retry_codes:Iterable[int]=None,
+		show_progress:bool=False,
+	)->PropertyPushReport:
+		"""
+		SetPropertyValuesOfElements split into batches of chunk_size values, sent over a pool of workers threads.
+
+		Each result is mapped back to its entry in cells - (element guid, property guid) if not given.
+		Only the values that failed transiently are sent again, up to retries times - see is_transient_push_result();
+		any other failure, e.g. a value of the wrong type, is reported after the first attempt.
+
+		Defaults to push_chunk_size, push_workers, push_retries and push_retry_codes of this connection.
+		"""
+		element_property_values = list(element_property_values)
+
+		if (cells is None):
+			cells = [
+				(str(_value.elementId.guid), str(_value.propertyId.guid)) for _value in element_property_values
+			]
+		else:
+			cells = list(cells)
+
+		if (len(cells) != len(element_property_values)):
+			raise ValueError(f"{len(cells)} cells given for {len(element_property_values)} ElementPropertyValue.")
+
+		chunk_size = chunk_size or self.push_chunk_size
+		retries = self.push_retries if (retries is None) else retries
+		retry_codes = self.push_retry_codes if (retry_codes is None) else frozenset(retry_codes)
+
+		_results = [None]*len(element_property_values)
+		_attempts = [0]*len(element_property_values)
+		_pending = list(range(len(element_property_values)))
+
+		def _push(block):
+			_offset, _positions = block
+			try:
+				return _positions, self.commands.SetPropertyValuesOfElements(
+					[ element_property_values[_position] for _position in _positions ]
+				)
+			except Exception as e:
+				return _positions, [e]*len(_positions)
+
+		_start = timer.perf_counter()
+
+		for _round in range(retries+1):
+			if (not _pending):
+				break
+
+			_blocks = self.chunks(_pending, chunk_size)
+
+			with ThreadPoolExecutor(max_workers=min(workers or self.push_workers, len(_blocks))) as _executor:
+				for _positions, _block_results in tqdm(
+					_executor.map(_push, _blocks),
+					total=len(_blocks),
+					desc="Pushing property values" if (not _round) else f"Retrying failed property values ({_round}/{retries})",
+					disable=not show_progress,
+				):
+					for _position, _result in zip(_positions, _block_results):
+						_results[_position] = _result
+						_attempts[_position] += 1
+
+			_pending = [ _position for _position in _pending if self.is_transient_push_result(_results[_position], retry_codes) ]
+
+		return PropertyPushReport(cells, _results, _attempts, timer.perf_counter() - _start)
+
+	def is_transient_push_result(
+		self,
+		result:Union[archicad.Types.ExecutionResult, Exception],
+		retry_codes:Iterable[int]=None,
+	)->bool:
+		"""
+		Whether a cell that failed with result may succeed if sent again:
+		if its batch raised one of push_retry_exceptions, or ArchiCAD failed it with one of retry_codes.
+		"""
+		if (isinstance(result, Exception)):
+			return isinstance(result, self.push_retry_exceptions)
+
+		_error = getattr(result, "error", None)
+
+		return (
+			not PropertyPushReport.is_success(result) and \
+			_error is not None and \
+			_error.code in (self.push_retry_codes if (retry_codes is None) else retry_codes)
+		)
+
+	def transaction_result_key(
+		self,
+		result:Union[archicad.Types.ExecutionResult, Exception],
+	)->Tuple[Union[int, None], str]:
+		"""
+		(code, message) of an ExecutionResult; (0, "Success") if successful, (None, exception) if the request raised.
+		"""
+		if (isinstance(result, self.types.SuccessfulExecutionResult)):
+			return 0, "Success"
+		elif (isinstance(result, Exception)):
+			return None, f"{type(result).__name__}: {result}"
+		else:
+			return result.error.code, result.error.message
+
 	def summarise_transaction_results(
 		self,
-		results:List[archicad.Types.ExecutionResult],
-	)->Dict[str, int]:
+		results:Union[List[archicad.Types.ExecutionResult], PropertyPushReport],
+	)->Dict[Tuple[Union[int, None], str], int]:
 		_summary = {}
 
-		for _result in results:
-			if (isinstance(_result, self.types.SuccessfulExecutionResult)):
-				_code = 0
-				_msg = "Success"
-			else:
-				_code = _result.error.code
-				_msg = _result.error.message
-
-			_key = (_code, _msg)
+		for _result in getattr(results, "results", results):
+			_key = self.transaction_result_key(_result)
 			_summary[_key] = _summary.get(_key, 0) + 1
 
 		return _summary
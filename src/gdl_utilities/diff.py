@@ -0,0 +1,317 @@
+import difflib
+import hashlib
+import os
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+from lxml import etree as ET
+
+from gdl_utilities.parse_params import GDLScriptType, iter_paths
+from gdl_utilities.threads import map_safely
+
+HEADER_SECTION = "header"
+
+_script_tags = { _kind.value for _kind in GDLScriptType }
+
+def element_signature(
+    node:ET.Element,
+)->str:
+    """
+    Text identifying the content of an element regardless of how it is indented:
+    one line of tag, sorted attributes and stripped text for the element and each of its descendants.
+    """
+    return "\n".join(
+        "".join(
+            [_node.tag, ] + [ f' {_key}="{_value}"' for _key, _value in sorted(_node.attrib.items()) ]
+        ) + f": {(_node.text or '').strip()}" \
+            for _node in node.iter(tag=ET.Element)
+    )
+
+def _hash(text:Union[str, bytes])->str:
+    if (isinstance(text, str)):
+        text = text.encode("UTF-8")
+    return hashlib.sha1(text).hexdigest()
+
+def parse_sections(
+    xml:bytes,
+)->Tuple[Dict[str, str], Dict[str, str], str]:
+    """
+    Split an XML into (scripts, parameters, header):
+    - scripts: {script section tag: script text};
+    - parameters: {parameter name: element_signature()};
+    - header: element_signature() of the <Symbol> attributes and every other section, including <ParamSectHeader>.
+    """
+    _root = ET.fromstring(xml, parser=ET.XMLParser(strip_cdata=False, huge_tree=True))
+
+    _scripts = {}
+    _parameters = {}
+    _header = [ "".join([_root.tag, ] + [ f' {_key}="{_value}"' for _key, _value in sorted(_root.attrib.items()) ]) ]
+
+    for _child in _root.iterchildren(tag=ET.Element):
+        if (_child.tag in _script_tags):
+            _scripts[_child.tag] = _child.text or ""
+        elif (_child.tag == "ParamSection"):
+            for _section_child in _child.iterchildren(tag=ET.Element):
+                if (_section_child.tag == "Parameters"):
+                    for _parameter in _section_child.iterchildren(tag=ET.Element):
+                        _parameters[_parameter.get("Name", "")] = element_signature(_parameter)
+                else:
+                    _header.append(element_signature(_section_child))
+        else:
+            _header.append(element_signature(_child))
+
+    return _scripts, _parameters, "\n".join(_header)
+
+def file_hash(
+    path:str,
+)->str:
+    """
+    Hash of the raw bytes of a file.
+    """
+    with open(path, "rb") as _stream:
+        return _hash(_stream.read())
+
+def hash_sections(
+    xml:bytes,
+    sections:Tuple[Dict[str, str], Dict[str, str], str],
+)->Dict[str, Any]:
+    """
+    Content hashes of an XML, from its raw bytes and its parse_sections():
+    {
+        "file": hash of the raw bytes,
+        "header": hash of the header,
+        "scripts": {script section tag: hash},
+        "parameters": {parameter name: hash},
+    }
+    """
+    _scripts, _parameters, _header = sections
+
+    return {
+        "file":_hash(xml),
+        HEADER_SECTION:_hash(_header),
+        "scripts":{ _tag:_hash(_script) for _tag, _script in _scripts.items() },
+        "parameters":{ _name:_hash(_signature) for _name, _signature in _parameters.items() },
+    }
+
+def section_hashes(
+    path:str,
+)->Dict[str, Any]:
+    """
+    hash_sections() of the XML at path.
+    """
+    with open(path, "rb") as _stream:
+        _xml = _stream.read()
+
+    return hash_sections(_xml, parse_sections(_xml))
+
+class GDLPartDiff():
+    """
+    Differences of one library part between two versions of a library.
+
+    status is one of:
+    - "added" / "removed";
+    - "unchanged": the files are byte-identical;
+    - "resaved": the files differ, but every section hashes the same;
+    - "changed": see header_changed, scripts_changed and parameters_*; details holds the detailed differences.
+    """
+    def __bool__(self):
+        return self.status == "changed"
+    __nonzero__ = __bool__
+
+    def __init__(
+        self,
+        path:str,
+        status:str,
+        header_changed:bool=False,
+        scripts_changed:List[str]=None,
+        parameters_added:List[str]=None,
+        parameters_removed:List[str]=None,
+        parameters_changed:List[str]=None,
+    ):
+        self.path = path
+        self.status = status
+        self.header_changed = header_changed
+        self.scripts_changed = scripts_changed or []
+        self.parameters_added = parameters_added or []
+        self.parameters_removed = parameters_removed or []
+        self.parameters_changed = parameters_changed or []
+        self.details = {}
+
+    def __repr__(
+        self,
+    ):
+        return f"{type(self).__name__}(path={repr(self.path)}, status={repr(self.status)}, header_changed={self.header_changed}, scripts_changed={self.scripts_changed}, parameters_added={self.parameters_added}, parameters_removed={self.parameters_removed}, parameters_changed={self.parameters_changed})"
+
+def compare_hashes(
+    path:str,
+    old:Dict[str, Any],
+    new:Dict[str, Any],
+)->GDLPartDiff:
+    """
+    Compare the section_hashes() of two versions of a part.
+    """
+    if (old["file"] == new["file"]):
+        return GDLPartDiff(path, "unchanged")
+
+    _scripts_changed = [
+        _tag for _tag in sorted(set(old["scripts"]).union(new["scripts"])) \
+            if old["scripts"].get(_tag, None) != new["scripts"].get(_tag, None)
+    ]
+    _parameters_added = [ _name for _name in new["parameters"] if _name not in old["parameters"] ]
+    _parameters_removed = [ _name for _name in old["parameters"] if _name not in new["parameters"] ]
+    _parameters_changed = [
+        _name for _name in new["parameters"] \
+            if _name in old["parameters"] and old["parameters"][_name] != new["parameters"][_name]
+    ]
+    _header_changed = old[HEADER_SECTION] != new[HEADER_SECTION]
+
+    # Parameter order is not significant for ArchiCAD, so a reorder alone counts as resaved
+    _changed = _header_changed or _scripts_changed or _parameters_added or _parameters_removed or _parameters_changed
+
+    return GDLPartDiff(
+        path,
+        "changed" if (_changed) else "resaved",
+        header_changed=_header_changed,
+        scripts_changed=_scripts_changed,
+        parameters_added=_parameters_added,
+        parameters_removed=_parameters_removed,
+        parameters_changed=_parameters_changed,
+    )
+
+def diff_details(
+    diff:GDLPartDiff,
+    old_path:str,
+    new_path:str,
+    context:int=3,
+    old_sections:Tuple[Dict[str, str], Dict[str, str], str]=None,
+    new_sections:Tuple[Dict[str, str], Dict[str, str], str]=None,
+)->GDLPartDiff:
+    """
+    Fill diff.details for the sections whose hashes differ:
+    {
+        "scripts": {script section tag: unified diff},
+        "parameters": {parameter name: unified diff of element_signature()},
+        "header": unified diff of the header,
+    }
+
+    old_path and new_path are only parsed if their parse_sections() are not given as old_sections and new_sections.
+    """
+    if (old_sections is None):
+        with open(old_path, "rb") as _stream:
+            old_sections = parse_sections(_stream.read())
+    if (new_sections is None):
+        with open(new_path, "rb") as _stream:
+            new_sections = parse_sections(_stream.read())
+
+    _old_scripts, _old_parameters, _old_header = old_sections
+    _new_scripts, _new_parameters, _new_header = new_sections
+
+    diff.details["scripts"] = {
+        _tag:"".join(difflib.unified_diff(
+            _old_scripts.get(_tag, "").splitlines(keepends=True),
+            _new_scripts.get(_tag, "").splitlines(keepends=True),
+            fromfile=f"a/{diff.path}:{_tag}",
+            tofile=f"b/{diff.path}:{_tag}",
+            n=context,
+        )) for _tag in diff.scripts_changed
+    }
+
+    diff.details["parameters"] = {
+        _name:"".join(difflib.unified_diff(
+            (_old_parameters.get(_name, "") + "\n").splitlines(keepends=True) if (_name in _old_parameters) else [],
+            (_new_parameters.get(_name, "") + "\n").splitlines(keepends=True) if (_name in _new_parameters) else [],
+            fromfile=f"a/{diff.path}:{_name}",
+            tofile=f"b/{diff.path}:{_name}",
+            n=context,
+        )) for _name in diff.parameters_added + diff.parameters_removed + diff.parameters_changed
+    }
+
+    if (diff.header_changed):
+        diff.details[HEADER_SECTION] = "".join(difflib.unified_diff(
+            (_old_header + "\n").splitlines(keepends=True),
+            (_new_header + "\n").splitlines(keepends=True),
+            fromfile=f"a/{diff.path}:{HEADER_SECTION}",
+            tofile=f"b/{diff.path}:{HEADER_SECTION}",
+            n=context,
+        ))
+
+    return diff
+
+def _relative_paths(dir_path:str)->Dict[str, str]:
+    return {
+        os.path.relpath(_path, dir_path):_path for _path in iter_paths(dir_path, sub_directories=True, extensions=(".xml", ))
+    }
+
+def diff_libraries(
+    old_dir:str,
+    new_dir:str,
+    details:bool=True,
+    workers:int=None,
+    show_progress:bool=False,
+)->Dict[str, Union[GDLPartDiff, Exception]]:
+    """
+    Compare two versions of a library, matching parts by their path relative to old_dir and new_dir.
+
+    The raw bytes of both versions of every part are hashed first, so byte-identical parts are never parsed;
+    only the parts whose bytes differ are parsed, once, to be hashed by section
+    and, if details is True and any section differs, to produce detailed differences from the same parse.
+
+    Returns {relative path: GDLPartDiff, or the Exception raised for that part}.
+    """
+    _old_paths = _relative_paths(old_dir)
+    _new_paths = _relative_paths(new_dir)
+
+    _results = {}
+
+    for _path in sorted(set(_old_paths).difference(_new_paths)):
+        _results[_path] = GDLPartDiff(_path, "removed")
+    for _path in sorted(set(_new_paths).difference(_old_paths)):
+        _results[_path] = GDLPartDiff(_path, "added")
+
+    _common = sorted(set(_old_paths).intersection(_new_paths))
+
+    def _compare_files(path:str)->bool:
+        return file_hash(_old_paths[path]) == file_hash(_new_paths[path])
+
+    _differing = []
+
+    for _path, _result in map_safely(
+        _compare_files,
+        _common,
+        workers=workers,
+        desc="Hashing XMLs",
+        show_progress=show_progress,
+    ):
+        if (_result is True):
+            _results[_path] = GDLPartDiff(_path, "unchanged")
+        elif (isinstance(_result, Exception)):
+            _results[_path] = _result
+        else:
+            _differing.append(_path)
+
+    def _compare_sections(path:str)->GDLPartDiff:
+        _sections = []
+        _hashes = []
+
+        for _file_path in (_old_paths[path], _new_paths[path]):
+            with open(_file_path, "rb") as _stream:
+                _xml = _stream.read()
+            _sections.append(parse_sections(_xml))
+            _hashes.append(hash_sections(_xml, _sections[-1]))
+
+        _diff = compare_hashes(path, *_hashes)
+
+        if (details and _diff):
+            diff_details(_diff, _old_paths[path], _new_paths[path], old_sections=_sections[0], new_sections=_sections[1])
+
+        return _diff
+
+    for _path, _result in map_safely(
+        _compare_sections,
+        _differing,
+        workers=workers,
+        desc="Comparing sections",
+        show_progress=show_progress,
+    ):
+        _results[_path] = _result
+
+    return _results
@@ -0,0 +1,410 @@
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+import os
+import queue
+import socket
+import tempfile
+import threading
+import time as timer
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
+
+from gdl_utilities.gsm_commands import _default_version, GSMConvertShellError, GSMConvertSuccess, convert_library_parts, convert_operation
+from gdl_utilities.parse_params import iter_paths
+
+_output_extensions = {
+    convert_operation.GSM_TO_XML:".xml",
+    convert_operation.XML_TO_GSM:".gsm",
+}
+
+class ConversionJob():
+    """
+    One library part to convert: source_path is read by the coordinator and the result is written to dest_path,
+    so the workers do not need access to the same file system.
+    """
+    def __init__(
+        self,
+        source_path:str,
+        dest_path:str=None,
+        operation:convert_operation=convert_operation.XML_TO_GSM,
+        version:int=_default_version,
+        password:str=None,
+    ):
+        if (operation not in _output_extensions):
+            raise ValueError(f"{operation} is not supported for distributed conversion.")
+
+        self.source_path = source_path
+        self.dest_path = dest_path or (os.path.splitext(source_path)[0] + _output_extensions[operation])
+        self.operation = operation
+        self.version = version
+        self.password = password
+
+    def __repr__(
+        self,
+    ):
+        return f"{type(self).__name__}(source_path={repr(self.source_path)}, dest_path={repr(self.dest_path)}, operation={self.operation}, version={self.version})"
+
+    def payload(
+        self,
+    )->Dict[str, Any]:
+        """
+        What is sent to a worker; only built-in types so it can go over any connection.
+        """
+        with open(self.source_path, "rb") as _stream:
+            _data = _stream.read()
+
+        return {
+            "name":os.path.basename(self.source_path),
+            "operation":self.operation.name,
+            "version":self.version,
+            "password":self.password,
+            "data":_data,
+        }
+
+class ConversionResult():
+    def __bool__(self):
+        return bool(self.result)
+    __nonzero__ = __bool__
+
+    def __init__(
+        self,
+        job:ConversionJob,
+        result:Union[GSMConvertSuccess, Exception],
+        worker:str,
+        duration:float,
+    ):
+        self.job = job
+        self.result = result
+        self.worker = worker
+        self.duration = duration
+
+    def __repr__(
+        self,
+    ):
+        return f"{type(self).__name__}(source_path={repr(self.job.source_path)}, result={repr(self.result)}, worker={repr(self.worker)}, duration={self.duration:.2f})"
+
+def convert_payload(
+    payload:Dict[str, Any],
+    convert:Callable=convert_library_parts,
+)->Dict[str, Any]:
+    """
+    Run one job payload through convert_library_parts() in a temporary directory on this machine.
+
+    Returns {"data": bytes of the converted part or None, "error": message or None, "duration": seconds, "worker": host name}.
+    """
+    _start = timer.perf_counter()
+    _operation = convert_operation[payload["operation"]]
+
+    with tempfile.TemporaryDirectory(prefix="gdl_convert_") as _dir:
+        _source_path = os.path.join(_dir, payload["name"])
+        _dest_path = os.path.splitext(_source_path)[0] + _output_extensions[_operation]
+
+        with open(_source_path, "wb") as _stream:
+            _stream.write(payload["data"])
+
+        try:
+            _result = convert(
+                source_path=_source_path,
+                version=payload["version"],
+                operation=_operation,
+                password=payload["password"],
+                dest_path=_dest_path,
+            )
+        except Exception as e:
+            _result = e
+
+        _data = None
+        if (not isinstance(_result, Exception) and os.path.exists(_dest_path)):
+            with open(_dest_path, "rb") as _stream:
+                _data = _stream.read()
+        elif (not isinstance(_result, Exception)):
+            _result = GSMConvertShellError(f"{payload['name']} was converted, but {os.path.basename(_dest_path)} was not created.")
+
+    return {
+        "data":_data,
+        "error":str(_result) if (isinstance(_result, Exception)) else None,
+        "duration":timer.perf_counter() - _start,
+        "worker":socket.gethostname(),
+    }
+
+class LocalWorker():
+    """
+    Worker converting in this process with convert_payload(); also stands in for a build machine in tests.
+    """
+    def __init__(
+        self,
+        name:str=None,
+        slots:int=1,
+        convert:Callable=convert_library_parts,
+    ):
+        self.name = name or f"local:{socket.gethostname()}"
+        self.slots = slots
+        self.convert_function = convert
+
+    def __repr__(
+        self,
+    ):
+        return f"{type(self).__name__}(name={repr(self.name)}, slots={self.slots:d})"
+
+    def connect(self):
+        return self
+
+    def close(self):
+        pass
+
+    def convert(
+        self,
+        payload:Dict[str, Any],
+    )->Dict[str, Any]:
+        return convert_payload(payload, convert=self.convert_function)
+
+class _RemoteSlot():
+    def __init__(
+        self,
+        address:Tuple[str, int],
+        authkey:bytes,
+    ):
+        self.connection = Client(address, authkey=authkey)
+
+    def close(self):
+        self.connection.close()
+
+    def convert(
+        self,
+        payload:Dict[str, Any],
+    )->Dict[str, Any]:
+        self.connection.send(payload)
+        return self.connection.recv()
+
+class RemoteWorker():
+    """
+    A build machine running serve_worker(), reached over multiprocessing.connection; one connection per slot.
+    """
+    def __init__(
+        self,
+        address:Tuple[str, int],
+        authkey:bytes,
+        slots:int=1,
+    ):
+        self.address = address
+        self.authkey = authkey
+        self.slots = slots
+        self.name = f"{address[0]}:{address[1]}"
+
+    def __repr__(
+        self,
+    ):
+        return f"{type(self).__name__}(name={repr(self.name)}, slots={self.slots:d})"
+
+    def connect(
+        self,
+    )->_RemoteSlot:
+        return _RemoteSlot(self.address, self.authkey)
+
+def serve_worker(
+    address:Tuple[str, int],
+    authkey:bytes,
+    convert:Callable=convert_library_parts,
+    stop:threading.Event=None,
+):
+    """
+    Run on each build machine: accept coordinator connections and convert every payload received with convert_payload().
+
+    Each connection is served in its own thread, so a coordinator can use several slots of the same machine.
+    Runs until stop is set, if given, or forever.
+    """
+    def _serve(connection):
+        with connection:
+            while (True):
+                try:
+                    _payload = connection.recv()
+                except (EOFError, OSError):
+                    return
+                connection.send(convert_payload(_payload, convert=convert))
+
+    def _wake():
+        # accept() is not interrupted by closing the listener on every platform; connect to it instead
+        stop.wait()
+        try:
+            socket.create_connection(address, timeout=1.0).close()
+        except OSError:
+            pass
+
+    with Listener(address, authkey=authkey) as _listener:
+        if (stop is not None):
+            threading.Thread(target=_wake, daemon=True).start()
+
+        while (stop is None or not stop.is_set()):
+            try:
+                _connection = _listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # A client that failed authentication or hung up; keep serving the rest
+                continue
+
+            if (stop is not None and stop.is_set()):
+                _connection.close()
+                return
+
+            threading.Thread(target=_serve, args=(_connection, ), daemon=True).start()
+
+class ConversionReport():
+    """
+    Results of ConversionCoordinator.run(), with timings.
+    """
+    def __bool__(self):
+        return all(self.results)
+    __nonzero__ = __bool__
+
+    def __init__(
+        self,
+        results:List[ConversionResult],
+        duration:float,
+    ):
+        self.results = results
+        self.duration = duration
+
+    def __repr__(
+        self,
+    ):
+        return f"{type(self).__name__}(jobs={len(self.results):d}, failed={len(self.failed):d}, duration={self.duration:.2f})"
+
+    @property
+    def failed(self)->List[ConversionResult]:
+        return [ _result for _result in self.results if not _result ]
+
+    @property
+    def by_worker(self)->Dict[str, Dict[str, Union[int, float]]]:
+        """
+        {worker name: {"jobs", "failed", "busy": total seconds spent on jobs}}.
+        """
+        _summary = {}
+
+        for _result in self.results:
+            _worker = _summary.setdefault(_result.worker, { "jobs":0, "failed":0, "busy":0.0 })
+            _worker["jobs"] += 1
+            _worker["failed"] += 0 if (_result) else 1
+            _worker["busy"] += _result.duration
+
+        return _summary
+
+class ConversionCoordinator():
+    """
+    Shard conversion jobs across workers, each running convert_library_parts() on its own machine.
+
+    Jobs are held in one queue that every worker slot pulls from, so faster machines simply take more jobs.
+    A slot whose connection fails puts its job back and retires; the job is failed only once no slot is left.
+
+    Example:
+        ConversionCoordinator([
+            RemoteWorker(("build-mac-1", 6000), b"secret", slots=2),
+            RemoteWorker(("build-mac-2", 6000), b"secret", slots=2),
+        ]).run(jobs_from_directory("./XMLs", "./Library"))
+    """
+    def __init__(
+        self,
+        workers:Iterable[Union[LocalWorker, RemoteWorker]],
+        show_progress:bool=False,
+    ):
+        self.workers = list(workers)
+        self.show_progress = show_progress
+
+    def _slot(
+        self,
+        worker:Union[LocalWorker, RemoteWorker],
+        jobs:queue.Queue,
+        results:List[ConversionResult],
+        lock:threading.Lock,
+    ):
+        try:
+            _connection = worker.connect()
+        except Exception as e:
+            if (self.show_progress): print (f"{worker.name} unavailable: {e}")
+            return
+
+        try:
+            while (True):
+                try:
+                    _job = jobs.get_nowait()
+                except queue.Empty:
+                    return
+
+                _start = timer.perf_counter()
+
+                try:
+                    _reply = _connection.convert(_job.payload())
+                except (OSError, EOFError) as e:
+                    # Connection lost; let another slot take the job
+                    if (self.show_progress): print (f"{worker.name} lost: {e}")
+                    jobs.put(_job)
+                    return
+                except Exception as e:
+                    _reply = { "data":None, "error":str(e), "worker":worker.name }
+
+                if (_reply["data"] is not None):
+                    os.makedirs(os.path.dirname(os.path.abspath(_job.dest_path)), exist_ok=True)
+                    with open(_job.dest_path, "wb") as _stream:
+                        _stream.write(_reply["data"])
+                    _result = GSMConvertSuccess(version=_job.version, dest_path=_job.dest_path)
+                else:
+                    _result = GSMConvertShellError(_reply["error"])
+
+                _result = ConversionResult(_job, _result, worker.name, timer.perf_counter() - _start)
+
+                if (self.show_progress): print (_result)
+
+                with lock:
+                    results.append(_result)
+        finally:
+            _connection.close()
+
+    def run(
+        self,
+        jobs:Iterable[ConversionJob],
+    )->"ConversionReport":
+        _jobs = queue.Queue()
+        for _job in jobs:
+            _jobs.put(_job)
+
+        _results = []
+        _lock = threading.Lock()
+        _threads = [
+            threading.Thread(target=self._slot, args=(_worker, _jobs, _results, _lock)) \
+                for _worker in self.workers for _ in range(_worker.slots)
+        ]
+
+        _start = timer.perf_counter()
+
+        for _thread in _threads:
+            _thread.start()
+        for _thread in _threads:
+            _thread.join()
+
+        # Left over if every slot was lost
+        while (not _jobs.empty()):
+            _job = _jobs.get_nowait()
+            _results.append(ConversionResult(_job, GSMConvertShellError("No worker available."), None, 0.0))
+
+        return ConversionReport(_results, timer.perf_counter() - _start)
+
+def jobs_from_directory(
+    source_path:str,
+    dest_path:str=None,
+    operation:convert_operation=convert_operation.XML_TO_GSM,
+    version:int=_default_version,
+    password:str=None,
+)->List[ConversionJob]:
+    """
+    One ConversionJob per part under source_path, with the tree mirrored under dest_path (next to the source if None).
+    """
+    _extension = ".gsm" if (operation is convert_operation.GSM_TO_XML) else ".xml"
+    _jobs = []
+
+    for _path in iter_paths(source_path, sub_directories=True, extensions=(_extension, ), sort=True):
+        _dest = None
+        if (dest_path is not None):
+            _dest = os.path.join(
+                dest_path,
+                os.path.splitext(os.path.relpath(_path, source_path))[0] + _output_extensions[operation],
+            )
+        _jobs.append(ConversionJob(_path, _dest, operation=operation, version=version, password=password))
+
+    return _jobs
@@ -28,6 +28,19 @@ class GSMNoArchiCADInstalled(RuntimeWarning):
         return False
     __nonzero__ = __bool__
 
+class GSMInvalidSource(RuntimeError):
+    """
+    Source XMLs failed gdl_utilities.xml.validate_xml(); LP_XMLConverter was not started.
+    results holds the XMLValidationError of every invalid file.
+    """
+    def __bool__(self):
+        return False
+    __nonzero__ = __bool__
+
+    def __init__(self, message:str, results:dict=None):
+        self.results = results or {}
+        super().__init__(message)
+
 class GSMConvertSuccess():
     def __bool__(self):
         return file(self.dest_path).exists()
@@ -225,6 +238,7 @@ def convert_library_parts(
     password:str=None,
     dest_path:str=None,
     show_progress:bool=False,
+    validate:bool=False,
 ):
     _source_file = file(source_path, is_dir=None)
     _isfile = _source_file.isFile
@@ -233,6 +247,21 @@ def convert_library_parts(
         _command = "libpart2xml" if _isfile else "l2x"
     elif (operation is convert_operation.XML_TO_GSM):
         _command = "xml2libpart" if _isfile else "x2l"
+
+        if (validate):
+            _invalid = {
+                _path:_result for _path, _result in gdl_utilities.xml.validate_xmls(source_path).items() if not _result
+            }
+
+            if (_invalid):
+                if (show_progress):
+                    for _result in _invalid.values():
+                        print (f"Invalid XML: {_result}")
+
+                return GSMInvalidSource(
+                    f"{len(_invalid):d} invalid XML(s) found in {source_path}; conversion not started.",
+                    results=_invalid,
+                )
     else:
         return GSMOperationNotSupported(f"{operation} is not a valid operation for convert_library_parts")
 
@@ -270,6 +299,7 @@ def xml_to_gsm(
     password:str="",
     dest_path:str=None,
     show_progress=False,
+    validate:bool=False,
 ):
     return convert_library_parts(
         source_path=source_path,
@@ -278,6 +308,7 @@ def xml_to_gsm(
         password=password,
         dest_path=dest_path,
         show_progress=show_progress,
+        validate=validate,
     )
 
 if (__name__ == "__main__"):
@@ -0,0 +1,269 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+from lxml import etree as ET
+
+from gdl_utilities.parse_params import GDLScriptType, iter_paths
+from gdl_utilities.script import iter_gdl_identifiers
+from gdl_utilities.threads import map_safely
+
+index_format_version = 2
+
+def file_hash(xml:bytes)->str:
+    return hashlib.sha1(xml).hexdigest()
+
+def index_xml(
+    path:str,
+    xml:bytes=None,
+)->Dict[str, Any]:
+    """
+    Extract what GDLLibraryIndex needs from a single XML:
+    {
+        "hash": sha1 of the file,
+        "parameters": { name: [type, default value], ... },
+        "references": { lowercase identifier: [script section tag, ...], ... },
+    }
+    Only the elements needed are looked at; no GDLXMLFile or GDLParameter is built.
+    """
+    if (xml is None):
+        with open(path, "rb") as _stream:
+            xml = _stream.read()
+
+    _root = ET.fromstring(xml, parser=ET.XMLParser(strip_cdata=False, huge_tree=True))
+
+    _parameters = {}
+    _parameters_node = _root.find("ParamSection/Parameters")
+
+    if (_parameters_node is not None):
+        for _parameter in _parameters_node.iterchildren(tag=ET.Element):
+            _name = _parameter.get("Name")
+            if (_name):
+                _value = _parameter.findtext("Value")
+                _parameters[_name] = [
+                    _parameter.tag,
+                    _value.strip('"') if (_value is not None) else None,
+                ]
+
+    _references = {}
+
+    for _kind in GDLScriptType:
+        _script = _root.findtext(_kind.value)
+        if (_script):
+            for _identifier in { _identifier.lower() for _identifier, _start, _end in iter_gdl_identifiers(_script) }:
+                _references.setdefault(_identifier, []).append(_kind.value)
+
+    return {
+        "hash":file_hash(xml),
+        "parameters":_parameters,
+        "references":_references,
+    }
+
+class GDLLibraryIndex():
+    """
+    Persisted inverted index of a library of XMLs:
+    - lowercase parameter name -> parts declaring it, with type and default value;
+    - lowercase identifier -> parts whose scripts reference it, with the script sections.
+
+    update() only re-reads files whose size or modification time changed, and only re-indexes those whose hash changed.
+    GDL names are case-insensitive, so are all queries.
+    """
+    def __init__(
+        self,
+        dir_path:str=None,
+    ):
+        self.dir_path = dir_path
+        self.files = {}         # path: {"hash", "size", "mtime", "declarations": [name.lower(), ...], "references": [name.lower(), ...]}
+        self.declarations = {}  # name.lower(): {path: [name, type, default]}
+        self.references = {}    # name.lower(): {path: [section, ...]}
+
+    def __len__(self):
+        return len(self.files)
+
+    def _remove(
+        self,
+        path:str,
+    ):
+        _known = self.files.pop(path, None)
+
+        if (_known is None):
+            return
+
+        # Only the names this file contributed, rather than every name in the tables
+        for _table, _key in ((self.declarations, "declarations"), (self.references, "references")):
+            for _name in _known[_key]:
+                _paths = _table.get(_name, None)
+
+                if (_paths is not None):
+                    _paths.pop(path, None)
+                    if (not _paths):
+                        del _table[_name]
+
+    def _add(
+        self,
+        path:str,
+        record:Dict[str, Any],
+        stat:os.stat_result,
+    ):
+        self.files[path] = {
+            "hash":record["hash"],
+            "size":stat.st_size,
+            "mtime":stat.st_mtime,
+            "declarations":list({ _name.lower():None for _name in record["parameters"] }),
+            "references":list(record["references"]),
+        }
+
+        for _name, (_type, _value) in record["parameters"].items():
+            self.declarations.setdefault(_name.lower(), {})[path] = [_name, _type, _value]
+
+        for _name, _sections in record["references"].items():
+            self.references.setdefault(_name, {})[path] = _sections
+
+    def _index_if_changed(
+        self,
+        path:str,
+    )->Tuple[Union[Dict[str, Any], None], os.stat_result]:
+        """
+        Returns (record, stat); record is None if the file has not changed since it was indexed.
+        """
+        _stat = os.stat(path)
+        _known = self.files.get(path, None)
+
+        if (_known and _known["size"] == _stat.st_size and _known["mtime"] == _stat.st_mtime):
+            return None, _stat
+
+        with open(path, "rb") as _stream:
+            _xml = _stream.read()
+
+        if (_known and _known["hash"] == file_hash(_xml)):
+            # Touched but not changed
+            return None, _stat
+
+        return index_xml(path, _xml), _stat
+
+    def update(
+        self,
+        dir_path:str=None,
+        workers:int=None,
+        show_progress:bool=False,
+    )->Dict[str, Any]:
+        """
+        Bring the index up to date with dir_path (and its sub-directories) in a thread pool.
+
+        Returns a summary: {"added": [...], "updated": [...], "removed": [...], "unchanged": int, "errors": {path: Exception}}.
+        """
+        self.dir_path = dir_path or self.dir_path
+        _paths = list(iter_paths(self.dir_path, sub_directories=True, extensions=(".xml", )))
+
+        _summary = {
+            "added":[],
+            "updated":[],
+            "removed":[],
+            "unchanged":0,
+            "errors":{},
+        }
+
+        for _path in set(self.files).difference(_paths):
+            self._remove(_path)
+            _summary["removed"].append(_path)
+
+        for _path, _result in map_safely(
+            self._index_if_changed,
+            _paths,
+            workers=workers,
+            desc="Indexing XMLs",
+            show_progress=show_progress,
+        ):
+            if (isinstance(_result, Exception)):
+                _summary["errors"][_path] = _result
+                continue
+
+            _record, _stat = _result
+
+            if (_record is None):
+                # Keep the new stat so the next update does not need to re-hash
+                self.files[_path]["size"] = _stat.st_size
+                self.files[_path]["mtime"] = _stat.st_mtime
+                _summary["unchanged"] += 1
+            else:
+                _summary["updated" if (_path in self.files) else "added"].append(_path)
+                self._remove(_path)
+                self._add(_path, _record, _stat)
+
+        return _summary
+
+    def declared_by(
+        self,
+        name:str,
+    )->Dict[str, Tuple[str, str, Union[str, None]]]:
+        """
+        Parts declaring a parameter: {path: (name as declared, type, default value)}.
+        """
+        return { _path:tuple(_declaration) for _path, _declaration in self.declarations.get(name.lower(), {}).items() }
+
+    def referenced_by(
+        self,
+        name:str,
+    )->Dict[str, List[str]]:
+        """
+        Parts whose scripts mention a name outside strings and comments: {path: [script section tag, ...]}.
+        """
+        return { _path:list(_sections) for _path, _sections in self.references.get(name.lower(), {}).items() }
+
+    def save(
+        self,
+        path:str,
+    ):
+        with open(path, "w", encoding="UTF-8") as _stream:
+            json.dump(
+                {
+                    "version":index_format_version,
+                    "dir_path":self.dir_path,
+                    "files":self.files,
+                    "declarations":self.declarations,
+                    "references":self.references,
+                },
+                _stream,
+            )
+
+    @classmethod
+    def load(
+        cls,
+        path:str,
+    )->"GDLLibraryIndex":
+        with open(path, "r", encoding="UTF-8") as _stream:
+            _data = json.load(_stream)
+
+        if (_data.get("version", None) != index_format_version):
+            raise ValueError(f"{path} is an index of version {_data.get('version', None)}, {index_format_version} expected; rebuild it with update().")
+
+        _index = cls(_data["dir_path"])
+        _index.files = _data["files"]
+        _index.declarations = _data["declarations"]
+        _index.references = _data["references"]
+
+        return _index
+
+    @classmethod
+    def build(
+        cls,
+        dir_path:str,
+        index_path:str=None,
+        workers:int=None,
+        show_progress:bool=False,
+    )->"GDLLibraryIndex":
+        """
+        Load the index from index_path if it exists, update it against dir_path, and save it back.
+        """
+        if (index_path and os.path.exists(index_path)):
+            _index = cls.load(index_path)
+        else:
+            _index = cls(dir_path)
+
+        _index.update(dir_path, workers=workers, show_progress=show_progress)
+
+        if (index_path):
+            _index.save(index_path)
+
+        return _index
@@ -0,0 +1,566 @@
+import os
+import re
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
+
+from lxml import etree as ET
+import numpy as np
+import pandas as pd
+
+from gdl_utilities.parse_params import GDLParameter, GDLParameters, GDLScript, GDLScriptType, _re_parameter_open, array_dtype_map, escape_cdata, iter_paths, iter_script_spans, parse_array_values, unescape_cdata
+from gdl_utilities.script import iter_gdl_identifiers, rename_gdl_identifiers
+from gdl_utilities.threads import map_safely
+
+def compile_replacements(
+    replacements:Iterable[Tuple[Union[str, re.Pattern], Union[str, Callable]]],
+)->List[Tuple[re.Pattern, Union[str, Callable]]]:
+    """
+    Compile (pattern, replacement) pairs.
+
+    A str pattern is a literal, and its replacement is used literally too;
+    a compiled re.Pattern is used as it is, with a replacement as accepted by re.sub().
+    """
+    _compiled = []
+
+    for _pattern, _replacement in replacements:
+        if (isinstance(_pattern, re.Pattern)):
+            _compiled.append((_pattern, _replacement))
+        else:
+            # Wrapped in a function so backslashes in a literal replacement are not interpreted
+            _compiled.append((re.compile(re.escape(_pattern)), (lambda _match, _replacement=_replacement: _replacement)))
+
+    return _compiled
+
+def replace_in_scripts_text(
+    xml:str,
+    replacements:List[Tuple[re.Pattern, Union[str, Callable]]],
+    kinds:Iterable[GDLScriptType]=None,
+)->Tuple[str, Dict[str, int]]:
+    """
+    Apply compiled replacements to the scripts of the given kinds in the text of an XML.
+
+    Returns the new text and the number of matches per script section tag; text outside the scripts is copied through unchanged.
+    """
+    _chunks = []
+    _counts = {}
+    _cursor = 0
+
+    for _kind, _start, _end in iter_script_spans(xml, kinds=kinds):
+        # Replaced in the script itself, then escaped once
+        _script = unescape_cdata(xml[_start:_end])
+        _count = 0
+
+        for _pattern, _replacement in replacements:
+            _script, _n = _pattern.subn(_replacement, _script)
+            _count += _n
+
+        if (_count):
+            _chunks.append(xml[_cursor:_start])
+            _chunks.append(escape_cdata(_script))
+            _cursor = _end
+            _counts[_kind.value] = _counts.get(_kind.value, 0) + _count
+
+    _chunks.append(xml[_cursor:])
+
+    return "".join(_chunks), _counts
+
+def replace_in_scripts_file(
+    path:str,
+    replacements:List[Tuple[re.Pattern, Union[str, Callable]]],
+    kinds:Iterable[GDLScriptType]=None,
+    dry_run:bool=False,
+)->Dict[str, int]:
+    """
+    replace_in_scripts_text() on a file, which is only written if anything matched.
+    """
+    # newline="" so that line endings are copied through as they are.
+    with open(path, "r", encoding="UTF-8", newline="") as _stream:
+        _xml = _stream.read()
+
+    _xml, _counts = replace_in_scripts_text(_xml, replacements, kinds=kinds)
+
+    if (_counts and not dry_run):
+        with open(path, "w", encoding="UTF-8", newline="") as _stream:
+            _stream.write(_xml)
+
+    return _counts
+
+def replace_in_scripts(
+    paths:Union[str, Iterable[str]],
+    replacements:Iterable[Tuple[Union[str, re.Pattern], Union[str, Callable]]],
+    kinds:Iterable[GDLScriptType]=None,
+    workers:int=None,
+    dry_run:bool=False,
+    show_progress:bool=False,
+)->Dict[str, Union[Dict[str, int], Exception]]:
+    """
+    Search and replace in the GDL scripts of a library, in a thread pool.
+
+    paths can be a directory (searched with its sub-directories) or an iterable of XML paths.
+    replacements are (pattern, replacement) pairs - see compile_replacements() - applied in order.
+    kinds limits the script sections touched, e.g. [GDLScriptType.SCRIPT_2D, GDLScriptType.SCRIPT_3D]; all if None.
+
+    Only files with at least one match are rewritten; nothing is written if dry_run.
+    Returns {path: {script section tag: number of matches}} for every file, or the Exception raised for it.
+    """
+    if (isinstance(paths, str)):
+        paths = iter_paths(paths, sub_directories=True) if (os.path.isdir(paths)) else [paths, ]
+
+    _replacements = compile_replacements(replacements)
+    _kinds = list(kinds) if (kinds) else None
+
+    return dict(map_safely(
+        lambda _path: replace_in_scripts_file(_path, _replacements, kinds=_kinds, dry_run=dry_run),
+        paths,
+        workers=workers,
+        desc="Replacing in scripts",
+        show_progress=show_progress,
+    ))
+
+DECLARATIONS = "declarations"
+
+def rename_parameters_text(
+    xml:str,
+    renames:Dict[str, str],
+    declared_only:bool=True,
+)->Tuple[str, Dict[str, int]]:
+    """
+    Rename parameters in the text of an XML: their declarations in <Parameters>, and every reference in the scripts.
+
+    Old names are matched case-insensitively, as GDL does; see rename_gdl_identifiers() for what counts as a reference.
+    If declared_only, only the parameters this part declares are renamed, so that locals and the parameters of other parts
+    sharing a name are left alone; set it to False for parts referring to the parameters of another, e.g. through a macro call.
+    Raises ValueError if a new name is already declared by a parameter that is not being renamed, or used in the scripts.
+
+    Returns the new text and the number of renames per script section tag, with declarations counted under DECLARATIONS.
+    """
+    _renames = { _old.lower():_new for _old, _new in renames.items() }
+    _counts = {}
+    _edits = []     # (start, end, text); scripts can come before or after <ParamSection>
+
+    _start = xml.find("<Parameters>")
+    _end = xml.find("</Parameters>", _start)
+
+    if (_start >= 0 and _end >= 0):
+        _declared = [ _match for _match in _re_parameter_open.finditer(xml, _start, _end) ]
+    else:
+        _declared = []
+
+    if (declared_only):
+        _declared_names = { _match.group("name").lower() for _match in _declared }
+        _renames = { _old:_new for _old, _new in _renames.items() if _old in _declared_names }
+
+    if (not _renames):
+        return xml, _counts
+
+    _spans = list(iter_script_spans(xml))
+
+    # Anything else of the new name - another parameter, a local variable, a global - would be merged with the renamed one
+    _kept = { _match.group("name").lower() for _match in _declared }
+    for _kind, _start, _end in _spans:
+        _kept.update( _identifier.lower() for _identifier, _, _ in iter_gdl_identifiers(unescape_cdata(xml[_start:_end])) )
+    _kept.difference_update(_renames)
+
+    for _new in _renames.values():
+        if (_new.lower() in _kept):
+            raise ValueError(f"Cannot rename to {_new}: a parameter or variable of that name is already used.")
+
+    for _match in _declared:
+        _name = _match.group("name")
+        if (_name.lower() in _renames):
+            _edits.append((_match.start("name"), _match.end("name"), _renames[_name.lower()]))
+            _counts[DECLARATIONS] = _counts.get(DECLARATIONS, 0) + 1
+
+    for _kind, _start, _end in _spans:
+        _script, _count = rename_gdl_identifiers(unescape_cdata(xml[_start:_end]), _renames)
+
+        if (_count):
+            _edits.append((_start, _end, escape_cdata(_script)))
+            _counts[_kind.value] = _counts.get(_kind.value, 0) + _count
+
+    _chunks = []
+    _cursor = 0
+
+    for _start, _end, _text in sorted(_edits):
+        _chunks.append(xml[_cursor:_start])
+        _chunks.append(_text)
+        _cursor = _end
+
+    _chunks.append(xml[_cursor:])
+
+    return "".join(_chunks), _counts
+
+def rename_parameters_file(
+    path:str,
+    renames:Dict[str, str],
+    declared_only:bool=True,
+    dry_run:bool=False,
+)->Dict[str, int]:
+    """
+    rename_parameters_text() on a file, which is only written if anything was renamed.
+    """
+    # newline="" so that line endings are copied through as they are.
+    with open(path, "r", encoding="UTF-8", newline="") as _stream:
+        _xml = _stream.read()
+
+    _xml, _counts = rename_parameters_text(_xml, renames, declared_only=declared_only)
+
+    if (_counts and not dry_run):
+        with open(path, "w", encoding="UTF-8", newline="") as _stream:
+            _stream.write(_xml)
+
+    return _counts
+
+def rename_parameters(
+    paths:Union[str, Iterable[str]],
+    renames:Dict[str, str],
+    callers:Iterable[str]=None,
+    workers:int=None,
+    dry_run:bool=False,
+    show_progress:bool=False,
+)->Dict[str, Union[Dict[str, int], Exception]]:
+    """
+    Rename parameters across a library in one pass per file, in a thread pool.
+
+    paths can be a directory (searched with its sub-directories) or an iterable of XML paths.
+    renames is {old name: new name}. Only the parts declaring a parameter have it renamed;
+    callers lists the paths of parts that refer to the renamed parameters of other parts, e.g. through a macro call,
+    whose references are renamed even though they do not declare them.
+
+    Every file is checked before any is written, so that the library is never left half renamed:
+    if any file raises - e.g. a ValueError for a new name that clashes with one already used - nothing is written at all.
+    Otherwise, only files with at least one rename are read and renamed again, and rewritten; nothing is written if dry_run.
+
+    Returns {path: {script section tag or DECLARATIONS: number of renames}} for every file, or the Exception raised for it;
+    if nothing was written, the counts are those of the renames that would have been made.
+    """
+    if (isinstance(paths, str)):
+        paths = iter_paths(paths, sub_directories=True) if (os.path.isdir(paths)) else [paths, ]
+
+    _paths = list(paths)
+    _callers = { os.path.normcase(os.path.abspath(_path)) for _path in (callers or []) }
+
+    def _rename(path:str, dry_run:bool)->Dict[str, int]:
+        return rename_parameters_file(
+            path,
+            renames,
+            declared_only=os.path.normcase(os.path.abspath(path)) not in _callers,
+            dry_run=dry_run,
+        )
+
+    _results = dict(map_safely(
+        lambda _path: _rename(_path, dry_run=True),
+        _paths,
+        workers=workers,
+        desc="Checking parameter renames",
+        show_progress=show_progress,
+    ))
+
+    if (dry_run or any( isinstance(_result, Exception) for _result in _results.values() )):
+        return _results
+
+    _results.update(map_safely(
+        lambda _path: _rename(_path, dry_run=False),
+        [ _path for _path, _counts in _results.items() if _counts ],
+        workers=workers,
+        desc="Renaming parameters",
+        show_progress=show_progress,
+    ))
+
+    return _results
+
+
+class GDLPartView():
+    """
+    View of one part of a GDLLibrary; nothing is copied until asked for.
+    """
+    def __init__(
+        self,
+        library:"GDLLibrary",
+        part_id:int,
+    ):
+        self.library = library
+        self.part_id = part_id
+
+    def __repr__(
+        self,
+    ):
+        return f"{type(self).__name__}(name={repr(self.name)}, path={repr(self.path)})"
+
+    @property
+    def name(self)->str:
+        return self.library.names[self.part_id]
+
+    @property
+    def path(self)->str:
+        return self.library.paths[self.part_id]
+
+    @property
+    def parameters_frame(self)->pd.DataFrame:
+        """
+        Rows of GDLLibrary.parameters belonging to this part.
+        """
+        _start, _stop = self.library.offsets[self.part_id]
+        return self.library.parameters.iloc[_start:_stop]
+
+    @property
+    def parameters(self)->GDLParameters:
+        """
+        Parameters of this part as new GDLParameter objects.
+        """
+        _parameters = GDLParameters()
+
+        for _row in self.parameters_frame.itertuples(index=False):
+            _parameter = GDLParameter(
+                name=_row.name,
+                type=_row.type,
+                description=_row.description,
+                value=_row.value,
+                array=None,
+                fix=_row.fix,
+                flags=list(_row.flags),
+            )
+            if (_row.array is not None):
+                _parameter.array_values = _row.array
+            _parameters.append(_parameter)
+
+        return _parameters
+
+    def script(
+        self,
+        kind:GDLScriptType,
+    )->GDLScript:
+        _attrs, _script = self.library.scripts[self.part_id].get(kind.value, (None, None))
+
+        if (_script is None):
+            return GDLScript.from_node(None, kind=kind)
+
+        return GDLScript(
+            kind=kind,
+            attrs=dict(_attrs),
+            script=_script,
+        )
+
+class GDLDuplicatePart(LookupError):
+    def __bool__(self):
+        return False
+    __nonzero__ = __bool__
+
+    def __init__(self, name:str, path:str):
+        self.name = name
+        self.path = path
+        super().__init__(f"Part {name} is already loaded from {path}")
+
+class GDLLibrary():
+    """
+    Many parts loaded into shared storage for cross-part analysis.
+
+    All parameters of all parts are held in one DataFrame, parameters, with a "part" column indexing names and paths;
+    type and flags are categoricals, and names, descriptions and values are interned so identical strings are stored once.
+    Script sections keep one shared dict per distinct set of attributes (SectVersion etc.).
+
+    Use library[name] or library[part_id] for a GDLPartView of a single part.
+    Part names are unique; files that could not be loaded, or whose name is taken already, are kept in errors as {path: Exception}.
+    """
+    parameter_columns = [
+        "part",
+        "name",
+        "type",
+        "description",
+        "value",
+        "fix",
+        "flags",
+        "array",
+    ]
+
+    def __init__(
+        self,
+    ):
+        self.names = []
+        self.paths = []
+        self.offsets = []
+        self.scripts = []
+        self.parameters = pd.DataFrame(columns=self.parameter_columns)
+        self.errors = {}
+        self._name_lookup = {}
+        self._interned = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return ( GDLPartView(self, _part_id) for _part_id in range(len(self)) )
+
+    def __getitem__(
+        self,
+        key:Union[int, str],
+    )->GDLPartView:
+        if (isinstance(key, str)):
+            key = self._name_lookup[key]
+
+        if (not 0 <= key < len(self)):
+            raise IndexError(f"Part {key} not in library of {len(self):d} parts.")
+
+        return GDLPartView(self, key)
+
+    def intern(
+        self,
+        value:Any,
+    )->Any:
+        """
+        Return the shared instance of value: str are interned, tuples and dicts are deduplicated by content.
+        """
+        if (isinstance(value, str)):
+            return sys.intern(value)
+        elif (isinstance(value, dict)):
+            _key = ("dict", tuple(sorted(value.items())))
+        elif (isinstance(value, tuple)):
+            _key = ("tuple", value)
+        else:
+            return value
+
+        return self._interned.setdefault(_key, value)
+
+    @staticmethod
+    def extract_part(
+        path:str,
+    )->Tuple[Dict[str, Tuple[dict, str]], List[tuple]]:
+        """
+        Read a single XML into (scripts, parameter rows) without building GDLXMLFile.
+        """
+        with open(path, "rb") as _stream:
+            _root = ET.fromstring(_stream.read(), parser=ET.XMLParser(strip_cdata=False, huge_tree=True))
+
+        _scripts = {}
+        for _kind in GDLScriptType:
+            _node = _root.find(_kind.value)
+            if (_node is not None):
+                _scripts[_kind.value] = (dict(_node.attrib), _node.text or "")
+
+        _rows = []
+        _parameters = _root.find("ParamSection/Parameters")
+        if (_parameters is not None):
+            for _parameter in _parameters.iterchildren(tag=ET.Element):
+                _name = _parameter.get("Name")
+                if (not _name):
+                    continue
+
+                _description = _parameter.findtext("Description")
+                _value = _parameter.findtext("Value")
+                _flags = _parameter.find("Flags")
+                _array = _parameter.find("ArrayValues")
+
+                _rows.append((
+                    _name,
+                    _parameter.tag,
+                    _description.strip('"') if (_description is not None) else None,
+                    _value.strip('"') if (_value is not None) else None,
+                    _parameter.find("Fix") is not None,
+                    tuple(_flag.tag for _flag in _flags.iterchildren(tag=ET.Element)) if (_flags is not None) else (),
+                    parse_array_values(_array, dtype=array_dtype_map.get(_parameter.tag, np.float64)) if (_array is not None) else None,
+                ))
+
+        _root.clear()
+
+        return _scripts, _rows
+
+    def extend(
+        self,
+        paths:Union[str, Iterable[str]],
+        workers:int=None,
+        show_progress:bool=False,
+    )->Dict[str, Exception]:
+        """
+        Load more parts into the library in a thread pool; paths can be a directory, searched with its sub-directories.
+
+        Returns {path: Exception} of the files that could not be loaded, which are added to errors too;
+        a part named like one loaded already is not loaded, and gets a GDLDuplicatePart.
+        """
+        if (isinstance(paths, str)):
+            paths = iter_paths(paths, sub_directories=True) if (os.path.isdir(paths)) else [paths, ]
+
+        _columns = { _column:[] for _column in self.parameter_columns }
+        _errors = {}
+        _row_count = self.parameters.shape[0]
+
+        for _path, _result in map_safely(
+            self.extract_part,
+            paths,
+            workers=workers,
+            desc="Loading XMLs",
+            show_progress=show_progress,
+        ):
+            if (isinstance(_result, Exception)):
+                _errors[_path] = _result
+                continue
+
+            _scripts, _rows = _result
+            _part_id = len(self.names)
+            _name = re.sub(r"\.xml$", "", os.path.basename(_path), flags=re.IGNORECASE)
+
+            if (_name in self._name_lookup):
+                _errors[_path] = GDLDuplicatePart(_name, self.paths[self._name_lookup[_name]])
+                continue
+
+            self.names.append(self.intern(_name))
+            self.paths.append(_path)
+            self._name_lookup[_name] = _part_id
+            self.scripts.append({
+                _tag:(self.intern(_attrs), _script) for _tag, (_attrs, _script) in _scripts.items()
+            })
+            self.offsets.append((_row_count, _row_count+len(_rows)))
+            _row_count += len(_rows)
+
+            for _name, _type, _description, _value, _fix, _flags, _array in _rows:
+                _columns["part"].append(_part_id)
+                _columns["name"].append(self.intern(_name))
+                _columns["type"].append(self.intern(_type))
+                _columns["description"].append(self.intern(_description))
+                _columns["value"].append(self.intern(_value))
+                _columns["fix"].append(_fix)
+                _columns["flags"].append(self.intern(_flags))
+                _columns["array"].append(_array)
+
+        _new = pd.DataFrame({
+            "part":np.array(_columns["part"], dtype=np.int32),
+            "name":pd.Series(_columns["name"], dtype=object),
+            "type":pd.Series(_columns["type"], dtype=object),
+            "description":pd.Series(_columns["description"], dtype=object),
+            "value":pd.Series(_columns["value"], dtype=object),
+            "fix":np.array(_columns["fix"], dtype=np.bool_),
+            "flags":pd.Series(_columns["flags"], dtype=object),
+            "array":pd.Series(_columns["array"], dtype=object),
+        })
+
+        if (self.parameters.shape[0]):
+            _new = pd.concat([self.parameters.astype({"type":object, "flags":object}), _new], ignore_index=True)
+
+        self.parameters = _new.astype({
+            "type":"category",
+            "flags":"category",
+        })
+
+        self.errors.update(_errors)
+
+        return _errors
+
+    @classmethod
+    def load(
+        cls,
+        paths:Union[str, Iterable[str]],
+        workers:int=None,
+        show_progress:bool=False,
+    )->"GDLLibrary":
+        _library = cls()
+        _library.extend(paths, workers=workers, show_progress=show_progress)
+        return _library
+
+    def parts_declaring(
+        self,
+        name:str,
+    )->List[GDLPartView]:
+        """
+        Parts declaring a parameter, matched case-insensitively as GDL does.
+        """
+        _parts = self.parameters.loc[self.parameters["name"].str.lower() == name.lower(), "part"].unique()
+        return [ GDLPartView(self, int(_part_id)) for _part_id in _parts ]
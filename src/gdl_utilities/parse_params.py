@@ -1,8 +1,14 @@
 
+import copy
+import functools
+import os
 import re
 from enum import Enum
-from typing import Any, Dict, Iterable, List, Union
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Generator, Iterable, List, Tuple, Union
+from xml.sax.saxutils import escape as escape_xml
 from lxml import etree as ET
+import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
@@ -10,6 +16,11 @@ import collections
 
 from file_io import file
 
+import gdl_utilities.gsm_commands as gsm_commands
+from gdl_utilities.threads import call_safely, default_workers, map_safely
+import gdl_utilities.xml
+from gdl_utilities.xml import iter_paths
+
 dir_path = "./XMLs"
 object_type_var = "ap_objectType"
 
@@ -61,16 +72,145 @@ def set_child_node(
     else:
         node.replace(_child_node, child)
 
+def format_array_value(
+    value:Any,
+    is_string:bool=False,
+)->Union[str, ET.CDATA]:
+    """
+    Format a single cell of an ArrayValues node - strings are quoted and wrapped in CDATA like <Value>.
+    """
+    if (is_string):
+        return ET.CDATA(f'"{value}"')
+    elif (isinstance(value, (bool, np.bool_))):
+        return "1" if value else "0"
+    elif (isinstance(value, (float, np.floating))):
+        return np.format_float_positional(value, trim="-")
+    else:
+        return str(value)
+
+def array_values_node(
+    values:Iterable,
+    is_string:bool=False,
+)->ET.Element:
+    """
+    Build an <ArrayValues> node from a 1D or 2D array-like.
+
+    1D arrays are written with SecondDimension="0" and Row attributes only, as LP_XMLConverter does.
+    """
+    _values = np.asarray(values, dtype=object)
+
+    if (_values.ndim == 1):
+        _rows, _columns = _values.shape[0], 0
+        _values = _values.reshape((_rows, 1))
+    elif (_values.ndim == 2):
+        _rows, _columns = _values.shape
+    else:
+        raise ValueError(f"ArrayValues can only hold 1 or 2 dimensions, {_values.ndim:d} found.")
+
+    _node = ET.Element(
+        "ArrayValues",
+        attrib = {
+            "FirstDimension":str(_rows),
+            "SecondDimension":str(_columns),
+        }
+    )
+
+    for _row_id, _row in enumerate(_values):
+        for _col_id, _value in enumerate(_row):
+            _attrs = {"Row":str(_row_id+1)} if (not _columns) else {"Column":str(_col_id+1), "Row":str(_row_id+1)}
+            _subnode = ET.SubElement(_node, "AVal", attrib=_attrs)
+            _subnode.text = format_array_value(_value, is_string=is_string)
+
+    return _node
+
+array_dtype_map = {
+    "Length":np.float64,
+    "Angle":np.float64,
+    "RealNum":np.float64,
+    "Integer":np.int64,
+    "Boolean":np.bool_,
+    "PenColor":np.int64,
+    "LineType":np.int64,
+    "FillPattern":np.int64,
+    "Material":np.int64,
+    "BuildingMaterial":np.int64,
+    "Profile":np.int64,
+    "String":object,
+    "Title":object,
+}
+
+def parse_array_values(
+    node:ET.Element,
+    dtype:type=np.float64,
+)->np.ndarray:
+    """
+    Parse an <ArrayValues> node into a NumPy array in bulk.
+
+    1D arrays (SecondDimension="0") return shape (FirstDimension, );
+    2D arrays return shape (FirstDimension, SecondDimension).
+    String arrays are returned as object arrays with their quotes stripped.
+    """
+    _rows = int(node.get("FirstDimension", 0))
+    _columns = int(node.get("SecondDimension", 0))
+
+    _avals = list(node.iterchildren("AVal"))
+    _texts = [ (_aval.text or "") for _aval in _avals ]
+
+    if (dtype is object):
+        _values = np.array([ _text.strip('"') for _text in _texts ], dtype=object)
+    else:
+        # Converting from str in one call is much faster than float() or int() per cell
+        _values = np.array([ _text.strip() or "0" for _text in _texts ], dtype=np.str_)
+
+        if (dtype in (np.int64, np.bool_)):
+            try:
+                # Directly to int64, as float64 loses precision above 2**53
+                _values = _values.astype(np.int64)
+            except ValueError:
+                # e.g. "1.0"
+                _values = _values.astype(np.float64)
+        else:
+            _values = _values.astype(np.float64)
+
+        if (_values.dtype != dtype):
+            _values = _values.astype(dtype)
+
+    _shape = (_rows, _columns) if (_columns) else (_rows, )
+
+    if (_values.shape[0] == int(np.prod(_shape))):
+        # LP_XMLConverter always writes every cell in row-major order
+        return _values.reshape(_shape)
+
+    _return = np.zeros(_shape, dtype=_values.dtype) if (dtype is not object) else np.full(_shape, "", dtype=object)
+    _row_ids = np.array([ int(_aval.get("Row", 1))-1 for _aval in _avals ], dtype=np.intp)
+
+    if (_columns):
+        _col_ids = np.array([ int(_aval.get("Column", 1))-1 for _aval in _avals ], dtype=np.intp)
+        _return[_row_ids, _col_ids] = _values
+    else:
+        _return[_row_ids] = _values
+
+    return _return
+
 def iter_xmls(
     dir_path:str,
     sub_directories:bool=False,
+    patterns:Iterable[str]=None,
+    sort:bool=False,
 ):
-    _dir = file(dir_path, is_dir=True)
-    _dir_tree = _dir.dir_tree(sub_directories=sub_directories, flatten=sub_directories)
+    """
+    Generator yielding a file object for every XML in dir_path.
 
-    for _file_path, _file in zip(_dir_tree, _dir_tree.values()):
-        if (_file_path.lower().endswith(".xml")):
-            yield _file
+    See iter_paths() for patterns and sort.
+    """
+    for _file_path in iter_paths(
+        dir_path,
+        sub_directories=sub_directories,
+        extensions=(".xml", ),
+        patterns=patterns,
+        sort=sort,
+    ):
+        yield file(_file_path, is_dir=False)
 
 class GDLScriptType(Enum):
     SCRIPT_3D               = "Script_3D"
@@ -84,6 +224,17 @@ class GDLScriptType(Enum):
 
 
 class GDLXMLFile():
+    script_attributes = {
+        GDLScriptType.SCRIPT_3D:                "script_3D",
+        GDLScriptType.SCRIPT_2D:                "script_2D",
+        GDLScriptType.SCRIPT_MASTER:            "script_master",
+        GDLScriptType.SCRIPT_PROPERTIES:        "script_properties",
+        GDLScriptType.SCRIPT_UI:                "script_ui",
+        GDLScriptType.SCRIPT_PARAMETERS:        "script_parameters",
+        GDLScriptType.SCRIPT_FORWARD_MIGRATE:   "script_forward_migrate",
+        GDLScriptType.SCRIPT_BACKWARD_MIGRATE:  "script_backward_migrate",
+    }
+
     def __init__(
         self,
         name:str,
@@ -130,6 +281,130 @@ class GDLXMLFile():
             node=_tree,
         )
 
+    @classmethod
+    def from_bytes(
+        cls,
+        name:str,
+        xml:bytes,
+    ):
+        """
+        Parse the raw bytes of an XML - lxml deals with the encoding declaration and BOM itself, so no decoding is needed.
+        """
+        _parser = ET.XMLParser(strip_cdata=False)
+
+        return cls(
+            name=name,
+            node=ET.fromstring(xml, parser=_parser),
+        )
+
+    @classmethod
+    def from_gsm(
+        cls,
+        path:str,
+        version:int=gsm_commands._default_version,
+        password:str=None,
+        show_progress:bool=False,
+    ):
+        """
+        Convert a .gsm with LP_XMLConverter into a temporary file, and parse it straight from its bytes.
+
+        The temporary file is always deleted.
+        Returns the Exception instance from gsm_commands if the conversion failed.
+        """
+        _temp = file.temp(prefix="gsm_parse_")
+
+        try:
+            _result = gsm_commands.execute_command(
+                source_path=path,
+                version=version,
+                command="libpart2xml",
+                password=password,
+                dest_path=_temp.abspath(),
+                show_progress=show_progress,
+            )
+
+            if (isinstance(_result, Exception)):
+                return _result
+
+            with open(_temp.abspath(), "rb") as _stream:
+                _xml = _stream.read()
+
+            return cls.from_bytes(
+                name=re.sub(r"\.gsm$", "", os.path.basename(path), flags=re.IGNORECASE),
+                xml=_xml,
+            )
+        finally:
+            if (_temp.isreadable()):
+                _temp.delete()
+
+    @classmethod
+    def iter_from_gsms(
+        cls,
+        paths:Iterable[str],
+        version:int=gsm_commands._default_version,
+        password:str=None,
+        workers:int=None,
+    )->Generator[Tuple[str, Union["GDLXMLFile", Exception]], None, None]:
+        """
+        Batch version of from_gsm(), running up to default_workers(workers, limit=4) LP_XMLConverter processes at a time.
+
+        Yields (path, GDLXMLFile or Exception) in the order of paths.
+        """
+        workers = default_workers(workers, limit=4)
+
+        with ThreadPoolExecutor(max_workers=workers) as _executor:
+            _pending = collections.deque()
+
+            for _path in paths:
+                _pending.append((_path, _executor.submit(cls.from_gsm, _path, version, password)))
+
+                # Keep the queue short so that parsed objects do not pile up unconsumed
+                if (len(_pending) >= workers * 2):
+                    _path, _future = _pending.popleft()
+                    yield _path, cls._future_result(_future)
+
+            while (_pending):
+                _path, _future = _pending.popleft()
+                yield _path, cls._future_result(_future)
+
+    @staticmethod
+    def _future_result(
+        future:Future,
+    ):
+        return call_safely(future.result)
+
+
+    def save(
+        self,
+        xmlfile:file,
+    ):
+        """
+        Write the current state of this object to xmlfile, stripped of characters LP_XMLConverter would reject.
+        """
+        _xml = self.node_xml.decode("UTF-8")
+
+        return xmlfile.write(
+            gdl_utilities.xml.strip_invalid_characters(
+                '<?xml version="1.0" encoding="UTF-8"?>\n' + _xml
+            )
+        )
+
+    def release(
+        self,
+    ):
+        """
+        Drop the parsed tree and everything built from it, so the memory can be reclaimed straight away.
+
+        This object cannot be used afterwards.
+        """
+        if (self._node is not None):
+            self._node.clear()
+
+        self._node = None
+        self.parameters = None
+
+        for _kind in GDLScriptType:
+            setattr(self, self.script_attributes[_kind], None)
 
     def replace_child(
         self,
@@ -258,45 +533,145 @@ class GDLCopyright():
     """
     pass
 
+@functools.lru_cache(maxsize=None)
+def parameter_template(
+    type:str,
+    flags:tuple=(),
+    fix:bool=False,
+)->ET.Element:
+    """
+    Cached skeleton node for a new parameter of the given type, flags and fix.
+
+    Do not modify the returned node - GDLParameter.stamp() works on a deep copy of it.
+    """
+    _node = ET.Element(
+        type,
+        attrib = {
+            "Name":"",
+        }
+    )
+
+    ET.SubElement(_node, "Description")
+
+    if (fix):
+        ET.SubElement(_node, "Fix")
+
+    if (flags):
+        _subnode = ET.SubElement(_node, "Flags")
+        for _flag in flags:
+            ET.SubElement(_subnode, _flag)
+
+    return _node
+
+def materialising(func):
+    """
+    Wrap a dict method of GDLParameter to serialise a pending node_xml first - see GDLParameter.materialise_node_xml().
+    """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        self.materialise_node_xml()
+        return func(self, *args, **kwargs)
+    return wrapper
+
 class GDLParameter(dict):
 
     name = None
+    _array_values = None
+    _array_values_parsed = None
+    _node_xml_pending = False
     
     def __init__(self, name:str, *args, **kwargs):
         self.name = name
         
         super().__init__(*args, **kwargs)
 
-        if (not self.get("node_xml", None) and self.type and self.name):
-            _node = ET.Element(
-                self.type,
-                attrib = {
-                    "Name":self.name,
-                }
+        # node_xml of a new parameter is only serialised when it is read; writing it with .node stamps it directly.
+        if (not dict.get(self, "node_xml", None) and self.type and self.name):
+            self._node_xml_pending = True
+
+    def materialise_node_xml(self):
+        """
+        Serialise node_xml of a new parameter from stamp(), if it is still pending.
+
+        Every dict method reading the keys or values of this parameter calls this first,
+        so that node_xml reads as if it had been set in __init__.
+        """
+        if (self._node_xml_pending):
+            self._node_xml_pending = False
+            dict.__setitem__(
+                self,
+                "node_xml",
+                ET.tostring(
+                    self.stamp()
+                ),
             )
 
-            if (self.description is not None):
-                _subnode = ET.SubElement(_node, "Description")
-                _subnode.text = ET.CDATA(f'"{self["description"]}"')
+    def __missing__(self, key):
+        if (key == "node_xml" and self._node_xml_pending):
+            self.materialise_node_xml()
+            return dict.__getitem__(self, key)
+
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        if (key == "node_xml"):
+            self.materialise_node_xml()
+        return super().__contains__(key)
+
+    def get(self, key, default=None):
+        if (key == "node_xml"):
+            self.materialise_node_xml()
+        return super().get(key, default)
+
+    def __setitem__(self, key, value):
+        if (key == "node_xml"):
+            self._node_xml_pending = False
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        if (key == "node_xml"):
+            self.materialise_node_xml()
+        super().__delitem__(key)
+
+    keys = materialising(dict.keys)
+    values = materialising(dict.values)
+    items = materialising(dict.items)
+    __iter__ = materialising(dict.__iter__)
+    __len__ = materialising(dict.__len__)
+    __eq__ = materialising(dict.__eq__)
+    __ne__ = materialising(dict.__ne__)
+    __repr__ = materialising(dict.__repr__)
+    __or__ = materialising(dict.__or__)
+    copy = materialising(dict.copy)
+    pop = materialising(dict.pop)
+    popitem = materialising(dict.popitem)
+    setdefault = materialising(dict.setdefault)
+    update = materialising(dict.update)
+
+    def stamp(self)->ET.Element:
+        """
+        Node of a new parameter, stamped from parameter_template() instead of building every sub-element.
+        """
+        _node = copy.deepcopy(
+            parameter_template(
+                self["type"],
+                tuple(self.flags or ()),
+                bool(self.fix),
+            )
+        )
+        _node.set("Name", self.name)
 
-            if (self.fix):
-                _subnode = ET.SubElement(_node, "Fix")
+        _subnode = _node.find("Description")
+        if (self.description is not None):
+            _subnode.text = ET.CDATA(f'"{self["description"]}"')
+        else:
+            _node.remove(_subnode)
 
-            if (self.flags):
-                _subnode = ET.SubElement(_node, "Flags")
-                _flagsubnodes = list(map(
-                    lambda tag: ET.SubElement(_subnode, tag),
-                    self.flags,
-                ))
-            
-            if (self.value is not None):
-                _subnode = ET.SubElement(_node, "Value")
-                _subnode.text = ET.CDATA(f'"{self.value}"') if (self.is_string) else self.value
+        if (self.value is not None):
+            _subnode = ET.SubElement(_node, "Value")
+            _subnode.text = ET.CDATA(f'"{self.value}"') if (self.is_string) else str(self.value)
 
-            
-            self["node_xml"] = ET.tostring(
-                _node
-            )
+        return _node
 
     @property
     def is_string(self):
@@ -305,13 +680,48 @@ class GDLParameter(dict):
             "String"
         )
 
+    @property
+    def array_values(self)->Union[np.ndarray, None]:
+        """
+        ArrayValues of this parameter as a NumPy array, or None if this is not an array parameter.
+
+        Parsed from the ArrayValues node on first access; changes to the returned array are written back by .node.
+        """
+        if (self._array_values is None and self.array is not None):
+            self._array_values = parse_array_values(
+                self.array,
+                dtype=array_dtype_map.get(self.type, np.float64),
+            )
+            # Kept to tell whether the original node can be written back untouched
+            self._array_values_parsed = self._array_values.copy()
+
+        return self._array_values
+
+    @array_values.setter
+    def array_values(self, value:Union[np.ndarray, None]):
+        if (value is None):
+            self._array_values = None
+            self["array"] = None
+        else:
+            self._array_values = np.asarray(
+                value,
+                dtype=array_dtype_map.get(self.type, np.float64),
+            )
+        self._array_values_parsed = None
+
     @property
     def node(self):
-        _parser = ET.XMLParser(strip_cdata=False)
-        _node = ET.fromstring(
-            self.get("node_xml"),
-            parser=_parser
-        )
+        # A pending node_xml is not serialised just to be parsed again
+        _stamped = not dict.get(self, "node_xml", None)
+
+        if (not _stamped):
+            _parser = ET.XMLParser(strip_cdata=False)
+            _node = ET.fromstring(
+                self.get("node_xml"),
+                parser=_parser
+            )
+        else:
+            _node = self.stamp()
 
         _node.tag = self["type"]
         _node.set("Name", self.name)
@@ -339,7 +749,7 @@ class GDLParameter(dict):
                 _node, "Flags"
             )
         
-        if (self.flags):
+        if (self.flags and not _stamped):
             reset_node(_flagsnode)
 
             _flagsubnodes = list(map(
@@ -357,6 +767,16 @@ class GDLParameter(dict):
 
 
         # <ArrayValues>
+        if (self._array_values is not None and not (
+            self._array_values_parsed is not None and \
+            self._array_values.shape == self._array_values_parsed.shape and \
+            np.array_equal(self._array_values, self._array_values_parsed)
+        )):
+            self["array"] = array_values_node(
+                self._array_values,
+                is_string=self.is_string,
+            )
+
         if (self.array is not None):
             set_child_node(
                 _node,
@@ -380,7 +800,7 @@ class GDLParameter(dict):
         )
 
     def __setattr__(self, key, value):
-        if (key in self.keys()):
+        if (dict.__contains__(self, key)):
             self[key] = value
         else:
             super().__setattr__(key, value)
@@ -484,6 +904,157 @@ def parseParameter(xmlNode):
     return _return
 
 
+_re_parameter_open = re.compile(
+    r'<(?P<type>[A-Za-z_]+) Name="(?P<name>[^"]*)">'
+)
+_re_parameter_value = re.compile(
+    r'(?P<open><Value>)(?P<value>[\s\S]*?)(?P<close></Value>)'
+)
+
+def format_parameter_value(
+    value:Any,
+    type:str,
+)->str:
+    """
+    Text to put between <Value> and </Value> for a parameter of the given type.
+
+    Strings go in CDATA, with any ]]> in them split by escape_cdata(); anything else is escaped as XML text.
+    """
+    if (type.title() in ("Title", "String")):
+        return f'<![CDATA["{escape_cdata(gdl_utilities.xml.strip_invalid_characters(str(value)))}"]]>'
+    elif (isinstance(value, (bool, np.bool_))):
+        return "1" if value else "0"
+    elif (isinstance(value, (float, np.floating))):
+        return np.format_float_positional(value, trim="-")
+    else:
+        return escape_xml(gdl_utilities.xml.strip_invalid_characters(str(value)))
+
+def patch_parameter_values_text(
+    xml:str,
+    values:Dict[str, Any],
+)->Tuple[str, List[str]]:
+    """
+    Change the <Value> of parameters in the text of an XML without parsing it.
+
+    Parameter names in values are matched case-insensitively, as GDL does.
+    Only the <Value> spans of the matched parameters are replaced; every other character is copied through unchanged.
+    Parameters without a <Value>, e.g. array parameters, are left alone.
+
+    Returns the new text, and the names of the parameters actually patched.
+    """
+    _values = { _name.lower():_value for _name, _value in values.items() }
+
+    _start = xml.find("<Parameters>")
+    _end = xml.find("</Parameters>", _start)
+    if (_start < 0 or _end < 0):
+        return xml, []
+
+    _chunks = []
+    _patched = []
+    _cursor = 0
+
+    for _match in _re_parameter_open.finditer(xml, _start, _end):
+        _name = _match.group("name")
+        if (_name.lower() not in _values):
+            continue
+
+        _type = _match.group("type")
+        _close = xml.find(f"</{_type}>", _match.end(), _end)
+        if (_close < 0):
+            continue
+
+        _value_match = _re_parameter_value.search(xml, _match.end(), _close)
+        if (_value_match is None):
+            continue
+
+        _chunks.append(xml[_cursor:_value_match.start("value")])
+        _chunks.append(format_parameter_value(_values[_name.lower()], _type))
+        _cursor = _value_match.end("value")
+
+        _patched.append(_name)
+
+    _chunks.append(xml[_cursor:])
+
+    return "".join(_chunks), _patched
+
+def patch_parameter_values(
+    path:str,
+    values:Dict[str, Any],
+    dest_path:str=None,
+)->List[str]:
+    """
+    Change the default values of parameters in an XML file with patch_parameter_values_text(), without a DOM round trip.
+
+    The file is only written if anything was patched. Returns the names of the parameters patched.
+    """
+    # newline="" so that line endings are copied through as they are.
+    with open(path, "r", encoding="UTF-8", newline="") as _stream:
+        _xml = _stream.read()
+
+    _xml, _patched = patch_parameter_values_text(_xml, values)
+
+    if (_patched or (dest_path is not None and dest_path != path)):
+        with open(dest_path or path, "w", encoding="UTF-8", newline="") as _stream:
+            _stream.write(_xml)
+
+    return _patched
+
+def patch_library_parameter_values(
+    paths:Union[str, Iterable[str]],
+    values:Dict[str, Any],
+    workers:int=None,
+)->Dict[str, Union[List[str], Exception]]:
+    """
+    patch_parameter_values() in place over many files, or every XML under a directory, in a thread pool.
+
+    Returns a dict of path: patched names, or the Exception raised for that file.
+    """
+    if (isinstance(paths, str)):
+        paths = iter_paths(paths, sub_directories=True) if (os.path.isdir(paths)) else [paths, ]
+
+    return dict(map_safely(
+        lambda _path: patch_parameter_values(_path, values),
+        paths,
+        workers=workers,
+    ))
+
+
+_re_script_section = re.compile(
+    r'<(?P<tag>Script_[A-Za-z0-9]+)(?:\s[^>]*)?>\s*<!\[CDATA\[(?P<script>[\s\S]*?)\]\]>\s*</(?P=tag)>'
+)
+
+def iter_script_spans(
+    xml:str,
+    kinds:Iterable[GDLScriptType]=None,
+)->Generator[Tuple[GDLScriptType, int, int], None, None]:
+    """
+    Locate the script sections in the text of an XML without parsing it.
+
+    Yields (kind, start, end) of the CDATA contents of each section of the requested kinds (all if None);
+    these may still be split into several CDATA sections - see unescape_cdata().
+    """
+    _tags = { _kind.value for _kind in (kinds or GDLScriptType) }
+
+    for _match in _re_script_section.finditer(xml):
+        if (_match.group("tag") in _tags):
+            yield GDLScriptType(_match.group("tag")), _match.start("script"), _match.end("script")
+
+def escape_cdata(text:str)->str:
+    """
+    Split any ]]> so the text can be put inside a CDATA section.
+
+    Only escape text as it is, e.g. from unescape_cdata(); escaping text that is already escaped splits it again.
+    """
+    return text.replace("]]>", "]]]]><![CDATA[>")
+
+def unescape_cdata(text:str)->str:
+    """
+    The text held by the contents of a CDATA section, joining any sections split by escape_cdata() - or by any other tool -
+    so that escape_cdata(unescape_cdata(text)) is the same however many times it is repeated.
+    """
+    return text.replace("]]><![CDATA[", "")
+
+
 # TODO To be reviewed and replaced with class based implementation above
 def parseParametersInFile(
     xmlfile:file,
@@ -0,0 +1,155 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Generator, Iterable, List, Union
+
+from tqdm import tqdm
+
+from file_io import file
+
+from gdl_utilities.parse_params import GDLXMLFile, iter_xmls
+from gdl_utilities.threads import default_workers
+
+class GDLPipelineSkipped():
+    """
+    Result of a file that a stage returned None for; the sink was not run.
+    """
+    def __bool__(self):
+        return False
+    __nonzero__ = __bool__
+
+class GDLPipelineResult():
+    def __bool__(self):
+        return not isinstance(self.result, (Exception, GDLPipelineSkipped))
+    __nonzero__ = __bool__
+
+    def __init__(
+        self,
+        source:file,
+        result:Any,
+    ):
+        self.source = source
+        self.result = result
+
+    def __repr__(
+        self,
+    ):
+        return f"{type(self).__name__}(source={repr(self.source.abspath())}, result={repr(self.result)})"
+
+def save_to_source(
+    xml_file:GDLXMLFile,
+    source:file,
+):
+    """
+    Default sink - write the transformed object back to where it came from.
+    """
+    return xml_file.save(source)
+
+class GDLPipeline():
+    """
+    Load -> transform -> save over a library of XMLs, with bounded memory.
+
+    Each source file is parsed into a GDLXMLFile, passed through every stage in order, then handed to the sink.
+    A stage takes a GDLXMLFile and returns a GDLXMLFile, or None to skip the rest of the pipeline for that file.
+    The sink takes the GDLXMLFile and its source file.
+
+    At most max_pending files are parsed or in flight at any time; the source is only read when a slot frees up.
+    The parsed tree of each file is released as soon as its sink has run.
+
+    Example:
+        GDLPipeline(iter_xmls("./XMLs", True)).map(set_company_name).run()
+    """
+    def __init__(
+        self,
+        source:Union[str, Iterable[file]],
+        stages:Iterable[Callable[[GDLXMLFile], Union[GDLXMLFile, None]]]=None,
+        sink:Callable[[GDLXMLFile, file], Any]=save_to_source,
+        workers:int=None,
+        max_pending:int=None,
+        show_progress:bool=False,
+    ):
+        if (isinstance(source, str)):
+            source = iter_xmls(source, sub_directories=True)
+
+        self.source = source
+        self.stages = list(stages) if (stages) else []
+        self.sink_function = sink
+        self.workers = default_workers(workers)
+        self.max_pending = max_pending or self.workers * 2
+        self.show_progress = show_progress
+
+    def map(
+        self,
+        stage:Callable[[GDLXMLFile], Union[GDLXMLFile, None]],
+    )->"GDLPipeline":
+        self.stages.append(stage)
+        return self
+
+    def sink(
+        self,
+        sink:Callable[[GDLXMLFile, file], Any],
+    )->"GDLPipeline":
+        self.sink_function = sink
+        return self
+
+    def process(
+        self,
+        source:file,
+    )->GDLPipelineResult:
+        """
+        Run one file through the whole pipeline. Exceptions are returned, not raised, so one bad part does not stop the rest.
+        """
+        _xml_file = None
+
+        try:
+            _xml_file = GDLXMLFile.from_file(source)
+
+            for _stage in self.stages:
+                _xml_file = _stage(_xml_file)
+
+                if (_xml_file is None):
+                    return GDLPipelineResult(source, GDLPipelineSkipped())
+
+            return GDLPipelineResult(source, self.sink_function(_xml_file, source))
+
+        except Exception as e:
+            return GDLPipelineResult(source, e)
+
+        finally:
+            if (_xml_file is not None):
+                _xml_file.release()
+
+    def iter_run(
+        self,
+    )->Generator[GDLPipelineResult, None, None]:
+        """
+        Generator yielding a GDLPipelineResult for every source file, in order of completion.
+        """
+        _pbar = tqdm(desc="Processing XMLs", disable=not self.show_progress)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as _executor:
+            _pending = set()
+            _source = iter(self.source)
+            _exhausted = False
+
+            while (_pending or not _exhausted):
+                # Top up to max_pending; this is the only place the source is read.
+                while (not _exhausted and len(_pending) < self.max_pending):
+                    try:
+                        _pending.add(_executor.submit(self.process, next(_source)))
+                    except StopIteration:
+                        _exhausted = True
+
+                if (not _pending):
+                    break
+
+                _done, _pending = wait(_pending, return_when=FIRST_COMPLETED)
+
+                for _future in _done:
+                    _pbar.update(1)
+                    yield _future.result()
+
+        _pbar.close()
+
+    def run(
+        self,
+    )->List[GDLPipelineResult]:
+        return list(self.iter_run())
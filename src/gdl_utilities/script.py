@@ -1,7 +1,12 @@
-from typing import Any, Dict, List, Iterable, Union
+import io
+import re
+from enum import Enum
+from typing import Any, Callable, Dict, Generator, List, Iterable, TextIO, Tuple, Union
 import numpy as np
 import pandas as pd
 
+from gdl_utilities.parse_params import GDLParameter, GDLParameters, array_values_node
+
 def generate_conditional_parameters(row:pd.Series, conditional_column = None):
     _skip = (conditional_column,)
     _header = f'''IF {conditional_column}=\'{row[conditional_column]}\' THEN\n'''
@@ -9,8 +14,11 @@ def generate_conditional_parameters(row:pd.Series, conditional_column = None):
     _footer = 'ENDIF\n\n'
     _return = ''
     _return += _header
-    for _index, _item in row.iteritems():
+    for _index, _item in row.items():
         if (not _index in _skip):
+            if (isinstance(_item, np.generic)):
+                _item = _item.item()
+
             # TODO expand repr() into something more bespoke, in case a Python object pops up
             _return += _set_parameter.format(
                 parameter=_index,
@@ -20,9 +28,430 @@ def generate_conditional_parameters(row:pd.Series, conditional_column = None):
     return _return
 
 
+def _column_as_objects(column:pd.Series)->np.ndarray:
+    """
+    Return the values of a column as a NumPy object array of Python scalars,
+    the same values generate_conditional_parameters() would see in each row.
+    """
+    _values = column.to_numpy(dtype=object)
+
+    # Typed columns already come out as Python scalars; only object columns can hide NumPy scalars.
+    if (column.dtype == object):
+        _values = np.array([ _item.item() if isinstance(_item, np.generic) else _item for _item in _values ], dtype=object)
+
+    return _values
+
+def _column_as_text(column:pd.Series, formatter:Callable[[Any], str])->pd.Series:
+    """
+    Return the values of a column formatted as generate_conditional_parameters() would, as a Series of str.
+
+    NumPy bool and numeric columns are converted with ndarray.astype(str), which gives the same text as str() and repr() of their Python scalars;
+    Series.astype(str) is not used as it keeps NaN missing instead of "nan".
+    Anything else goes through formatter one value at a time.
+    """
+    if (isinstance(column.dtype, np.dtype) and column.dtype.kind in "biuf"):
+        return pd.Series(column.to_numpy().astype(str), index=column.index, dtype=object)
+
+    return pd.Series(_column_as_objects(column), index=column.index, dtype=object).map(formatter)
+
+def _iter_conditional_parameters_chunks(
+    dataframe:pd.DataFrame,
+    conditional_column:str,
+    chunksize:int,
+)->Iterable[str]:
+    """
+    Generator yielding the IF blocks of a DataFrame, chunksize rows at a time.
+
+    Each chunk is formatted column-wise: every column is converted to text in one pass,
+    then the columns are concatenated row-wise with Series.str.cat().
+    """
+    _columns = [ _column for _column in dataframe.columns if (_column != conditional_column) ]
+
+    # A row of a DataFrame with only numeric columns is upcast to their common dtype, e.g. int to float;
+    # cast the columns the same way so the text matches generate_conditional_parameters().
+    _row_dtype = dataframe.iloc[:0].to_numpy().dtype
+
+    for _start in range(0, dataframe.shape[0], chunksize):
+        _chunk = dataframe.iloc[_start:_start+chunksize]
+
+        if (_row_dtype != object):
+            _chunk = _chunk.astype(_row_dtype)
+
+        _header = f"IF {conditional_column}='" + _column_as_text(_chunk[conditional_column], str) + "' THEN\n"
+
+        _blocks = _header.str.cat(
+            [
+                f"\t{_column}\t=\t" + _column_as_text(_chunk[_column], repr) + "\n" \
+                    for _column in _columns
+            ],
+            sep="",
+        ) + "ENDIF\n\n"
+
+        yield _blocks.str.cat(sep="")
+
+def generate_conditional_parameters_from_dataframe(
+    dataframe:pd.DataFrame,
+    conditional_column:str = None,
+    output:Union[str, TextIO] = None,
+    chunksize:int = 10000,
+)->Union[str, int]:
+    """
+    DataFrame-level equivalent of generate_conditional_parameters().
+
+    Produces the same text as applying generate_conditional_parameters() to every row and joining the results,
+    but formats whole columns at a time instead of building a pd.Series per row.
+
+    If output is None, the script is returned as a str.
+    Otherwise output can be a file path or a text stream; the script is written chunksize rows at a time,
+    and the number of characters written is returned.
+    """
+    _chunks = _iter_conditional_parameters_chunks(
+        dataframe,
+        conditional_column=conditional_column,
+        chunksize=max(int(chunksize), 1),
+    )
+
+    if (output is None):
+        _buffer = io.StringIO()
+        for _chunk in _chunks:
+            _buffer.write(_chunk)
+        return _buffer.getvalue()
+
+    _written = 0
+    if (isinstance(output, str)):
+        with open(output, "w", encoding="UTF-8") as _stream:
+            for _chunk in _chunks:
+                _written += _stream.write(_chunk)
+    else:
+        for _chunk in _chunks:
+            _written += output.write(_chunk)
+
+    return _written
+
+
+lookup_prefix = "_lookup_"
+
+def gdl_parameter_type(column:pd.Series)->str:
+    """
+    Map the dtype of a DataFrame column to the GDL parameter type used to store it.
+    """
+    if (pd.api.types.is_bool_dtype(column)):
+        return "Boolean"
+    elif (pd.api.types.is_integer_dtype(column)):
+        return "Integer"
+    elif (pd.api.types.is_float_dtype(column)):
+        return "RealNum"
+    else:
+        return "String"
+
+def gdl_string_literal(value:str)->str:
+    """
+    Quote a str as a GDL string literal, with whichever quote it does not contain.
+
+    GDL cannot escape quotes, so a str containing both is split into a concatenation of literals,
+    e.g. it's "it" becomes "it's " + '"' + "it" + '"'.
+    """
+    if ('"' not in value):
+        return f'"{value}"'
+    elif ("'" not in value):
+        return f"'{value}'"
+
+    return " + ".join(
+        f"'{_part}'" if (_part.startswith('"')) else f'"{_part}"' for _part in re.findall(r'[^"]+|"+', value)
+    )
+
+def gdl_literal(value:Any, is_string:bool=False)->str:
+    """
+    Render a Python scalar as a GDL literal.
+
+    Missing values - None, NaN, pd.NA, NaT - become "" if is_string, i.e. for a String column, and 0 otherwise.
+    If is_string, every other value is rendered as a string too.
+    """
+    if (isinstance(value, np.generic)):
+        value = value.item()
+
+    if (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return '""' if (is_string) else "0"
+    elif (is_string):
+        return gdl_string_literal(str(value))
+    elif (isinstance(value, bool)):
+        return "1" if value else "0"
+    elif (isinstance(value, (int, float))):
+        return repr(value)
+    else:
+        return gdl_string_literal(str(value))
+
+def _lookup_values(column:pd.Series, gdl_type:str)->np.ndarray:
+    """
+    Values of a catalogue column for an ArrayValues parameter of gdl_type, with missing values as "" for strings and 0 otherwise.
+    """
+    return np.where(
+        pd.isna(column).to_numpy(dtype=np.bool_),
+        "" if (gdl_type == "String") else 0,
+        _column_as_objects(column),
+    )
+
+def generate_lookup_parameters(
+    dataframe:pd.DataFrame,
+    key_column:str,
+    prefix:str = lookup_prefix,
+)->GDLParameters:
+    """
+    Build hidden ArrayValues parameters holding every column of a catalogue DataFrame,
+    plus {prefix}id holding 1..n for use with VALUES{2}.
+
+    Use .node_xml on the returned GDLParameters to get the <Parameters> XML.
+    """
+    _columns = [key_column] + [ _column for _column in dataframe.columns if (_column != key_column) ]
+
+    _parameters = GDLParameters()
+    _parameters.append(
+        GDLParameter(
+            name=f"{prefix}id",
+            type="Integer",
+            description="Lookup Index",
+            fix=False,
+            flags=["ParFlg_Hidden", ],
+            value=None,
+            array=array_values_node(np.arange(1, dataframe.shape[0]+1)),
+        )
+    )
+
+    for _column in _columns:
+        _type = gdl_parameter_type(dataframe[_column])
+        _values = _lookup_values(dataframe[_column], _type)
+
+        _parameters.append(
+            GDLParameter(
+                name=f"{prefix}{_column}",
+                type=_type,
+                description=f"Lookup {_column}",
+                fix=False,
+                flags=["ParFlg_Hidden", ],
+                value=None,
+                array=array_values_node(_values, is_string=(_type == "String")),
+            )
+        )
+
+    return _parameters
+
+def generate_lookup_arrays(
+    dataframe:pd.DataFrame,
+    key_column:str,
+    prefix:str = lookup_prefix,
+)->str:
+    """
+    GDL script declaring the catalogue as DIM arrays, for use when the data cannot be stored as parameters.
+
+    Columns are formatted column-wise; see generate_lookup_parameters() for the script-free alternative.
+    """
+    _columns = [key_column] + [ _column for _column in dataframe.columns if (_column != key_column) ]
+    _count = dataframe.shape[0]
+
+    _lines = [
+        f"DIM {prefix}id[{_count:d}]",
+    ] + [
+        f"DIM {prefix}{_column}[{_count:d}]" for _column in _columns
+    ] + [
+        f"{prefix}id[{_id:d}] = {_id:d}" for _id in range(1, _count+1)
+    ]
+
+    for _column in _columns:
+        _is_string = gdl_parameter_type(dataframe[_column]) == "String"
+        _lines.extend(
+            f"{prefix}{_column}[{_id:d}] = {gdl_literal(_value, is_string=_is_string)}" \
+                for _id, _value in enumerate(_column_as_objects(dataframe[_column]), start=1)
+        )
+
+    return "\n".join(_lines) + "\n"
+
+def generate_lookup_dispatch(
+    dataframe:pd.DataFrame,
+    key_column:str,
+    index_parameter:str,
+    prefix:str = lookup_prefix,
+)->str:
+    """
+    GDL script assigning every column from the lookup arrays by index_parameter.
+
+    Each lookup is a direct array access, regardless of the number of rows in the catalogue.
+    """
+    _columns = [key_column] + [ _column for _column in dataframe.columns if (_column != key_column) ]
+    _assignments = "".join(
+        f"\t{_column}\t=\t{prefix}{_column}[{index_parameter}]\n" for _column in _columns
+    )
+
+    return f"IF {index_parameter}>=1 AND {index_parameter}<={dataframe.shape[0]:d} THEN\n" + \
+           _assignments + \
+           "ENDIF\n"
+
+def generate_lookup_values(
+    index_parameter:str,
+    key_column:str,
+    prefix:str = lookup_prefix,
+)->str:
+    """
+    GDL parameter script line offering the catalogue keys as the values list of index_parameter.
+    """
+    return f'VALUES{{2}} "{index_parameter}" {prefix}id, {prefix}{key_column}\n'
+
+def generate_lookup_tables(
+    dataframe:pd.DataFrame,
+    key_column:str,
+    index_parameter:str,
+    prefix:str = lookup_prefix,
+    as_parameters:bool = True,
+)->Dict[str, Union[str, GDLParameters]]:
+    """
+    Array-indexed replacement for one IF ... THEN ... ENDIF block per catalogue row.
+
+    index_parameter is an Integer parameter holding the 1-based row number,
+    chosen by the user through the VALUES{2} list built from key_column.
+
+    Returns a dict of:
+    {
+        "master": Master Script,
+        "parameter": Parameter Script,
+        "parameters": GDLParameters holding the arrays if as_parameters is True, otherwise None.
+    }
+    If as_parameters is False, the arrays are declared with DIM at the top of the Master Script instead.
+    """
+    _master = "! === Master Script ==\n\n"
+
+    if (not as_parameters):
+        _master += generate_lookup_arrays(dataframe, key_column=key_column, prefix=prefix) + "\n"
+
+    _master += generate_lookup_dispatch(dataframe, key_column=key_column, index_parameter=index_parameter, prefix=prefix)
+
+    return {
+        "master":_master,
+        "parameter":"! === Parameter Script ==\n\n" + generate_lookup_values(index_parameter=index_parameter, key_column=key_column, prefix=prefix),
+        "parameters":generate_lookup_parameters(dataframe, key_column=key_column, prefix=prefix) if (as_parameters) else None,
+    }
+
+
+class GDLTokenType(Enum):
+    COMMENT     = "comment"
+    STRING      = "string"
+    NUMBER      = "number"
+    IDENTIFIER  = "identifier"
+    OTHER       = "other"
+
+# Order matters: comments and strings are consumed whole before anything inside them can match.
+_re_gdl_token = re.compile(
+    r'(?P<comment>![^\n\r]*)'
+    r'|(?P<string>"[^"\n\r]*"?|\'[^\'\n\r]*\'?|`[^`\n\r]*`?|´[^´\n\r]*´?|“[^”\n\r]*”?|‘[^’\n\r]*’?)'
+    r'|(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)'
+    r'|(?P<identifier>[A-Za-z_~][A-Za-z0-9_~]*)'
+    r'|(?P<other>[^!"\'`´“‘A-Za-z_~0-9.]+|.)',
+    flags=re.DOTALL,
+)
+
+def iter_gdl_tokens(
+    script:str,
+)->Generator[Tuple[GDLTokenType, str, int, int], None, None]:
+    """
+    Split a GDL script into tokens, yielding (token type, text, start, end).
+
+    Only enough of GDL is understood to tell identifiers apart from comments, strings and numbers;
+    concatenating the text of every token gives back the original script.
+    """
+    for _match in _re_gdl_token.finditer(script or ""):
+        yield GDLTokenType(_match.lastgroup), _match.group(), _match.start(), _match.end()
+
+def iter_gdl_identifiers(
+    script:str,
+)->Generator[Tuple[str, int, int], None, None]:
+    """
+    Yield (identifier, start, end) of every identifier in a GDL script, outside strings and comments.
+    """
+    for _type, _text, _start, _end in iter_gdl_tokens(script):
+        if (_type is GDLTokenType.IDENTIFIER):
+            yield _text, _start, _end
+
+
+# Statements naming parameters in string literals, e.g. VALUES "A" 1, 2:
+# {keyword: how many of the string literals following it are parameter names, None for all of them to the end of the statement}
+# Suffixed forms are included, e.g. VALUES{2} and UI_INFIELD{4}, as the suffix is not a string.
+# Parameters named as identifiers rather than strings - PARAMETERS A = 1, CALL "macro" PARAMETERS A = A - are renamed as any other identifier.
+# Nothing else is: the strings of REQUEST, APPLICATION_QUERY, LIBRARYGLOBAL etc. are request and option names,
+# and a parameter name built at run time, e.g. "A" + STR(i, 1, 0), cannot be found.
+parameter_name_keywords = {
+    "values":                   1,          # VALUES / VALUES{2} "name" ...
+    "lock":                     None,       # LOCK [ALL] "name1", "name2" ...
+    "hideparameter":            None,       # HIDEPARAMETER [ALL] "name1", "name2" ...
+    "parvalue_description":     1,          # PARVALUE_DESCRIPTION("name" [, ind1 [, ind2]])
+    "glob_modpar_name":         1,          # IF GLOB_MODPAR_NAME = "name" THEN
+    "ui_infield":               1,          # UI_INFIELD / UI_INFIELD{2..4} "name", x, y, ...
+    "ui_custom_popup_infield":  1,          # UI_CUSTOM_POPUP_INFIELD / {2} "name", x, y, ...
+    "ui_listitem":              1,          # UI_LISTITEM itemID, listID, "name" ...
+    "ui_radiobutton":           1,          # UI_RADIOBUTTON "name", value, text, ...
+    "ui_pict_radiobutton":      1,          # UI_PICT_RADIOBUTTON "name", value, text, ...
+    "ui_slider":                1,          # UI_SLIDER "name", x, y, ...
+    "ui_colorpicker":           3,          # UI_COLORPICKER "red", "green", "blue", x, y, ...
+}
+
+def rename_gdl_identifiers(
+    script:str,
+    renames:Dict[str, str],
+    rename_strings:bool=True,
+)->Tuple[str, int]:
+    """
+    Rename identifiers in a GDL script, matched case-insensitively; text in comments and strings is left alone.
+
+    If rename_strings, a string literal that is exactly one of the names is renamed too,
+    but only where it is the parameter name argument of one of parameter_name_keywords (VALUES, LOCK, GLOB_MODPAR_NAME etc.);
+    option values such as the "A" in VALUES "size" "A", "B" are kept.
+
+    Returns the new script and the number of tokens renamed.
+    """
+    _renames = { _old.lower():_new for _old, _new in renames.items() }
+
+    _chunks = []
+    _count = 0
+
+    _name_strings = 0           # string literals still to come in this statement that are parameter names
+    _continued = False
+
+    for _type, _text, _start, _end in iter_gdl_tokens(script):
+        if (_type is GDLTokenType.IDENTIFIER):
+            _lower = _text.lower()
+            if (_lower in parameter_name_keywords):
+                _name_strings = parameter_name_keywords[_lower]
+            if (_lower in _renames):
+                _text = _renames[_lower]
+                _count += 1
+            _continued = False
+
+        elif (_type is GDLTokenType.STRING):
+            if (_name_strings is None or _name_strings > 0):
+                if (rename_strings and len(_text) >= 2 and _text[1:-1].lower() in _renames):
+                    _text = _text[0] + _renames[_text[1:-1].lower()] + _text[-1]
+                    _count += 1
+                if (_name_strings is not None):
+                    _name_strings -= 1
+            _continued = False
+
+        elif (_type is GDLTokenType.OTHER):
+            _stripped = _text.strip()
+
+            # A statement ends at a new line, unless the line ends with a comma; or at a colon.
+            if ((("\n" in _text or "\r" in _text) and not (_continued or _stripped.startswith(","))) or ":" in _text):
+                _name_strings = 0
+
+            if (_stripped):
+                _continued = _stripped.endswith(",")
+
+        else:
+            _continued = False
+
+        _chunks.append(_text)
+
+    return "".join(_chunks), _count
+
+
 def reverse_vertices_direction(lines = None, status_column = None):
     '''
     Reverse a Polyline direction in GDL etc.
     '''
     pass
-
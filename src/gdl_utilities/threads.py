@@ -0,0 +1,64 @@
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import os
+from typing import Any, Callable, Generator, Iterable, Tuple, Union
+
+from tqdm import tqdm
+
+def default_workers(
+    workers:int=None,
+    limit:int=8,
+)->int:
+    """
+    workers if given, otherwise one thread per CPU up to limit.
+    """
+    return workers or min(limit, os.cpu_count() or 1)
+
+def call_safely(
+    function:Callable,
+    *args,
+    **kwargs,
+)->Union[Any, Exception]:
+    """
+    function(*args, **kwargs), with any Exception returned instead of raised,
+    so that one bad file does not stop the rest of a batch.
+    """
+    try:
+        return function(*args, **kwargs)
+    except Exception as e:
+        return e
+
+def map_safely(
+    function:Callable[[Any], Any],
+    items:Iterable[Any],
+    workers:int=None,
+    desc:str=None,
+    show_progress:bool=False,
+)->Generator[Tuple[Any, Union[Any, Exception]], None, None]:
+    """
+    Generator running call_safely(function, item) for every one of items in a thread pool of default_workers(workers) threads.
+
+    Yields (item, result or Exception) in the order of items.
+    items are read lazily: at most twice as many as there are workers are in flight, so results stream as soon as they are ready.
+    """
+    workers = default_workers(workers)
+
+    with ThreadPoolExecutor(max_workers=workers) as _executor, tqdm(
+        total=len(items) if (hasattr(items, "__len__")) else None,
+        desc=desc,
+        disable=not show_progress,
+    ) as _progress:
+        _pending = collections.deque()
+
+        for _item in items:
+            _pending.append((_item, _executor.submit(call_safely, function, _item)))
+
+            if (len(_pending) >= workers * 2):
+                _item, _future = _pending.popleft()
+                yield _item, _future.result()
+                _progress.update()
+
+        while (_pending):
+            _item, _future = _pending.popleft()
+            yield _item, _future.result()
+            _progress.update()
@@ -0,0 +1,301 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import queue
+import threading
+import time as timer
+from typing import Any, Callable, Dict, List, Set, Tuple, Union
+
+from fakemodule import ModuleUnavailable
+
+from gdl_utilities.gsm_commands import _default_version, xml_to_gsm
+from gdl_utilities.parse_params import iter_paths
+from gdl_utilities.threads import default_workers
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except (ImportError, ModuleNotFoundError) as e:
+    FileSystemEventHandler = object
+    Observer = ModuleUnavailable(e)
+
+def snapshot_xmls(
+    dir_path:str,
+)->Dict[str, Tuple[int, float]]:
+    """
+    {path: (size, modification time)} of every XML under dir_path and its sub-directories.
+    """
+    _snapshot = {}
+
+    for _path in iter_paths(dir_path, sub_directories=True, extensions=(".xml", )):
+        try:
+            _stat = os.stat(_path)
+        except OSError:
+            continue
+        _snapshot[_path] = (_stat.st_size, _stat.st_mtime)
+
+    return _snapshot
+
+class PollingEventSource():
+    """
+    Changed XMLs found by comparing snapshot_xmls() of the tree every interval seconds.
+    """
+    def __init__(
+        self,
+        dir_path:str,
+        interval:float=1.0,
+    ):
+        self.dir_path = dir_path
+        self.interval = interval
+        self.snapshot = snapshot_xmls(dir_path)
+        self.last_poll = timer.perf_counter()
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def poll(
+        self,
+    )->Set[str]:
+        """
+        Paths of XMLs added or modified since the last poll; empty if interval has not passed yet.
+        """
+        if (timer.perf_counter() - self.last_poll < self.interval):
+            return set()
+
+        _snapshot = snapshot_xmls(self.dir_path)
+        _changed = { _path for _path, _stat in _snapshot.items() if self.snapshot.get(_path, None) != _stat }
+
+        self.snapshot = _snapshot
+        self.last_poll = timer.perf_counter()
+
+        return _changed
+
+class _QueueEventHandler(FileSystemEventHandler):
+    def __init__(
+        self,
+        events:queue.Queue,
+    ):
+        super().__init__()
+        self.events = events
+
+    def on_any_event(self, event):
+        if (event.is_directory or event.event_type not in ("created", "modified", "moved", "closed")):
+            return
+
+        # For a move, the destination is what needs converting
+        _path = os.fsdecode(getattr(event, "dest_path", None) or event.src_path)
+
+        if (_path.lower().endswith(".xml")):
+            self.events.put(_path)
+
+class WatchdogEventSource():
+    """
+    Changed XMLs reported by the operating system through watchdog - inotify on Linux, FSEvents on macOS.
+    """
+    def __init__(
+        self,
+        dir_path:str,
+    ):
+        self.dir_path = dir_path
+        self.events = queue.Queue()
+        self.observer = Observer()
+        self.observer.schedule(_QueueEventHandler(self.events), dir_path, recursive=True)
+
+    def start(self):
+        self.observer.start()
+
+    def stop(self):
+        self.observer.stop()
+        self.observer.join()
+
+    def poll(
+        self,
+    )->Set[str]:
+        _changed = set()
+
+        while (True):
+            try:
+                _changed.add(self.events.get_nowait())
+            except queue.Empty:
+                return _changed
+
+def event_source(
+    dir_path:str,
+    polling:bool=None,
+    interval:float=1.0,
+)->Union[WatchdogEventSource, PollingEventSource]:
+    """
+    WatchdogEventSource if watchdog is installed and polling is not True, PollingEventSource otherwise.
+    """
+    if (not polling and Observer):
+        try:
+            return WatchdogEventSource(dir_path)
+        except OSError:
+            # e.g. out of inotify watches on a large tree
+            if (polling is False):
+                raise
+
+    return PollingEventSource(dir_path, interval=interval)
+
+class GDLWatcher():
+    """
+    Watch a tree of XMLs and convert each part to GSM as soon as it has been saved.
+
+    Events for a path are debounced: a part is converted once no further change to it is seen for debounce seconds,
+    so a burst of saves becomes one conversion.
+    At most workers conversions run at a time; a part changed again while it is being converted is queued again once done.
+
+    convert is called as convert(xml path, gsm path) and defaults to xml_to_gsm() with version, password and validate.
+    The GSM path mirrors the XML path under dest_path, or sits next to the XML if dest_path is None.
+
+    source is any object with start(), stop() and poll() like PollingEventSource, and defaults to event_source();
+    clock returns the time in seconds used for debouncing and timeout, and defaults to time.perf_counter().
+
+    Example:
+        GDLWatcher("./XMLs", "./Library", version=25).run()
+    """
+    def __init__(
+        self,
+        source_path:str,
+        dest_path:str=None,
+        version:int=_default_version,
+        password:str="",
+        validate:bool=True,
+        debounce:float=0.5,
+        workers:int=None,
+        polling:bool=None,
+        poll_interval:float=1.0,
+        convert:Callable[[str, str], Any]=None,
+        on_result:Callable[[str, Any], Any]=None,
+        source:Union[WatchdogEventSource, PollingEventSource]=None,
+        clock:Callable[[], float]=None,
+        show_progress:bool=False,
+    ):
+        self.source_path = os.path.abspath(source_path)
+        self.dest_path = os.path.abspath(dest_path) if (dest_path) else None
+        self.debounce = debounce
+        self.workers = default_workers(workers, limit=4)
+        self.polling = polling
+        self.poll_interval = poll_interval
+        self.on_result = on_result
+        self.source = source
+        self.clock = clock or timer.perf_counter
+        self.show_progress = show_progress
+
+        if (convert is None):
+            convert = lambda source, dest: xml_to_gsm(
+                source,
+                version=version,
+                password=password,
+                dest_path=dest,
+                show_progress=show_progress,
+                validate=validate,
+            )
+        self.convert = convert
+
+        self.results = {}
+        self._stop = threading.Event()
+
+    def gsm_path(
+        self,
+        xml_path:str,
+    )->str:
+        _gsm_path = os.path.splitext(xml_path)[0] + ".gsm"
+
+        if (self.dest_path is None):
+            return _gsm_path
+
+        return os.path.join(self.dest_path, os.path.relpath(_gsm_path, self.source_path))
+
+    def _convert(
+        self,
+        xml_path:str,
+    )->Tuple[Any, float]:
+        _start = timer.perf_counter()
+
+        try:
+            _gsm_path = self.gsm_path(xml_path)
+            os.makedirs(os.path.dirname(_gsm_path), exist_ok=True)
+            _result = self.convert(xml_path, _gsm_path)
+        except Exception as e:
+            _result = e
+
+        return _result, timer.perf_counter() - _start
+
+    def _finished(
+        self,
+        xml_path:str,
+        future:Future,
+    ):
+        _result, _duration = future.result()
+        self.results[xml_path] = _result
+
+        if (self.show_progress):
+            print (f"{'Converted' if (_result) else 'Failed'} {xml_path} in {_duration:.2f}s: {_result}")
+
+        if (self.on_result is not None):
+            self.on_result(xml_path, _result)
+
+    def stop(
+        self,
+    ):
+        """
+        Make run() return once the conversions in flight are done; safe to call from another thread.
+        """
+        self._stop.set()
+
+    def run(
+        self,
+        timeout:float=None,
+        tick:float=0.05,
+    )->Dict[str, Any]:
+        """
+        Watch until stop() is called, or for timeout seconds.
+
+        Returns {xml path: result of the latest conversion} of every part converted.
+        """
+        _source = self.source if (self.source is not None) else event_source(self.source_path, polling=self.polling, interval=self.poll_interval)
+        _source.start()
+
+        if (self.show_progress):
+            print (f"Watching {self.source_path} with {type(_source).__name__}.")
+
+        _deadline = self.clock() + timeout if (timeout is not None) else None
+        _settling = {}      # path: time of the last event
+        _running = {}       # path: Future
+        _dirty = set()      # changed again while running
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as _executor:
+                while (not self._stop.is_set() and (_deadline is None or self.clock() < _deadline)):
+                    _now = self.clock()
+
+                    for _path in _source.poll():
+                        if (_path in _running):
+                            _dirty.add(_path)
+                        else:
+                            _settling[_path] = _now
+
+                    for _path in [ _path for _path, _future in _running.items() if _future.done() ]:
+                        self._finished(_path, _running.pop(_path))
+
+                        if (_path in _dirty):
+                            _dirty.discard(_path)
+                            _settling[_path] = _now
+
+                    for _path in [ _path for _path, _time in _settling.items() if _now - _time >= self.debounce ]:
+                        del _settling[_path]
+
+                        if (os.path.exists(_path)):
+                            _running[_path] = _executor.submit(self._convert, _path)
+
+                    self._stop.wait(tick)
+
+                for _path, _future in _running.items():
+                    self._finished(_path, _future)
+        finally:
+            _source.stop()
+
+        return self.results
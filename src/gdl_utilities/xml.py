@@ -1,6 +1,13 @@
+import collections
+import fnmatch
 import re
 import os
 import sys
+from typing import Dict, Generator, Iterable, List, Union
+
+from lxml import etree as ET
+
+from gdl_utilities.threads import map_safely
 
 illegal_unicode_characters = [
     (0, 8),
@@ -34,3 +41,185 @@ def strip_invalid_characters(xml_text = None):
     _xml_illegal_character_regex = '[' + ''.join(_illegal_ranges) + ']'
     _illegal_xml_chars_re = re.compile(_xml_illegal_character_regex)
     return re.sub(_illegal_xml_chars_re, '', xml_text)
+
+
+required_symbol_attributes = (
+    "MainGUID",
+    "Version",
+)
+
+# Script sections are optional - GDLXMLFile accepts parts without any of them
+required_sections = (
+    "ParamSection",
+)
+
+class XMLValidationError(ValueError):
+    def __bool__(self):
+        return False
+    __nonzero__ = __bool__
+
+    def __init__(self, path:str, errors:List[str]):
+        self.path = path
+        self.errors = errors
+        super().__init__(f"{path}: " + "; ".join(errors))
+
+class XMLValidationSuccess():
+    def __bool__(self):
+        return True
+    __nonzero__ = __bool__
+
+    def __init__(self, path:str):
+        self.path = path
+
+    def __repr__(self):
+        return f"{type(self).__name__}(path={repr(self.path)})"
+
+def validate_xml(
+    path:str,
+    required_sections:Iterable[str]=required_sections,
+    required_symbol_attributes:Iterable[str]=required_symbol_attributes,
+)->Union[XMLValidationSuccess, XMLValidationError]:
+    """
+    Check a library part XML before it is given to LP_XMLConverter:
+    - well-formed, without characters LP_XMLConverter rejects,
+    - a <Symbol> root with required_symbol_attributes,
+    - every one of required_sections present,
+    - a <Parameters> node in <ParamSection>, with no parameter name declared twice (GDL names are case-insensitive).
+
+    Returns XMLValidationSuccess, or XMLValidationError listing everything wrong with the file.
+    """
+    _errors = []
+
+    try:
+        with open(path, "rb") as _stream:
+            _xml = _stream.read()
+    except OSError as e:
+        return XMLValidationError(path, [f"Cannot be read: {e}"])
+
+    try:
+        _root = ET.fromstring(_xml, parser=ET.XMLParser(strip_cdata=False, huge_tree=True))
+    except ET.XMLSyntaxError as e:
+        return XMLValidationError(path, [f"Not well-formed: {e}"])
+
+    if (_root.tag != "Symbol"):
+        return XMLValidationError(path, [f"Root element is <{_root.tag}>, not <Symbol>."])
+
+    for _attr in required_symbol_attributes:
+        if (not _root.get(_attr)):
+            _errors.append(f"<Symbol> is missing the {_attr} attribute.")
+
+    _sections = { _child.tag for _child in _root.iterchildren(tag=ET.Element) }
+
+    for _section in required_sections:
+        if (_section not in _sections):
+            _errors.append(f"<{_section}> section missing.")
+
+    _parameters = _root.find("ParamSection/Parameters")
+
+    if (_parameters is None):
+        if ("ParamSection" in _sections):
+            _errors.append("<ParamSection> has no <Parameters>.")
+    else:
+        _names = [ _parameter.get("Name", "") for _parameter in _parameters.iterchildren(tag=ET.Element) ]
+        _counts = collections.Counter(_name.lower() for _name in _names)
+
+        for _name in dict.fromkeys(_names):
+            _count = _counts.pop(_name.lower(), 0)
+            if (not _name):
+                _errors.append(f"{_count:d} parameter(s) without a Name.")
+            elif (_count > 1):
+                _errors.append(f"Parameter {_name} declared {_count:d} times.")
+
+    if (_errors):
+        return XMLValidationError(path, _errors)
+    else:
+        return XMLValidationSuccess(path)
+
+def iter_paths(
+    dir_path:str,
+    sub_directories:bool=False,
+    extensions:Iterable[str]=(".xml", ),
+    patterns:Iterable[str]=None,
+    sort:bool=False,
+)->Generator[str, None, None]:
+    """
+    Generator walking dir_path with os.scandir, yielding the path of each matching file as soon as it is found.
+
+    extensions are matched case-insensitively;
+    patterns are glob patterns (fnmatch) matched against the file name, any of which has to match.
+    Nothing is created for entries that do not match.
+
+    If sort is True, entries of each directory are visited in name order, giving a deterministic depth-first order.
+    """
+    _extensions = tuple(_extension.lower() for _extension in extensions) if (extensions) else None
+    _patterns = tuple(patterns) if (patterns) else None
+
+    _stack = [dir_path, ]
+
+    while (_stack):
+        _current = _stack.pop()
+
+        try:
+            with os.scandir(_current) as _scan:
+                _entries = sorted(_scan, key=lambda _entry: _entry.name) if (sort) else list(_scan)
+        except (PermissionError, FileNotFoundError, NotADirectoryError):
+            continue
+
+        _sub_dirs = []
+
+        for _entry in _entries:
+            try:
+                if (_entry.is_dir()):
+                    if (sub_directories):
+                        _sub_dirs.append(_entry.path)
+                    continue
+            except OSError:
+                continue
+
+            _name = _entry.name
+
+            if (_extensions and not _name.lower().endswith(_extensions)):
+                continue
+
+            if (_patterns and not any(fnmatch.fnmatch(_name, _pattern) for _pattern in _patterns)):
+                continue
+
+            yield _entry.path
+
+        # Reversed so that the stack pops them in order
+        _stack.extend(reversed(_sub_dirs))
+
+def iter_xml_paths(
+    dir_path:str,
+)->Generator[str, None, None]:
+    """
+    All .xml files under dir_path and its sub-directories, as LP_XMLConverter x2l would pick them up.
+    """
+    return iter_paths(dir_path, sub_directories=True, extensions=(".xml", ))
+
+def validate_xmls(
+    paths:Union[str, Iterable[str]],
+    workers:int=None,
+    **kwargs,
+)->Dict[str, Union[XMLValidationSuccess, XMLValidationError]]:
+    """
+    validate_xml() over many files in a thread pool; paths can also be a directory.
+
+    Returns a dict of path: result, in the order of paths.
+    """
+    if (isinstance(paths, str)):
+        paths = iter_xml_paths(paths) if (os.path.isdir(paths)) else [paths, ]
+
+    _results = {}
+
+    for _path, _result in map_safely(
+        lambda _path: validate_xml(_path, **kwargs),
+        paths,
+        workers=workers,
+    ):
+        if (isinstance(_result, Exception) and not isinstance(_result, XMLValidationError)):
+            _result = XMLValidationError(_path, [str(_result), ])
+
+        _results[_path] = _result
+
+    return _results
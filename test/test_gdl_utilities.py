@@ -1,22 +1,30 @@
 import os, sys
 
 
+from collections import Counter
 from datetime import datetime
 import random
+import re
 import secrets
+import shutil
+import tempfile
+import threading
 import time as timer
+import uuid
+from types import ModuleType
 import warnings
 
 import numpy as np
 import pandas as pd
+from lxml import etree as ET
 
 from file_io import file
 
 import gdl_utilities
 from gdl_utilities.gsm_commands import convert_operation, convert_library_parts, GSMConvertSuccess, convert_gsm_archicad_versions
 from gdl_utilities.ac_commands import start_archicad, kill_archicad
-from gdl_utilities import ac_connector
-from gdl_utilities.ac_connection import GROUP_PROPERTY_SEPARATOR
+from gdl_utilities import ac_connector, threads
+from gdl_utilities.ac_connection import GROUP_PROPERTY_SEPARATOR, ElementsPropertyValues
 
 import quicktest
 unittest = quicktest
@@ -31,6 +39,142 @@ SHOW_PROGRESS = False
 
 _ac_handler = None
 
+class StubCommands():
+    """
+    Stand-in for archicad.Commands, answering from a made-up catalogue of properties and elements; counts the calls made.
+    """
+    def __init__(self, types, element_count=10):
+        self.types = types
+        self.alive = True
+        self.calls = {}
+        self.lock = threading.Lock()
+        self.property_userids = [
+            types.BuiltInPropertyUserId("IdAndCategories_ElementID"),
+            types.UserDefinedPropertyUserId(["Test Group", "Length"]),
+            types.BuiltInPropertyUserId("IdAndCategories_Name"),
+            types.UserDefinedPropertyUserId(["Test Group 2", "Count"]),
+            types.UserDefinedPropertyUserId(["Test Group", "Option"]),
+            types.UserDefinedPropertyUserId(["A.B", "Options"]),
+        ]
+        self.property_ids = {
+            repr(_userid):types.PropertyId(uuid.uuid5(uuid.NAMESPACE_OID, repr(_userid))) for _userid in self.property_userids
+        }
+        self.element_ids = [
+            types.ElementIdArrayItem(types.ElementId(uuid.uuid5(uuid.NAMESPACE_OID, f"element {_id:d}"))) for _id in range(element_count)
+        ]
+        # {(element guid, property guid): property value} of the values set
+        self.values = {}
+        # Replies of GetPropertyIds are cut to this many items, if set
+        self.reply_limit = None
+        # {command: Exception raised by it}
+        self.errors = {}
+        # {(element guid, property guid): error codes of the next attempts to set it}
+        self.failures = {}
+        # {(element guid, property guid): Exceptions raised by the next batches setting it}
+        self.batch_errors = {}
+        # (element guid, property guid) of the values of each SetPropertyValuesOfElements call
+        self.batches = []
+
+    def _called(self, command):
+        with self.lock:
+            self.calls[command] = self.calls.get(command, 0) + 1
+        if (command in self.errors):
+            raise self.errors[command]
+
+    def IsAlive(self):
+        self._called("IsAlive")
+        return self.alive
+
+    def GetAllPropertyNames(self):
+        self._called("GetAllPropertyNames")
+        return list(self.property_userids)
+
+    def GetPropertyIds(self, property_userids):
+        self._called("GetPropertyIds")
+        return [
+            self.types.PropertyIdArrayItem(self.property_ids[repr(_userid)]) if (repr(_userid) in self.property_ids) else \
+                self.types.ErrorItem(self.types.Error(-2130313112, "Property not found.")) \
+                    for _userid in property_userids
+        ][:self.reply_limit]
+
+    def property_value(self, element_id, property_id):
+        """
+        Value of a cell: the last value set, or one made up from the positions of the element and the property.
+        """
+        _key = (element_id.guid, property_id.guid)
+        if (_key in self.values):
+            return self.values[_key]
+
+        _row = [ _element_id.elementId.guid for _element_id in self.element_ids ].index(element_id.guid)
+        _column = [ _property_id.guid for _property_id in self.property_ids.values() ].index(property_id.guid)
+        _types = self.types
+
+        return [
+            lambda: _types.NormalStringPropertyValue(f"E{_row:03d}"),
+            lambda: _types.UserUndefinedPropertyValue("length") if (_row == 0) else _types.NormalLengthPropertyValue(_row / 2),
+            lambda: _types.NormalStringPropertyValue(f"s{_row % 3:d}"),
+            lambda: _types.NormalIntegerPropertyValue(_row),
+            lambda: _types.NormalSingleEnumPropertyValue(_types.DisplayValueEnumId(f"Option {_row % 3:d}")),
+            lambda: _types.NormalMultiEnumPropertyValue([
+                _types.EnumValueIdWrapper(_types.DisplayValueEnumId(f"Option {_id:d}")) for _id in range(_row % 3)
+            ]),
+        ][_column]()
+
+    def GetDetailsOfProperties(self, property_ids):
+        self._called("GetDetailsOfProperties")
+        _userids = { _property_id.guid:_userid for _userid, _property_id in zip(self.property_userids, self.property_ids.values()) }
+        _definitions = []
+
+        for _property_id in property_ids:
+            _userid = _userids[_property_id.propertyId.guid]
+            _options = [ f"Option {_id:d}" for _id in range(4) ] if (_userid.localizedName[-1] in ("Option", "Options")) else None
+
+            _definitions.append(self.types.PropertyDefinitionWrapper(self.types.PropertyDefinition(
+                group=self.types.PropertyGroup(self.types.PropertyGroupId(uuid.uuid5(uuid.NAMESPACE_OID, _userid.localizedName[0])), _userid.localizedName[0]),
+                name=_userid.localizedName[-1],
+                description="",
+                isEditable=True,
+                type="singleEnum" if (_options) else "string",
+                possibleEnumValues=[
+                    self.types.PossibleEnumValuesArrayItem(self.types.PossibleEnumValue(self.types.DisplayValueEnumId(_option), _option)) for _option in _options
+                ] if (_options) else None,
+            )))
+
+        return _definitions
+
+    def GetPropertyValuesOfElements(self, element_ids, property_ids):
+        self._called("GetPropertyValuesOfElements")
+        # Built from dicts, as the replies of ArchiCAD are
+        return [
+            self.types.PropertyValuesWrapper([
+                self.types.PropertyValueWrapper(self.property_value(_element_id.elementId, _property_id.propertyId).to_dict()) \
+                    for _property_id in property_ids
+            ]) for _element_id in element_ids
+        ]
+
+    def SetPropertyValuesOfElements(self, element_property_values):
+        self._called("SetPropertyValuesOfElements")
+        _keys = [ (_value.elementId.guid, _value.propertyId.guid) for _value in element_property_values ]
+
+        with self.lock:
+            self.batches.append(_keys)
+            for _key in _keys:
+                if (self.batch_errors.get(_key, None)):
+                    raise self.batch_errors[_key].pop(0)
+
+        _results = []
+        for _key, _value in zip(_keys, element_property_values):
+            with self.lock:
+                _code = self.failures[_key].pop(0) if (self.failures.get(_key, None)) else None
+
+            if (_code is None):
+                self.values[_key] = _value.propertyValue
+                _results.append(self.types.SuccessfulExecutionResult(True))
+            else:
+                _results.append(self.types.FailedExecutionResult(False, self.types.Error(_code, f"Error {_code:d}.")))
+
+        return _results
+
 class TestGDLUtilities(unittest.TestCase):
 
     @classmethod
@@ -64,6 +208,28 @@ class TestGDLUtilities(unittest.TestCase):
 
         _result = kill_archicad(_ac_handler)
 
+    def temp_dir(self)->str:
+        """
+        New temporary directory, removed with everything in it when the test ends.
+        """
+        _dir = tempfile.mkdtemp(prefix="gdl_utilities_test_")
+        self.addCleanup(shutil.rmtree, _dir, ignore_errors=True)
+        return _dir
+
+    def stub_connection(self)->gdl_utilities.ac_connection.connection:
+        """
+        connection answering from StubCommands instead of ArchiCAD.
+        """
+        if (not isinstance(gdl_utilities.ac_connection.archicad, ModuleType)):
+            self.skipTest("archicad module not installed.")
+
+        _connection = object.__new__(gdl_utilities.ac_connection.connection)
+        _connection.commands = StubCommands(gdl_utilities.ac_connection.archicad.Types)
+        _connection.types = gdl_utilities.ac_connection.archicad.Types
+        _connection.invalidate_cache()
+
+        return _connection
+
     def setUp(self):
         pass
 
@@ -124,6 +290,1312 @@ class TestGDLUtilities(unittest.TestCase):
             _tests,
         )
 
+    def test_iter_xmls(self) -> None:
+        _sandbox = file("sandbox", is_dir=True, script_dir=True).abspath()
+
+        self.assertEqual(
+            [ _file.name() for _file in gdl_utilities.parse_params.iter_xmls(_sandbox, sort=True) ],
+            [ "gs_general_door_macro.xml", "test_obj_Test123.xml" ],
+        )
+
+        self.assertEqual(
+            [ _file.name() for _file in gdl_utilities.parse_params.iter_xmls(_sandbox, patterns=["test_*"]) ],
+            [ "test_obj_Test123.xml" ],
+        )
+
+    def test_from_gsm(self) -> None:
+        _sandbox = file("sandbox/test_obj_Test123.xml", is_dir=False, script_dir=True).abspath()
+        _dest_paths = []
+
+        # Stand in for LP_XMLConverter: "convert" any .gsm by copying the sandbox XML, and fail on the broken ones
+        def _execute_command(source_path, version, command, password, dest_path, show_progress=False):
+            _dest_paths.append(dest_path)
+            if ("broken" in source_path):
+                return gdl_utilities.gsm_commands.GSMConvertShellError(f"Cannot convert {source_path}")
+            shutil.copyfile(_sandbox, dest_path)
+            return GSMConvertSuccess(version=version, dest_path=dest_path)
+
+        self.addCleanup(setattr, gdl_utilities.gsm_commands, "execute_command", gdl_utilities.gsm_commands.execute_command)
+        gdl_utilities.gsm_commands.execute_command = _execute_command
+
+        _xml_file = gdl_utilities.parse_params.GDLXMLFile.from_gsm("/library/test_obj_Test123.gsm")
+
+        self.assertIsInstance(_xml_file, gdl_utilities.parse_params.GDLXMLFile)
+        self.assertEqual(_xml_file.name, "test_obj_Test123")
+        self.assertTrue(_xml_file.parameters.find(name="ZZYZX"))
+
+        _paths = [ f"/library/{_name}.gsm" for _name in ("part_1", "broken_1", "part_2", "broken_2", "part_3") ]
+        _results = list(gdl_utilities.parse_params.GDLXMLFile.iter_from_gsms(_paths, workers=2))
+
+        # Results come back in the order of the paths, with failures as Exceptions instead of raised
+        self.assertEqual([ _path for _path, _ in _results ], _paths)
+        for _path, _result in _results:
+            if ("broken" in _path):
+                self.assertIsInstance(_result, gdl_utilities.gsm_commands.GSMConvertShellError)
+            else:
+                self.assertIsInstance(_result, gdl_utilities.parse_params.GDLXMLFile)
+                self.assertEqual(_result.name, os.path.basename(_path)[:-4])
+
+        # Every temporary file is removed, whether the conversion worked or not
+        self.assertEqual(len(_dest_paths), 6)
+        for _dest_path in _dest_paths:
+            self.assertFalse(os.path.exists(_dest_path))
+
+    def test_map_safely(self) -> None:
+        _read = []
+
+        def _items():
+            for _item in range(100):
+                _read.append(_item)
+                yield _item
+
+        _results = threads.map_safely(lambda _item: 1 / (_item % 3), _items(), workers=2)
+
+        # Results come in the order of the items, with failures returned; the items are only read a few ahead
+        for _expected in range(5):
+            _item, _result = next(_results)
+            self.assertEqual(_item, _expected)
+            if (_item % 3):
+                self.assertEqual(_result, 1 / (_item % 3))
+            else:
+                self.assertIsInstance(_result, ZeroDivisionError)
+        self.assertLessEqual(len(_read), 5 + 2 * 2)
+
+        self.assertEqual([ _item for _item, _ in _results ], list(range(5, 100)))
+
+    def test_pipeline(self) -> None:
+        _dir = self.temp_dir()
+        for _name in ("gs_general_door_macro.xml", "test_obj_Test123.xml"):
+            shutil.copy(file(f"sandbox/{_name}", is_dir=False, script_dir=True).abspath(), _dir)
+
+        _sunk = []
+
+        # Skip the door macro; collect the names of the rest instead of saving them
+        _results = gdl_utilities.pipeline.GDLPipeline(
+            _dir,
+            workers=2,
+            max_pending=1,
+        ).map(
+            lambda _xml_file: None if (_xml_file.name.startswith("gs_")) else _xml_file
+        ).sink(
+            lambda _xml_file, _source: _sunk.append(_xml_file.name) or _source.name()
+        ).run()
+
+        _results = { _result.source.name():_result for _result in _results }
+
+        self.assertIsInstance(_results["gs_general_door_macro.xml"].result, gdl_utilities.pipeline.GDLPipelineSkipped)
+        self.assertFalse(_results["gs_general_door_macro.xml"])
+        self.assertEqual(_results["test_obj_Test123.xml"].result, "test_obj_Test123.xml")
+        self.assertEqual(_sunk, ["test_obj_Test123", ])
+
+        # Exceptions are returned per file, not raised
+        _results = gdl_utilities.pipeline.GDLPipeline(_dir).map(lambda _xml_file: 1/0).run()
+
+        self.assertEqual(len(_results), 2)
+        for _result in _results:
+            self.assertIsInstance(_result.result, ZeroDivisionError)
+
+    def test_validate_xmls(self) -> None:
+        _sandbox = file("sandbox", is_dir=True, script_dir=True).abspath()
+
+        _results = gdl_utilities.xml.validate_xmls(_sandbox)
+        self.assertEqual(len(_results), 2)
+        for _result in _results.values():
+            self.assertIsInstance(_result, gdl_utilities.xml.XMLValidationSuccess)
+
+        _dir = self.temp_dir()
+        with open(os.path.join(_sandbox, "test_obj_Test123.xml"), "r", encoding="UTF-8") as _stream:
+            _xml = _stream.read()
+
+        # Script sections are optional
+        with open(os.path.join(_dir, "no_scripts.xml"), "w", encoding="UTF-8") as _stream:
+            _stream.write(re.sub(r"<(Script_[A-Za-z0-9]+)[^>]*>[\s\S]*?</\1>\s*", "", _xml))
+        # ZZYZX renamed to a, which clashes with A
+        with open(os.path.join(_dir, "duplicate.xml"), "w", encoding="UTF-8") as _stream:
+            _stream.write(_xml.replace('<Length Name="ZZYZX">', '<Length Name="a">'))
+        with open(os.path.join(_dir, "malformed.xml"), "w", encoding="UTF-8") as _stream:
+            _stream.write(_xml[:len(_xml)//2])
+
+        _results = {
+            os.path.basename(_path):_result for _path, _result in gdl_utilities.xml.validate_xmls(_dir).items()
+        }
+
+        self.assertTrue(_results["no_scripts.xml"])
+        self.assertFalse(_results["duplicate.xml"])
+        self.assertEqual(_results["duplicate.xml"].errors, ["Parameter A declared 2 times."])
+        self.assertFalse(_results["malformed.xml"])
+        self.assertTrue(_results["malformed.xml"].errors[0].startswith("Not well-formed"))
+
+        # LP_XMLConverter is not started if any source is invalid
+        _result = gdl_utilities.gsm_commands.xml_to_gsm(_dir, validate=True)
+        self.assertIsInstance(_result, gdl_utilities.gsm_commands.GSMInvalidSource)
+        self.assertEqual(sorted(os.path.basename(_path) for _path in _result.results), ["duplicate.xml", "malformed.xml"])
+
+    def test_library_index(self) -> None:
+        _dir = self.temp_dir()
+        _part = os.path.join(_dir, "part.xml")
+        _door = os.path.join(_dir, "door.xml")
+        shutil.copyfile(file("sandbox/test_obj_Test123.xml", is_dir=False, script_dir=True).abspath(), _part)
+        shutil.copyfile(file("sandbox/gs_general_door_macro.xml", is_dir=False, script_dir=True).abspath(), _door)
+
+        _index = gdl_utilities.index.GDLLibraryIndex(_dir)
+        _summary = _index.update()
+        self.assertEqual(sorted(_summary["added"]), [_door, _part])
+
+        _door_only = [ _name for _name in _index.declarations if list(_index.declarations[_name]) == [_door, ] ]
+        self.assertTrue(_door_only)
+        self.assertIn(_part, _index.declared_by("zzyzx"))
+
+        # Declare myLength instead of ZZYZX and use it in the 3D script
+        with open(_part, "r", encoding="UTF-8", newline="") as _stream:
+            _xml = _stream.read()
+        with open(_part, "w", encoding="UTF-8", newline="") as _stream:
+            _stream.write(
+                _xml.replace('<Length Name="ZZYZX">', '<Length Name="myLength">', 1).replace(
+                    '<Script_3D SectVersion="20" SectionFlags="0" SubIdent="0">\n<![CDATA[]]>',
+                    '<Script_3D SectVersion="20" SectionFlags="0" SubIdent="0">\n<![CDATA[block A, B, myLength]]>',
+                    1,
+                )
+            )
+        os.remove(_door)
+
+        _summary = _index.update()
+        self.assertEqual(_summary["updated"], [_part, ])
+        self.assertEqual(_summary["removed"], [_door, ])
+
+        self.assertNotIn(_part, _index.declared_by("ZZYZX"))
+        self.assertEqual(_index.declared_by("MYLENGTH")[_part][:2], ("myLength", "Length"))
+        self.assertEqual(_index.referenced_by("mylength"), { _part:["Script_3D", ] })
+        for _name in _door_only:
+            self.assertNotIn(_name, _index.declarations)
+
+        # Touched but not changed
+        os.utime(_part, (timer.time()+10, timer.time()+10))
+        self.assertEqual(_index.update()["unchanged"], 1)
+
+        # Save / load round trip
+        _index_path = os.path.join(_dir, "index.json")
+        _index.save(_index_path)
+        _loaded = gdl_utilities.index.GDLLibraryIndex.load(_index_path)
+
+        self.assertEqual(_loaded.files, _index.files)
+        self.assertEqual(_loaded.declarations, _index.declarations)
+        self.assertEqual(_loaded.references, _index.references)
+
+        _summary = _loaded.update()
+        self.assertEqual((_summary["unchanged"], _summary["added"], _summary["updated"]), (1, [], []))
+
+    def test_gdl_library(self) -> None:
+        _sandbox = file("sandbox", is_dir=True, script_dir=True).abspath()
+
+        _library = gdl_utilities.library.GDLLibrary.load(_sandbox, workers=2)
+
+        self.assertEqual(len(_library), 2)
+        self.assertEqual(sorted(_library.names), ["gs_general_door_macro", "test_obj_Test123"])
+        self.assertEqual(_library.errors, {})
+        self.assertEqual(_library.parameters["part"].max(), 1)
+
+        for _part in _library:
+            with open(_part.path, "rb") as _stream:
+                _xml_file = gdl_utilities.parse_params.GDLXMLFile.from_bytes(_part.name, _stream.read())
+
+            self.assertIs(_library[_part.name].part_id, _part.part_id)
+
+            # Same parameters as parsing the part on its own
+            _parameters = _part.parameters
+            self.assertEqual(len(_parameters), len(_xml_file.parameters))
+            for _parameter, _expected in zip(_parameters, _xml_file.parameters):
+                for _key in ("name", "type", "description", "value", "fix", "flags"):
+                    self.assertEqual(getattr(_parameter, _key), getattr(_expected, _key))
+
+                if (_expected.array_values is None):
+                    self.assertIsNone(_parameter.array_values)
+                else:
+                    np.testing.assert_array_equal(_parameter.array_values, _expected.array_values)
+
+            for _kind, _attribute in gdl_utilities.parse_params.GDLXMLFile.script_attributes.items():
+                self.assertEqual(_part.script(_kind).script or "", getattr(_xml_file, _attribute).script or "")
+
+        self.assertEqual(
+            [ _part.name for _part in _library.parts_declaring("zzyzx") ],
+            [ _part.name for _part in _library if _part.parameters.find(name="ZZYZX") ],
+        )
+        self.assertIn("test_obj_Test123", [ _part.name for _part in _library.parts_declaring("zzyzx") ])
+
+        # Identical strings are stored once across parts
+        _descriptions = _library.parameters.loc[_library.parameters["name"] == "ZZYZX", "description"]
+        self.assertEqual(len(_descriptions), 2)
+        self.assertEqual(len({ id(_description) for _description in _descriptions }), 1)
+
+        # Extending with a broken file reports it without loading anything from it
+        _dir = self.temp_dir()
+        _broken = os.path.join(_dir, "broken.xml")
+        with open(_broken, "w", encoding="UTF-8") as _stream:
+            _stream.write("<Symbol>")
+
+        _row_count = _library.parameters.shape[0]
+        self.assertEqual(list(_library.extend([_broken, ])), [_broken, ])
+        self.assertEqual(len(_library), 2)
+        self.assertEqual(_library.parameters.shape[0], _row_count)
+
+        # Nor from a part named like one already loaded; both are kept in errors
+        _duplicate = os.path.join(_dir, "test_obj_Test123.xml")
+        shutil.copyfile(file("sandbox/test_obj_Test123.xml", is_dir=False, script_dir=True).abspath(), _duplicate)
+
+        _errors = _library.extend([_duplicate, ])
+        self.assertIsInstance(_errors[_duplicate], gdl_utilities.library.GDLDuplicatePart)
+        self.assertEqual(_errors[_duplicate].path, _library["test_obj_Test123"].path)
+        self.assertEqual(len(_library), 2)
+        self.assertEqual(_library.parameters.shape[0], _row_count)
+        self.assertEqual(list(_library.errors), [_broken, _duplicate])
+
+        with self.assertRaises(IndexError):
+            _library[2]
+
+    def test_diff_libraries(self) -> None:
+        _old_dir = self.temp_dir()
+        _new_dir = self.temp_dir()
+
+        with open(file("sandbox/test_obj_Test123.xml", is_dir=False, script_dir=True).abspath(), "r", encoding="UTF-8", newline="") as _stream:
+            _xml = _stream.read()
+
+        def _write(dir_path, name, xml):
+            os.makedirs(os.path.dirname(os.path.join(dir_path, name)), exist_ok=True)
+            with open(os.path.join(dir_path, name), "w", encoding="UTF-8", newline="") as _stream:
+                _stream.write(xml)
+
+        for _dir in (_old_dir, _new_dir):
+            shutil.copy(file("sandbox/gs_general_door_macro.xml", is_dir=False, script_dir=True).abspath(), _dir)
+        _write(_old_dir, "broken.xml", _xml[:len(_xml)//2])
+        _write(_new_dir, "broken.xml", _xml[:len(_xml)//3])
+
+        _write(_old_dir, "removed.xml", _xml)
+        _write(_new_dir, "added.xml", _xml)
+        # Indented differently, but with the same content
+        _write(_old_dir, os.path.join("sub", "resaved.xml"), _xml)
+        _write(_new_dir, os.path.join("sub", "resaved.xml"), _xml.replace("\t", "  "))
+        # New height, a 3D script and one more parameter
+        _write(_old_dir, "changed.xml", _xml)
+        _write(
+            _new_dir,
+            "changed.xml",
+            _xml.replace(
+                '<Length Name="ZZYZX">\n\t\t\t<Description><![CDATA["Height"]]></Description>\n\t\t\t<Fix/>\n\t\t\t<Value>1</Value>',
+                '<Length Name="ZZYZX">\n\t\t\t<Description><![CDATA["Height"]]></Description>\n\t\t\t<Fix/>\n\t\t\t<Value>2</Value>',
+                1,
+            ).replace(
+                '<Script_3D SectVersion="20" SectionFlags="0" SubIdent="0">\n<![CDATA[]]>',
+                '<Script_3D SectVersion="20" SectionFlags="0" SubIdent="0">\n<![CDATA[block A, B, ZZYZX\n]]>',
+                1,
+            ).replace(
+                '<Length Name="ZZYZX">',
+                '<Length Name="myLength">\n\t\t\t<Description><![CDATA["My Length"]]></Description>\n\t\t\t<Value>0</Value>\n\t\t</Length>\n\t\t<Length Name="ZZYZX">',
+                1,
+            ),
+        )
+
+        # Only parts whose bytes differ are parsed, each once, details included
+        _parsed = []
+        _parse_sections = gdl_utilities.diff.parse_sections
+        self.addCleanup(setattr, gdl_utilities.diff, "parse_sections", _parse_sections)
+
+        def _counting_parse_sections(xml):
+            _parsed.append(xml)
+            return _parse_sections(xml)
+
+        gdl_utilities.diff.parse_sections = _counting_parse_sections
+
+        _results = gdl_utilities.diff.diff_libraries(_old_dir, _new_dir, workers=2)
+
+        # resaved.xml and changed.xml twice; the old broken.xml fails to parse
+        self.assertEqual(len(_parsed), 5)
+
+        self.assertEqual(
+            sorted(_results),
+            sorted(["added.xml", "broken.xml", "changed.xml", "gs_general_door_macro.xml", "removed.xml", os.path.join("sub", "resaved.xml")]),
+        )
+        self.assertEqual(_results["added.xml"].status, "added")
+        self.assertEqual(_results["removed.xml"].status, "removed")
+        self.assertEqual(_results["gs_general_door_macro.xml"].status, "unchanged")
+        self.assertEqual(_results[os.path.join("sub", "resaved.xml")].status, "resaved")
+        self.assertIsInstance(_results["broken.xml"], Exception)
+
+        _diff = _results["changed.xml"]
+        self.assertTrue(_diff)
+        self.assertFalse(_diff.header_changed)
+        self.assertEqual(_diff.scripts_changed, ["Script_3D", ])
+        self.assertEqual(_diff.parameters_added, ["myLength", ])
+        self.assertEqual(_diff.parameters_removed, [])
+        self.assertEqual(_diff.parameters_changed, ["ZZYZX", ])
+
+        self.assertEqual(sorted(_diff.details["scripts"]), ["Script_3D", ])
+        self.assertIn("+block A, B, ZZYZX\n", _diff.details["scripts"]["Script_3D"])
+        self.assertIn("-Value: 1\n", _diff.details["parameters"]["ZZYZX"])
+        self.assertIn("+Value: 2\n", _diff.details["parameters"]["ZZYZX"])
+        self.assertNotIn("header", _diff.details)
+
+        # Hashes only
+        self.assertEqual(gdl_utilities.diff.diff_libraries(_old_dir, _new_dir, details=False)["changed.xml"].details, {})
+
+    def test_patch_parameter_values(self) -> None:
+        _source = file("sandbox/test_obj_Test123.xml", is_dir=False, script_dir=True).abspath()
+        _dest = os.path.join(self.temp_dir(), "test_obj_Test123.xml")
+
+        _patched = gdl_utilities.parse_params.patch_parameter_values(
+            _source,
+            { "a":2.4, "ZZYZX":0.5, "not_a_parameter":1 },
+            dest_path=_dest,
+        )
+        self.assertEqual(_patched, ["A", "ZZYZX"])
+
+        with open(_source, "r", encoding="UTF-8", newline="") as _stream:
+            _before = _stream.read().splitlines(keepends=True)
+        with open(_dest, "r", encoding="UTF-8", newline="") as _stream:
+            _after = _stream.read().splitlines(keepends=True)
+
+        self.assertEqual(len(_before), len(_after))
+        self.assertEqual(
+            [ _line.strip() for _line_before, _line in zip(_before, _after) if _line_before != _line ],
+            [ "<Value>2.4</Value>", "<Value>0.5</Value>" ],
+        )
+
+        # ]]> in a string, and markup characters in anything else, do not break the XML
+        _xml, _patched = gdl_utilities.parse_params.patch_parameter_values_text(
+            "\n".join([
+                "<Symbol><ParamSection><Parameters>",
+                '<String Name="sText"><Description><![CDATA["Text"]]></Description><Value><![CDATA[""]]></Value></String>',
+                '<Length Name="A"><Description><![CDATA["A"]]></Description><Value>1</Value></Length>',
+                "</Parameters></ParamSection></Symbol>",
+            ]),
+            { "sText":'a[1]]>"b" & <c>', "A":"B<C & D" },
+        )
+        self.assertEqual(_patched, ["sText", "A"])
+
+        _parameters = ET.fromstring(_xml).find("ParamSection/Parameters")
+        self.assertEqual(_parameters.find("String/Value").text, '"a[1]]>"b" & <c>"')
+        self.assertEqual(_parameters.find("Length/Value").text, "B<C & D")
+
+    def test_array_values(self) -> None:
+        def _parameter(xml):
+            return gdl_utilities.parse_params.parseParameter(
+                ET.fromstring(xml, parser=ET.XMLParser(strip_cdata=False))
+            )[1]
+
+        def _round_trip(parameter):
+            return _parameter(parameter.node_xml).array_values
+
+        _tests = [
+            # 1D Integer, beyond the precision of float64
+            (
+                '<Integer Name="ints"><Description><![CDATA["ints"]]></Description><ArrayValues FirstDimension="3" SecondDimension="0">'
+                '<AVal Row="1">1</AVal><AVal Row="2">9007199254740993</AVal><AVal Row="3">-4</AVal></ArrayValues></Integer>',
+                np.array([1, 2**53+1, -4], dtype=np.int64),
+                lambda _values: _values.__setitem__(2, 5),
+                np.array([1, 2**53+1, 5], dtype=np.int64),
+            ),
+            # 2D RealNum
+            (
+                '<RealNum Name="reals"><Description><![CDATA["reals"]]></Description><ArrayValues FirstDimension="2" SecondDimension="2">'
+                '<AVal Column="1" Row="1">0.5</AVal><AVal Column="2" Row="1">1</AVal>'
+                '<AVal Column="1" Row="2">-2.25</AVal><AVal Column="2" Row="2">3</AVal></ArrayValues></RealNum>',
+                np.array([[0.5, 1.0], [-2.25, 3.0]]),
+                lambda _values: _values.__setitem__((1, 0), 0.125),
+                np.array([[0.5, 1.0], [0.125, 3.0]]),
+            ),
+            # 1D String
+            (
+                '<String Name="strings"><Description><![CDATA["strings"]]></Description><ArrayValues FirstDimension="2" SecondDimension="0">'
+                '<AVal Row="1"><![CDATA["A"]]></AVal><AVal Row="2"><![CDATA["B C"]]></AVal></ArrayValues></String>',
+                np.array(["A", "B C"], dtype=object),
+                lambda _values: _values.__setitem__(0, "D"),
+                np.array(["D", "B C"], dtype=object),
+            ),
+            # 1D Boolean
+            (
+                '<Boolean Name="flags"><Description><![CDATA["flags"]]></Description><ArrayValues FirstDimension="3" SecondDimension="0">'
+                '<AVal Row="1">1</AVal><AVal Row="2">0</AVal><AVal Row="3">1</AVal></ArrayValues></Boolean>',
+                np.array([True, False, True]),
+                lambda _values: _values.__setitem__(1, True),
+                np.array([True, True, True]),
+            ),
+            # Sparse 2D Integer; the cells left out are 0
+            (
+                '<Integer Name="sparse"><Description><![CDATA["sparse"]]></Description><ArrayValues FirstDimension="2" SecondDimension="3">'
+                '<AVal Column="3" Row="1">7</AVal><AVal Column="1" Row="2">8</AVal></ArrayValues></Integer>',
+                np.array([[0, 0, 7], [8, 0, 0]], dtype=np.int64),
+                lambda _values: _values.__setitem__((1, 1), 9),
+                np.array([[0, 0, 7], [8, 9, 0]], dtype=np.int64),
+            ),
+        ]
+
+        for _xml, _parsed, _edit, _edited in _tests:
+            _param = _parameter(_xml)
+
+            self.assertEqual(_param.array_values.dtype, _parsed.dtype)
+            np.testing.assert_array_equal(_param.array_values, _parsed)
+
+            # Read only: written back as it was
+            np.testing.assert_array_equal(_round_trip(_param), _parsed)
+
+            _edit(_param.array_values)
+            np.testing.assert_array_equal(_round_trip(_param), _edited)
+
+    def test_new_parameter_node_xml(self) -> None:
+        def _new_param():
+            return gdl_utilities.parse_params.GDLParameter(
+                "ap_profileName",
+                type="String",
+                description="Profile Name",
+                value="Z 100",
+                fix=True,
+                flags=["ParFlg_Hidden", "ParFlg_Child"],
+            )
+
+        _param = _new_param()
+
+        # node_xml is only serialised when it is read
+        self.assertFalse(dict.__contains__(_param, "node_xml"))
+
+        # What GDLParameter.__init__ used to build element by element
+        _node = ET.Element("String", attrib={"Name":"ap_profileName"})
+        ET.SubElement(_node, "Description").text = ET.CDATA('"Profile Name"')
+        ET.SubElement(_node, "Fix")
+        _flags = ET.SubElement(_node, "Flags")
+        ET.SubElement(_flags, "ParFlg_Hidden")
+        ET.SubElement(_flags, "ParFlg_Child")
+        ET.SubElement(_node, "Value").text = ET.CDATA('"Z 100"')
+        _answer = ET.tostring(_node)
+
+        self.assertEqual(_param["node_xml"], _answer)
+        self.assertEqual(_param.get("node_xml"), _answer)
+        self.assertIn("node_xml", _param)
+        self.assertEqual(dict(_param)["node_xml"], _answer)
+
+        self.assertEqual(
+            ET.tostring(_param.node),
+            ET.tostring(ET.fromstring(_answer, parser=ET.XMLParser(strip_cdata=False))),
+        )
+
+        # Writing a new parameter stamps its node without serialising node_xml
+        _param = _new_param()
+        self.assertEqual(
+            ET.tostring(gdl_utilities.parse_params.GDLParameters([ _param, ]).node[0]),
+            ET.tostring(ET.fromstring(_answer, parser=ET.XMLParser(strip_cdata=False))),
+        )
+        self.assertFalse(dict.__contains__(_param, "node_xml"))
+
+        # Nor is it missing from anything built from the keys of the parameter
+        self.assertEqual(list(_param), [ "type", "description", "value", "fix", "flags", "node_xml" ])
+        self.assertEqual(
+            pd.DataFrame.from_dict({ "ap_profileName":_new_param() }, orient="index").loc["ap_profileName", "node_xml"],
+            _answer,
+        )
+
+    def test_generate_conditional_parameters_from_dataframe(self) -> None:
+        _df = pd.DataFrame({
+            "ap_profileName":[ f"Z {_id:d}" for _id in range(250) ],
+            "ap_elementLength":np.linspace(0, 2, 250),
+            "ap_objectType":np.arange(250),
+            "ap_customiseSchedule":np.arange(250) % 2 == 0,
+            "ap_productCode":[ f"PC-{_id:04d}" for _id in range(250) ],
+        })
+
+        _answer = "".join(
+            _df.apply(
+                gdl_utilities.script.generate_conditional_parameters,
+                axis=1,
+                conditional_column="ap_profileName",
+            )
+        )
+
+        self.assertEqual(
+            gdl_utilities.script.generate_conditional_parameters_from_dataframe(
+                _df,
+                conditional_column="ap_profileName",
+                chunksize=64,
+            ),
+            _answer,
+        )
+
+        # Numeric conditional key; rows of an all-numeric DataFrame are upcast to float
+        _df_numeric = _df[["ap_objectType", "ap_elementLength"]]
+
+        _answer = "".join(
+            _df_numeric.apply(
+                gdl_utilities.script.generate_conditional_parameters,
+                axis=1,
+                conditional_column="ap_objectType",
+            )
+        )
+        self.assertIn("IF ap_objectType='3.0' THEN", _answer)
+
+        self.assertEqual(
+            gdl_utilities.script.generate_conditional_parameters_from_dataframe(
+                _df_numeric,
+                conditional_column="ap_objectType",
+                chunksize=64,
+            ),
+            _answer,
+        )
+
+    def test_generate_lookup_tables(self) -> None:
+        _df = pd.DataFrame({
+            "code":[ "A", "B's", 'C "x"', None ],
+            "width":[ 0.5, np.nan, 1.0, 2.0 ],
+            "count":pd.array([ 1, None, 3, 4 ], dtype="Int64"),
+            "note":[ 'it\'s "q"', pd.NA, "", 5 ],
+        })
+
+        # Missing cells are "" in String columns and 0 otherwise; strings with both quotes are concatenated
+        self.assertEqual(
+            gdl_utilities.script.generate_lookup_arrays(_df, key_column="code"),
+            "\n".join([
+                "DIM _lookup_id[4]",
+                "DIM _lookup_code[4]",
+                "DIM _lookup_width[4]",
+                "DIM _lookup_count[4]",
+                "DIM _lookup_note[4]",
+                "_lookup_id[1] = 1",
+                "_lookup_id[2] = 2",
+                "_lookup_id[3] = 3",
+                "_lookup_id[4] = 4",
+                '_lookup_code[1] = "A"',
+                '_lookup_code[2] = "B\'s"',
+                "_lookup_code[3] = 'C \"x\"'",
+                '_lookup_code[4] = ""',
+                "_lookup_width[1] = 0.5",
+                "_lookup_width[2] = 0",
+                "_lookup_width[3] = 1.0",
+                "_lookup_width[4] = 2.0",
+                "_lookup_count[1] = 1",
+                "_lookup_count[2] = 0",
+                "_lookup_count[3] = 3",
+                "_lookup_count[4] = 4",
+                '_lookup_note[1] = "it\'s " + \'"\' + "q" + \'"\'',
+                '_lookup_note[2] = ""',
+                '_lookup_note[3] = ""',
+                '_lookup_note[4] = "5"',
+            ]) + "\n",
+        )
+
+        self.assertEqual(
+            gdl_utilities.script.generate_lookup_dispatch(_df, key_column="code", index_parameter="iRow"),
+            "IF iRow>=1 AND iRow<=4 THEN\n"
+            "\tcode\t=\t_lookup_code[iRow]\n"
+            "\twidth\t=\t_lookup_width[iRow]\n"
+            "\tcount\t=\t_lookup_count[iRow]\n"
+            "\tnote\t=\t_lookup_note[iRow]\n"
+            "ENDIF\n",
+        )
+
+        _tables = gdl_utilities.script.generate_lookup_tables(_df, key_column="code", index_parameter="iRow")
+        self.assertEqual(_tables["parameter"], '! === Parameter Script ==\n\nVALUES{2} "iRow" _lookup_id, _lookup_code\n')
+        self.assertNotIn("DIM", _tables["master"])
+
+        _parameters = ET.fromstring(_tables["parameters"].node_xml)
+        self.assertEqual(
+            {
+                _parameter.get("Name"):(_parameter.tag, [ _value.text for _value in _parameter.iter("AVal") ]) \
+                    for _parameter in _parameters
+            },
+            {
+                "_lookup_id":("Integer", [ "1", "2", "3", "4" ]),
+                "_lookup_code":("String", [ '"A"', '"B\'s"', '"C "x""', '""' ]),
+                "_lookup_width":("RealNum", [ "0.5", "0", "1", "2" ]),
+                "_lookup_count":("Integer", [ "1", "0", "3", "4" ]),
+                "_lookup_note":("String", [ '"it\'s "q""', '""', '""', '"5"' ]),
+            },
+        )
+
+        _tables = gdl_utilities.script.generate_lookup_tables(_df, key_column="code", index_parameter="iRow", as_parameters=False)
+        self.assertIsNone(_tables["parameters"])
+        self.assertIn("DIM _lookup_note[4]\n", _tables["master"])
+
+    def test_rename_gdl_identifiers(self) -> None:
+        _script = "\n".join([
+            'A = b + a_b ! A in a comment',
+            'text2 0, 0, "A"',
+            'values "a" 1, 2',
+            'lock "B",',
+            '    "A"',
+            'if GLOB_MODPAR_NAME = "A" then parameters b = A',
+        ])
+
+        self.assertEqual(
+            gdl_utilities.script.rename_gdl_identifiers(_script, { "A":"newA", "B":"newB" }),
+            (
+                "\n".join([
+                    'newA = newB + a_b ! A in a comment',
+                    'text2 0, 0, "A"',
+                    'values "newA" 1, 2',
+                    'lock "newB",',
+                    '    "newA"',
+                    'if GLOB_MODPAR_NAME = "newA" then parameters newB = newA',
+                ]),
+                8,
+            ),
+        )
+
+        # Parameter names among the arguments of other commands; option values and texts are kept
+        _script = "\n".join([
+            'd = PARVALUE_DESCRIPTION("A", 1)',
+            'UI_COLORPICKER "A", "B", "C", 0, 0',
+            'UI_SLIDER "A", 0, 0, 100, 20',
+            'UI_RADIOBUTTON{2} "C", "A", "B", 0, 0',
+            'UI_PICT_RADIOBUTTON "B", "A", "A", 0, 0',
+            'VALUES{2} "A" 1, "B"',
+        ])
+
+        self.assertEqual(
+            gdl_utilities.script.rename_gdl_identifiers(_script, { "A":"newA", "B":"newB", "C":"newC" }),
+            (
+                "\n".join([
+                    'd = PARVALUE_DESCRIPTION("newA", 1)',
+                    'UI_COLORPICKER "newA", "newB", "newC", 0, 0',
+                    'UI_SLIDER "newA", 0, 0, 100, 20',
+                    'UI_RADIOBUTTON{2} "newC", "A", "B", 0, 0',
+                    'UI_PICT_RADIOBUTTON "newB", "A", "A", 0, 0',
+                    'VALUES{2} "newA" 1, "B"',
+                ]),
+                8,
+            ),
+        )
+
+    def test_rename_parameters(self) -> None:
+        with open(file("sandbox/test_obj_Test123.xml", is_dir=False, script_dir=True).abspath(), "r", encoding="UTF-8", newline="") as _stream:
+            _xml = _stream.read()
+
+        def _with_scripts(xml, scripts):
+            for _tag, _script in scripts.items():
+                xml = xml.replace(
+                    f'<{_tag} SectVersion="20" SectionFlags="0" SubIdent="0">\n<![CDATA[]]>',
+                    f'<{_tag} SectVersion="20" SectionFlags="0" SubIdent="0">\n<![CDATA[{_script}]]>',
+                    1,
+                )
+            return xml
+
+        # size is a local variable; "A" and "B" are also the options of A
+        _xml = _with_scripts(_xml, {
+            "Script_1D":'size = A * 2\nB = size',
+            "Script_VL":'VALUES "A" "A", "B"\nLOCK "A"',
+            "Script_UI":'UI_INFIELD "A", 0, 0, 100, 20',
+        })
+
+        _new_xml, _counts = gdl_utilities.library.rename_parameters_text(_xml, { "a":"width" })
+
+        self.assertEqual(
+            _counts,
+            { gdl_utilities.library.DECLARATIONS:1, "Script_1D":1, "Script_VL":2, "Script_UI":1 },
+        )
+        self.assertEqual(
+            _new_xml,
+            _with_scripts(
+                _xml.replace('<Length Name="A">', '<Length Name="width">', 1).replace(
+                    '<![CDATA[size = A * 2\nB = size]]>', '<![CDATA[]]>', 1,
+                ).replace(
+                    '<![CDATA[VALUES "A" "A", "B"\nLOCK "A"]]>', '<![CDATA[]]>', 1,
+                ).replace(
+                    '<![CDATA[UI_INFIELD "A", 0, 0, 100, 20]]>', '<![CDATA[]]>', 1,
+                ),
+                {
+                    "Script_1D":'size = width * 2\nB = size',
+                    "Script_VL":'VALUES "width" "A", "B"\nLOCK "width"',
+                    "Script_UI":'UI_INFIELD "width", 0, 0, 100, 20',
+                },
+            ),
+        )
+
+        # Clashes with a local variable, or with another parameter
+        with self.assertRaises(ValueError):
+            gdl_utilities.library.rename_parameters_text(_xml, { "B":"size" })
+        with self.assertRaises(ValueError):
+            gdl_utilities.library.rename_parameters_text(_xml, { "ZZYZX":"b" })
+        # Swapping is fine
+        self.assertEqual(
+            gdl_utilities.library.rename_parameters_text(_xml, { "A":"B", "B":"A" })[1],
+            { gdl_utilities.library.DECLARATIONS:2, "Script_1D":2, "Script_VL":2, "Script_UI":1 },
+        )
+
+        # size is not declared, so it is only renamed in the parts named as callers
+        self.assertEqual(gdl_utilities.library.rename_parameters_text(_xml, { "size":"mySize" }), (_xml, {}))
+
+        _dir = self.temp_dir()
+        _part, _caller = os.path.join(_dir, "part.xml"), os.path.join(_dir, "caller.xml")
+        for _path in (_part, _caller):
+            with open(_path, "w", encoding="UTF-8", newline="") as _stream:
+                _stream.write(_xml)
+
+        self.assertEqual(
+            gdl_utilities.library.rename_parameters(_dir, { "size":"mySize" }, callers=[_caller, ]),
+            { _caller:{ "Script_1D":2 }, _part:{} },
+        )
+        with open(_caller, "r", encoding="UTF-8", newline="") as _stream:
+            self.assertIn("<![CDATA[mySize = A * 2\nB = mySize]]>", _stream.read())
+
+        # A clash in one part stops every part from being renamed
+        _clash = os.path.join(_dir, "clash.xml")
+        with open(_clash, "w", encoding="UTF-8", newline="") as _stream:
+            _stream.write(_with_scripts(_xml.replace("size", "width"), {}))
+        with open(_part, "r", encoding="UTF-8", newline="") as _stream:
+            _part_xml = _stream.read()
+
+        _results = gdl_utilities.library.rename_parameters(_dir, { "A":"width" }, workers=2)
+        self.assertIsInstance(_results[_clash], ValueError)
+        self.assertEqual(_results[_part], { gdl_utilities.library.DECLARATIONS:1, "Script_1D":1, "Script_VL":2, "Script_UI":1 })
+        with open(_part, "r", encoding="UTF-8", newline="") as _stream:
+            self.assertEqual(_stream.read(), _part_xml)
+
+        os.remove(_clash)
+        gdl_utilities.library.rename_parameters(_dir, { "A":"width" }, workers=2)
+        with open(_part, "r", encoding="UTF-8", newline="") as _stream:
+            self.assertIn('<Length Name="width">', _stream.read())
+
+    def test_replace_in_scripts(self) -> None:
+        _dir = self.temp_dir()
+        for _name in ("gs_general_door_macro.xml", "test_obj_Test123.xml"):
+            shutil.copy(file(f"sandbox/{_name}", is_dir=False, script_dir=True).abspath(), _dir)
+
+        _door = os.path.join(_dir, "gs_general_door_macro.xml")
+        _part = os.path.join(_dir, "test_obj_Test123.xml")
+        _missing = os.path.join(_dir, "missing.xml")
+
+        def _read(path):
+            with open(path, "r", encoding="UTF-8", newline="") as _stream:
+                return _stream.read()
+
+        def _script(xml, tag):
+            return re.search(rf"<{tag}[^>]*>([\s\S]*?)</{tag}>", xml).group(1)
+
+        _door_xml, _part_xml = _read(_door), _read(_part)
+
+        _replacements = [
+            ("lod3D", "myLod3D"),
+            (re.compile(r"\bLOD3D_(\w+)"), r"LOD_\1"),
+        ]
+        _kinds = [gdl_utilities.parse_params.GDLScriptType.SCRIPT_3D, ]
+
+        # Nothing is written on a dry run, but the matches are still counted
+        _results = gdl_utilities.library.replace_in_scripts([_door, _part, _missing], _replacements, kinds=_kinds, workers=2, dry_run=True)
+
+        self.assertEqual(_results[_door], { "Script_3D":36 })
+        self.assertEqual(_results[_part], {})
+        self.assertIsInstance(_results[_missing], FileNotFoundError)
+        self.assertEqual(_read(_door), _door_xml)
+
+        _results = gdl_utilities.library.replace_in_scripts(_dir, _replacements, kinds=_kinds)
+
+        self.assertEqual(_results, { _door:{ "Script_3D":36 }, _part:{} })
+        self.assertEqual(_read(_part), _part_xml)
+
+        _new_xml = _read(_door)
+        self.assertEqual(
+            _script(_new_xml, "Script_3D"),
+            re.sub(r"\bLOD3D_(\w+)", r"LOD_\1", _script(_door_xml, "Script_3D").replace("lod3D", "myLod3D")),
+        )
+        # Other scripts, and the text around the scripts, are left alone
+        self.assertEqual(_script(_new_xml, "Script_1D"), _script(_door_xml, "Script_1D"))
+        self.assertEqual(
+            re.sub(r"<Script_3D[^>]*>[\s\S]*?</Script_3D>", "", _new_xml),
+            re.sub(r"<Script_3D[^>]*>[\s\S]*?</Script_3D>", "", _door_xml),
+        )
+
+        # A script holding "]]>" stays split once, however many passes are made
+        _xml = (
+            '<Symbol><Script_3D SectVersion="20" SectionFlags="0" SubIdent="0"><![CDATA[\n'
+            + gdl_utilities.parse_params.escape_cdata('a = "]]>"\nb = a\n')
+            + ']]>\n</Script_3D></Symbol>'
+        )
+        for _pass in range(2):
+            _xml, _counts = gdl_utilities.library.replace_in_scripts_text(_xml, [(re.compile(r"\bb\b"), "c")], kinds=_kinds)
+        self.assertEqual(_counts, {})
+        self.assertEqual(_xml.count("]]]]><![CDATA[>"), 1)
+        self.assertEqual(ET.fromstring(_xml).find("Script_3D").text, '\na = "]]>"\nc = a\n\n')
+
+    def test_watcher(self) -> None:
+        _dir = self.temp_dir()
+        _source = os.path.join(_dir, "test_obj_Test123.xml")
+        shutil.copyfile(file("sandbox/test_obj_Test123.xml", is_dir=False, script_dir=True).abspath(), _source)
+
+        # The polling source reports a change once, as soon as its interval has passed
+        _polling = gdl_utilities.watch.PollingEventSource(_dir, interval=0)
+        with open(_source, "ab") as _stream:
+            _stream.write(b" ")
+        self.assertEqual(_polling.poll(), { _source, })
+        self.assertEqual(_polling.poll(), set())
+
+        # Two bursts of 5 saves, 0.1s apart on a simulated clock that moves on by 0.1s every poll
+        _bursts = { _step:{ _source, } for _step in list(range(0, 5)) + list(range(20, 25)) }
+
+        class _ScriptedSource():
+            def __init__(self):
+                self.now = 0.0
+                self.step = 0
+
+            def clock(self):
+                return self.now
+
+            def start(self):
+                pass
+
+            def stop(self):
+                pass
+
+            def poll(self):
+                self.now = self.step / 10
+                self.step += 1
+                return _bursts.get(self.step - 1, set())
+
+        _scripted = _ScriptedSource()
+        _converted = []
+
+        # Stand-in for xml_to_gsm(), which needs LP_XMLConverter
+        _watcher = gdl_utilities.watch.GDLWatcher(
+            _dir,
+            os.path.join(_dir, "GSMs"),
+            debounce=0.3,
+            convert=lambda source, dest: _converted.append((source, dest, _scripted.clock())) or True,
+            on_result=lambda path, result: (len(_converted) >= 2) and _watcher.stop(),
+            source=_scripted,
+            clock=_scripted.clock,
+        )
+
+        _results = _watcher.run(timeout=60, tick=0.001)
+
+        # One conversion per burst, none before the burst has settled
+        self.assertEqual(
+            [ (_path, _dest) for _path, _dest, _ in _converted ],
+            [ (_source, os.path.join(_dir, "GSMs", "test_obj_Test123.gsm")) ] * 2,
+        )
+        self.assertGreaterEqual(_converted[0][2], 0.4 + 0.3)
+        self.assertGreaterEqual(_converted[1][2], 2.4 + 0.3)
+        self.assertEqual(_results, { _source:True })
+
+    def test_conversion_coordinator(self) -> None:
+        _dir = self.temp_dir()
+        for _id in range(8):
+            with open(os.path.join(_dir, f"part_{_id:d}.xml"), "w") as _stream:
+                _stream.write(f"<Symbol>{_id:d}</Symbol>")
+
+        # The first 4 conversions only finish once 4 are running at the same time
+        _barrier = threading.Barrier(4, timeout=10)
+        _lock = threading.Lock()
+        _started = []
+
+        # Stand-in for convert_library_parts(), which needs LP_XMLConverter
+        def _convert(source_path, version, operation, password, dest_path):
+            with _lock:
+                _started.append(source_path)
+                _waits = len(_started) <= 4
+            if (_waits):
+                _barrier.wait()
+            shutil.copyfile(source_path, dest_path)
+            return GSMConvertSuccess(version=version, dest_path=dest_path)
+
+        class _LostSlot():
+            def convert(self, payload):
+                raise EOFError("Connection lost.")
+            def close(self):
+                pass
+
+        class _LostWorker(gdl_utilities.distributed.LocalWorker):
+            def connect(self):
+                return _LostSlot()
+
+        _jobs = gdl_utilities.distributed.jobs_from_directory(_dir, os.path.join(_dir, "GSMs"))
+
+        _report = gdl_utilities.distributed.ConversionCoordinator(
+            [ gdl_utilities.distributed.LocalWorker(f"worker_{_id:d}", convert=_convert) for _id in range(4) ] + \
+            [ _LostWorker("lost"), ]
+        ).run(_jobs)
+
+        self.assertTrue(_report)
+        self.assertEqual(len(_started), 8)
+        self.assertFalse(_barrier.broken)
+
+        # Every job done exactly once; each of the 4 workers took part, and the lost one none
+        self.assertEqual(sorted(_result.job.source_path for _result in _report.results), sorted(_job.source_path for _job in _jobs))
+        self.assertEqual(sorted(_report.by_worker), [ f"worker_{_id:d}" for _id in range(4) ])
+        self.assertEqual(sum(_worker["jobs"] for _worker in _report.by_worker.values()), 8)
+        for _worker in _report.by_worker.values():
+            self.assertGreaterEqual(_worker["jobs"], 1)
+            self.assertEqual(_worker["failed"], 0)
+
+        with open(os.path.join(_dir, "GSMs", "part_3.gsm"), "r") as _stream:
+            self.assertEqual(_stream.read(), "<Symbol>3</Symbol>")
+
+        # With no worker left, the jobs are failed rather than lost
+        _report = gdl_utilities.distributed.ConversionCoordinator([ _LostWorker("lost"), ]).run(_jobs)
+        self.assertFalse(_report)
+        self.assertEqual(len(_report.failed), 8)
+
+    def test_property_group_trie(self) -> None:
+        _trie = gdl_utilities.ac_connection.PropertyGroupTrie()
+        for _group_name, _property in [
+            ((gdl_utilities.ac_connection.BUILTIN_GROUP_NAME, "IdAndCategories"), "id"),
+            (("Test Group", ), "length"),
+            (("Test Group", "Sub"), "sub"),
+            (("Test Group 2", ), "count"),
+            (("A.B", ), "dotted"),
+            (("Test Group", ), "text"),
+        ]:
+            _trie.add(_group_name, _property)
+
+        # Catalogue order, not the order of the sub-groups
+        self.assertEqual(_trie.find("Test Group"), ["length", "sub", "text"])
+        self.assertEqual(_trie.find("test group", case_sensitive=False), ["length", "sub", "text"])
+        self.assertEqual(_trie.find("test group"), [])
+        self.assertEqual(_trie.find("Test"), [])
+        self.assertEqual(_trie.find("Test Group.Sub"), ["sub", ])
+        self.assertEqual(_trie.find("A.B"), ["dotted", ])
+        self.assertEqual(_trie.find((None, "IdAndCategories")), ["id", ])
+        self.assertEqual(_trie.find(""), ["id", "length", "sub", "count", "dotted", "text"])
+
+    def test_property_catalogue_cache(self) -> None:
+        _connection = self.stub_connection()
+        _commands = _connection.commands.commands
+
+        self.assertEqual(
+            list(_connection.find_properties_userid_by_group("Test Group")),
+            [ _commands.property_userids[1], _commands.property_userids[4] ],
+        )
+        self.assertEqual(
+            list(_connection.find_properties_userid_by_group((None, "IdAndCategories"))),
+            [ _commands.property_userids[0], _commands.property_userids[2] ],
+        )
+        self.assertEqual(len(list(_connection.iter_properties())), len(_commands.property_userids))
+        self.assertEqual(_commands.calls["GetAllPropertyNames"], 1)
+
+        # A property added in ArchiCAD is only seen after invalidate_cache()
+        _commands.property_userids.append(_connection.types.UserDefinedPropertyUserId(["Test Group", "Added"]))
+        self.assertEqual(len(list(_connection.find_properties_userid_by_group("Test Group"))), 2)
+
+        _connection.invalidate_cache()
+        self.assertEqual(
+            list(_connection.find_properties_userid_by_group("Test Group"))[-1],
+            _commands.property_userids[-1],
+        )
+        self.assertEqual(_commands.calls["GetAllPropertyNames"], 2)
+
+        # Errors are returned, not swallowed by the iterators
+        _commands.alive = False
+        _connection.invalidate_cache()
+        _connection._alive_until = 0.0
+        for _result in (
+            _connection.iter_properties(),
+            _connection.find_properties_userid_by_group("Test Group"),
+            _connection.find_properties_id_by_group("Test Group"),
+        ):
+            self.assertIsInstance(_result, gdl_utilities.ac_connection.ACConnectionFailed)
+
+    def test_property_registry(self) -> None:
+        _connection = self.stub_connection()
+        _commands = _connection.commands.commands
+        _types = _connection.types
+
+        # Column names and user ids convert both ways, for built-in, user defined and dotted group names
+        for _userid in _commands.property_userids:
+            _column = _connection.build_property_column_name(_userid)
+            self.assertEqual(repr(_connection.build_property_userid(_column)), repr(_userid))
+            self.assertEqual(repr(_connection.get_property_userid_from_column_name(_connection.property_column_name(_userid))), repr(_userid))
+
+        self.assertEqual(
+            _connection.build_property_column_name(_commands.property_userids[0]),
+            f"{gdl_utilities.ac_connection.BUILTIN_GROUP_NAME}::IdAndCategories{GROUP_PROPERTY_SEPARATOR}ElementID",
+        )
+
+        _length, _name = _commands.property_userids[1], _commands.property_userids[2]
+        _unknown = _types.UserDefinedPropertyUserId(["Test Group", "Unknown"])
+
+        _ids = _connection.resolve_property_ids([_length, _name, _length, _unknown])
+
+        self.assertEqual(_commands.calls["GetPropertyIds"], 1)
+        self.assertEqual([ _id.guid for _id in _ids[:3] ], [ _commands.property_ids[repr(_userid)].guid for _userid in (_length, _name, _length) ])
+        self.assertIsInstance(_ids[3], _types.ErrorItem)
+        self.assertEqual(
+            _connection.property_registry.column_name_of_property_id(_ids[1]),
+            _connection.build_property_column_name(_name),
+        )
+
+        # Known ids are not asked for again; unknown ones are, as they may have been created since
+        self.assertEqual([ _id.guid for _id in _connection.resolve_property_ids([_name, _length]) ], [ _ids[1].guid, _ids[0].guid ])
+        self.assertEqual(_commands.calls["GetPropertyIds"], 1)
+        _connection.resolve_property_ids([_unknown, ])
+        self.assertEqual(_commands.calls["GetPropertyIds"], 2)
+
+        # A reply short of items
+        _commands.reply_limit = 1
+        _ids = _connection.resolve_property_ids(_commands.property_userids[3:6])
+        self.assertEqual(_ids[0].guid, _commands.property_ids[repr(_commands.property_userids[3])].guid)
+        for _id in _ids[1:]:
+            self.assertIsInstance(_id, gdl_utilities.ac_connection.ACPropertyNotResolved)
+            self.assertFalse(_id)
+
+    def test_alive_heartbeat(self) -> None:
+        _connection = self.stub_connection()
+        _commands = _connection.commands.commands
+        _connection.alive_ttl = 60
+
+        _connection.forget_heartbeat()
+        list(_connection.iter_properties())
+        list(_connection.iter_properties())
+        self.assertEqual((_commands.calls["IsAlive"], _commands.calls["GetAllPropertyNames"]), (1, 1))
+
+        # Answered from the cache: no heartbeat
+        _alive_until = _connection._alive_until = timer.perf_counter() + 30
+        list(_connection.find_properties_userid_by_group("Test Group"))
+        self.assertEqual(_connection._alive_until, _alive_until)
+
+        # Answered by ArchiCAD: heartbeat
+        _connection.resolve_property_ids(_commands.property_userids[:1])
+        self.assertGreater(_connection._alive_until, _alive_until)
+        self.assertEqual(_commands.calls["IsAlive"], 1)
+
+        # Any exception from a command, not only OSError, makes the next call check IsAlive again
+        class _ProtocolError(Exception):
+            pass
+
+        _commands.errors["GetPropertyIds"] = _ProtocolError("Unexpected reply.")
+        with self.assertRaises(_ProtocolError):
+            _connection.resolve_property_ids(_commands.property_userids[1:2])
+        self.assertEqual(_connection._alive_until, 0.0)
+
+        del _commands.errors["GetPropertyIds"]
+        _connection.find_properties_id_by_group("Test Group")
+        self.assertEqual(_commands.calls["IsAlive"], 2)
+
+    def test_fetch_property_values(self) -> None:
+        _connection = self.stub_connection()
+        _commands = _connection.commands.commands
+        _elements = _commands.element_ids
+        _userids = _commands.property_userids
+
+        # Baseline: one GetPropertyValuesOfElements call, every cell decoded and unpacked on its own
+        _wrapper = _commands.GetPropertyValuesOfElements(_elements, _connection.get_property_id_by_property_user_id(_userids))
+        _expected_values = {}
+        _expected_structure = {}
+        for _column_id, _userid in enumerate(_userids):
+            _column = _connection.property_column_name(_userid)
+            _cells = [ _property_values.propertyValues[_column_id] for _property_values in _wrapper ]
+
+            _expected_values[_column] = [ _connection.get_property_value(_cell) for _cell in _cells ]
+            _unpacked = [ _connection.unpack_property_value(_cell) for _cell in _cells ]
+            _expected_structure[_column] = next(( _structure for _structure in _unpacked if _structure["value"] ), _unpacked[-1])
+
+        _commands.calls.clear()
+        _single = _connection.get_element_property_dataframe(_elements, _userids, element_chunk_size=100, property_chunk_size=100)
+        self.assertEqual(_commands.calls["GetPropertyValuesOfElements"], 1)
+
+        # 4 blocks of elements by 2 of properties
+        _commands.calls.clear()
+        _chunked = _connection.get_element_property_dataframe(_elements, _userids, element_chunk_size=3, property_chunk_size=4, workers=3)
+        self.assertEqual(_commands.calls["GetPropertyValuesOfElements"], 8)
+
+        pd.testing.assert_frame_equal(_chunked, _single)
+
+        for _df in (_single, _chunked):
+            self.assertEqual(list(_df.index), [ _element.elementId.guid for _element in _elements ])
+            self.assertEqual(list(_df.columns), list(_expected_values))
+            self.assertEqual(_df.property_structure, _expected_structure)
+            for _column, _values in _expected_values.items():
+                self.assertEqual(
+                    [ None if (not isinstance(_value, (list, tuple)) and pd.isna(_value)) else _value for _value in _df[_column].tolist() ],
+                    _values,
+                )
+
+    def test_reconstruct_property_values(self) -> None:
+        _connection = self.stub_connection()
+        _commands = _connection.commands.commands
+        _df = _connection.get_element_property_dataframe(_commands.element_ids, _commands.property_userids)
+
+        def _built(function, value):
+            # archicad types have no __eq__; compare them by repr, and failures by type and message
+            _result = threads.call_safely(function, value)
+            return (type(_result), str(_result)) if (isinstance(_result, Exception)) else repr(_result)
+
+        # Length, String, Integer, single enum and multi enum, with an undefined length in the first row
+        _types = { _structure.constructor.__name__ for _structure in _df.property_structure.values() }
+        self.assertTrue({ "NormalLengthPropertyValue", "NormalSingleEnumPropertyValue", "NormalMultiEnumPropertyValue" } <= _types)
+
+        for _column_id, _column in enumerate(_df.columns):
+            _structure = _df.property_structure[_column]
+            _compiled = _structure.compile()
+            _reconstructor = _structure.reconstructor()
+
+            _values = [ None if (not isinstance(_value, (list, tuple)) and pd.isna(_value)) else _value for _value in _df[_column].tolist() ]
+            for _value in _values + [ None, [] ]:
+                self.assertEqual(_built(_compiled, _value), _built(_structure.reconstruct, _value), (_column, _value))
+                self.assertEqual(_built(_reconstructor, _value), _built(_structure.reconstruct, _value), (_column, _value))
+
+            # Decoded values build what they were decoded from
+            for _element, _value in zip(_commands.element_ids, _values):
+                _original = _commands.property_value(_element.elementId, list(_commands.property_ids.values())[_column_id])
+
+                if (_value is not None):
+                    self.assertEqual(repr(_structure.reconstruct(_value)), repr(_original))
+
+    def test_property_dtypes(self) -> None:
+        _connection = self.stub_connection()
+        _commands = _connection.commands.commands
+        _userids = _commands.property_userids
+        _count, _option = ( _connection.property_column_name(_userids[_id]) for _id in (3, 4) )
+        _length = _connection.property_column_name(_userids[1])
+
+        # Editable by default: columns are what pandas makes of the values, not categories or Int64
+        _df = _connection.get_element_property_dataframe(_commands.element_ids, _userids)
+        self.assertNotIsInstance(_df[_option].dtype, pd.CategoricalDtype)
+        self.assertNotEqual(str(_df[_count].dtype), "Int64")
+        self.assertNotIn("GetDetailsOfProperties", _commands.calls)
+
+        _df.loc[_df.index[0], _option] = "Option 3"
+        _df.loc[_df.index[0], _length] = 1.5
+        self.assertEqual(_df[_option].iloc[0], "Option 3")
+        self.assertEqual(_df[_length].iloc[0], 1.5)
+
+        # Typed on request; every option of the property is a category, used or not
+        _typed = _connection.get_element_property_dataframe(_commands.element_ids, _userids, typed=True)
+        self.assertEqual(_commands.calls["GetDetailsOfProperties"], 1)
+        self.assertIsInstance(_typed[_option].dtype, pd.CategoricalDtype)
+        self.assertEqual(list(_typed[_option].cat.categories), [ f"Option {_id:d}" for _id in range(4) ])
+        self.assertEqual(str(_typed[_count].dtype), "Int64")
+        self.assertEqual(_typed[_length].dtype, np.float64)
+
+        _typed.loc[_typed.index[0], _option] = "Option 3"
+        self.assertEqual(_typed[_option].iloc[0], "Option 3")
+
+        _untyped = _connection.get_element_property_dataframe(_commands.element_ids, _userids)
+        pd.testing.assert_frame_equal(_connection.apply_property_dtypes(_untyped), _connection.get_element_property_dataframe(_commands.element_ids, _userids, typed=True))
+
+    def test_changed_cells(self) -> None:
+        _df = ElementsPropertyValues(
+            {
+                "Options": [ ["Option 0"], ["Option 1", "Option 2"], [] ],
+                "Length": [ 0.5, None, 1.5 ],
+                "Name": [ "a", "b", None ],
+            },
+            index=pd.Index([ "g0", "g1", "g2" ], name="element_guid"),
+        )
+
+        # Without a snapshot, everything is changed
+        self.assertTrue(_df.changed_cells().to_numpy().all())
+
+        _df.take_snapshot()
+        self.assertFalse(_df.changed_cells().to_numpy().any())
+
+        # Lists changed in place are not changed in the snapshot too
+        _df.at["g0", "Options"].append("Option 3")
+        _df.at["g2", "Options"].extend([ "Option 1" ])
+        _df.loc["g1", "Length"] = 2.0
+        _df.loc["g2", "Name"] = "c"
+
+        _changed = _df.changed_cells()
+        self.assertEqual(
+            sorted(_changed.stack().loc[lambda _cells: _cells].index.tolist()),
+            [ ("g0", "Options"), ("g1", "Length"), ("g2", "Name"), ("g2", "Options") ],
+        )
+
+        # An assigned list equal to the snapshot is unchanged; a new row is changed
+        _df.at["g0", "Options"] = ["Option 0"]
+        _df.loc["g3"] = [ ["Option 0"], 0.5, "d" ]
+        _changed = _df.changed_cells()
+        self.assertFalse(_changed.loc["g0"].any())
+        self.assertTrue(_changed.loc["g3"].all())
+
+        # Cells taken into the snapshot are no longer changed, and stay so when their lists change in place
+        _df.update_snapshot([ ("g2", "Options"), ("g1", "Length"), ("g3", "Name") ])
+        _changed = _df.changed_cells()
+        self.assertFalse(_changed.loc["g2", "Options"] or _changed.loc["g1", "Length"])
+        self.assertTrue(_changed.loc["g2", "Name"] and _changed.loc["g3", "Name"])
+
+        _df.at["g2", "Options"].append("Option 2")
+        self.assertTrue(_df.changed_cells().loc["g2", "Options"])
+
+    def test_push_property_values(self) -> None:
+        _connection = self.stub_connection()
+        _commands = _connection.commands.commands
+        _connection.alive_ttl = 60
+
+        # to_archicad() pushes through the module's connector
+        self.addCleanup(setattr, gdl_utilities.ac_connection, "connector", gdl_utilities.ac_connection.connector)
+        gdl_utilities.ac_connection.connector = _connection
+
+        _userids = _commands.property_userids
+        _length, _name = ( _connection.property_column_name(_userids[_id]) for _id in (1, 2) )
+        _property_guids = { _connection.property_column_name(_userid):_property_id.guid for _userid, _property_id in zip(_userids, _commands.property_ids.values()) }
+        _guids = [ _element.elementId.guid for _element in _commands.element_ids ]
+        _transient, _permanent = -2130313215, -2130313112
+
+        def _edited(edit):
+            # 20 changed cells: a Length and a Name of each of 10 elements, different from those of every other edit
+            _df = _connection.get_element_property_dataframe(_commands.element_ids, _userids)
+            _df[_length] = [ float(_row) + edit / 4 for _row in range(len(_df)) ]
+            _df[_name] = [ f"n{_row:d}.{edit:d}" for _row in range(len(_df)) ]
+            return _df
+
+        def _key(cell):
+            return (cell[0], _property_guids[cell[1]])
+
+        # Batches of 6 over 3 threads, with every result mapped back to its cell; a permanent failure is not retried
+        _df = _edited(1)
+        _commands.failures[_key((_guids[3], _name))] = [ _transient ]
+        _commands.calls.clear()
+
+        _report = _df.export.to_archicad(chunk_size=6, workers=3)
+        self.assertEqual(sorted(len(_batch) for _batch in _commands.batches), [ 2, 6, 6, 6 ])
+        self.assertEqual(sorted(_report.cells), sorted((_guid, _column) for _guid in _guids for _column in (_length, _name)))
+        self.assertEqual(list(_report.failed), [ (_guids[3], _name) ])
+        self.assertEqual(_report.failed[(_guids[3], _name)].error.code, _transient)
+        self.assertEqual(set(_report.attempts), { 1 })
+        self.assertEqual(_commands.values[_key((_guids[4], _name))].value, "n4.1")
+        self.assertEqual(_commands.values[_key((_guids[0], _length))].value, 0.25)
+
+        _changed = _df.changed_cells()
+        self.assertEqual(_changed.stack().loc[lambda _cells: _cells].index.tolist(), [ (_guids[3], _name) ])
+
+        # Only transport exceptions and retry_codes are retried, and only the cells failed by them
+        _df = _edited(2)
+        self.assertEqual(int(_df.changed_cells().to_numpy().sum()), 20)
+        _commands.batches.clear()
+        _commands.failures = {
+            _key((_guids[1], _name)): [ _transient ],
+            _key((_guids[2], _name)): [ _transient ]*3,
+            _key((_guids[3], _name)): [ _permanent ],
+        }
+        _commands.batch_errors = {
+            _key((_guids[5], _name)): [ ConnectionResetError("Connection reset by peer.") ],
+            _key((_guids[7], _name)): [ TypeError("Unexpected reply.") ],
+        }
+
+        _report = _df.export.to_archicad(chunk_size=4, workers=3, retries=2, retry_codes=[ _transient ])
+        _failed = { (_guids[2], _name), (_guids[3], _name) } | { (_guids[_row], _column) for _row in (6, 7) for _column in (_length, _name) }
+        self.assertEqual(set(_report.failed), _failed)
+
+        _retried = { (_guids[1], _name): 2, (_guids[2], _name): 3 } | { (_guids[_row], _column): 2 for _row in (4, 5) for _column in (_length, _name) }
+        _attempts = dict(zip(_report.cells, _report.attempts))
+        self.assertEqual({ _cell:_count for _cell, _count in _attempts.items() if _count > 1 }, _retried)
+        self.assertEqual(Counter(_key for _batch in _commands.batches for _key in _batch), Counter({ _key(_cell):_count for _cell, _count in _attempts.items() }))
+        self.assertEqual(len(_commands.batches), 5 + 2 + 1)
+
+        self.assertEqual(
+            _report.summary(),
+            {
+                (0, "Success"): 14,
+                (_transient, f"Error {_transient:d}."): 1,
+                (_permanent, f"Error {_permanent:d}."): 1,
+                (None, "TypeError: Unexpected reply."): 4,
+            }
+        )
+        self.assertEqual(set(_df.changed_cells().stack().loc[lambda _cells: _cells].index), _failed)
+
+        # Nothing is pushed while ArchiCAD is not alive, and every change is left pending
+        _commands.alive = False
+        _connection.forget_heartbeat()
+        _commands.calls.clear()
+
+        _report = _df.export.to_archicad()
+        self.assertIsInstance(_report, gdl_utilities.ac_connection.ACConnectionFailed)
+        self.assertNotIn("SetPropertyValuesOfElements", _commands.calls)
+        self.assertEqual(set(_df.changed_cells().stack().loc[lambda _cells: _cells].index), _failed)
+
     def test_ac_connector(self) -> None:
         
         if (ac_connector):
@@ -281,6 +1753,11 @@ class TestGDLUtilities(unittest.TestCase):
                     (0, "Success") in _result.keys()
                 )
 
+                # Everything pushed was taken as the new snapshot
+                self.assertFalse(
+                    _chair_df_new.changed_cells().to_numpy().any()
+                )
+
                 """
                 Load DataFrame back from ArchiCAD
                 and assert equal to what we injected